@@ -0,0 +1,8 @@
+"""Benchmarks for mermaid-py.
+
+Run a benchmark from the repository root, e.g. `python -m benchmarks.bench_session`.
+`python -m benchmarks.bench_suite` covers every diagram type and writes its
+results as JSON for comparison between runs. `bench_script` shows how script
+generation scales with diagram size, and `bench_memory` the bytes taken by
+each element.
+"""
@@ -0,0 +1,62 @@
+"""Compare URL length and render latency of base64 and pako script encodings.
+
+Usage:
+    python -m benchmarks.bench_encoding [--renders 50]
+"""
+
+import argparse
+import time
+
+from mermaid import Encoding, Mermaid, MermaidError, RenderClient
+from mermaid.flowchart import FlowChart, Link, Node
+from mermaid.testing import FakeMermaidServer
+
+SIZES: list[int] = [10, 100, 1000, 5000]
+
+
+def build_flowchart(size: int) -> FlowChart:
+    """Build a chain flowchart with `size` labelled nodes."""
+    nodes: list[Node] = [
+        Node(f"node-{index}", f"Step {index}") for index in range(size)
+    ]
+    links: list[Link] = [
+        Link(origin, end, message="next") for origin, end in zip(nodes, nodes[1:])
+    ]
+    return FlowChart(f"chain-{size}", nodes, links)
+
+
+def bench_render(
+    client: RenderClient, flowchart: FlowChart, encoding: Encoding, renders: int
+) -> str:
+    """Return the mean encode+render time in ms, or the error status."""
+    start: float = time.perf_counter()
+    try:
+        for _ in range(renders):
+            Mermaid(flowchart, client=client, encoding=encoding).svg_response
+    except MermaidError as error:
+        return f"HTTP {error.status_code}"
+    return f"{(time.perf_counter() - start) * 1000 / renders:.3f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=50)
+    args = parser.parse_args()
+
+    header = f"{'nodes':>6} {'encoding':>8} {'url chars':>10} {'latency':>12}"
+    print(header)
+    print("-" * len(header))
+    with FakeMermaidServer() as server, RenderClient(server.url) as client:
+        for size in SIZES:
+            flowchart: FlowChart = build_flowchart(size)
+            for encoding in Encoding:
+                path: str = Mermaid(flowchart, encoding=encoding)._build_path("svg")
+                latency: str = bench_render(client, flowchart, encoding, args.renders)
+                print(
+                    f"{size:>6} {encoding.value:>8} {len(server.url + path):>10} "
+                    f"{latency:>12}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Measure the memory taken by diagram elements.
+
+For every element class, the benchmark allocates many instances under
+tracemalloc and reports the bytes per element. Next to it is the same figure
+for copies of the elements whose class has no slotted base, so that every
+attribute lives in a `__dict__`, as it did before the classes declared
+`__slots__`. Both figures include the strings owned by each element and its
+slot in the list holding them.
+
+Usage:
+    python -m benchmarks.bench_memory [--count 100000]
+"""
+
+import argparse
+import gc
+import tracemalloc
+from typing import Any, Callable
+
+from mermaid.erdiagram import Entity
+from mermaid.erdiagram import Link as ERLink
+from mermaid.flowchart import Link, Node
+from mermaid.mindmap import Level
+from mermaid.reqdiagram import Element, Requirement
+from mermaid.reqdiagram import Link as ReqLink
+from mermaid.sequence import Link as SequenceLink
+from mermaid.sequence import Note, Participant
+from mermaid.statediagram import State, Transition
+from mermaid.userjourney import Task
+
+Factory = Callable[[type, int], Any]
+
+_node, _other_node = Node("a"), Node("b")
+_state, _other_state = State("a"), State("b")
+_entity, _other_entity = Entity("a"), Entity("b")
+_participant, _other_participant = Participant("a"), Participant("b")
+_element = Element("a", "simulation")
+_requirement = Requirement("1", "a", "text", "requirement", "low", "test")
+
+FACTORIES: dict[type, Factory] = {
+    Node: lambda cls, i: cls(f"node{i}"),
+    Link: lambda cls, i: cls(_node, _other_node),
+    State: lambda cls, i: cls(f"state{i}"),
+    Transition: lambda cls, i: cls(_state, _other_state),
+    Entity: lambda cls, i: cls(f"entity{i}"),
+    ERLink: lambda cls, i: cls(
+        _entity, _other_entity, "exactly-one", "zero-or-more", "has"
+    ),
+    Participant: lambda cls, i: cls(f"participant{i}"),
+    SequenceLink: lambda cls, i: cls(
+        _participant, _other_participant, "Solid-arrow", "message"
+    ),
+    Note: lambda cls, i: cls("note", _participant),
+    Level: lambda cls, i: cls(f"level{i}"),
+    Task: lambda cls, i: cls(f"task{i}", 5, []),
+    Element: lambda cls, i: cls(f"element{i}", "simulation"),
+    Requirement: lambda cls, i: cls(
+        str(i), f"requirement{i}", "text", "requirement", "low", "test"
+    ),
+    ReqLink: lambda cls, i: cls(_element, _requirement, "satisfies"),
+}
+
+
+def bytes_per_element(cls: type, factory: Factory, count: int) -> float:
+    """Return the memory allocated per instance of `cls`, in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        elements: list[Any] = [factory(cls, i) for i in range(count)]
+        allocated: int = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del elements
+    return allocated / count
+
+
+def slot_names(cls: type) -> list[str]:
+    """Return the slots declared by `cls` and its bases, bases first."""
+    names: list[str] = []
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get("__slots__", ()):
+            if name not in names:
+                names.append(name)
+    return names
+
+
+def without_slots(cls: type, factory: Factory) -> Factory:
+    """Return a factory of dict-backed copies of the elements of `factory`.
+
+    A subclass of `cls` would still store the declared attributes in the
+    inherited slots, so the copies are instances of a new class deriving
+    from `object` only, whose attributes are set in the order of the slots.
+    Each slotted original is released as soon as it is copied.
+    """
+    names: list[str] = slot_names(cls)
+    plain: type = type(cls.__name__, (), {})
+
+    def copy(_: type, index: int) -> Any:
+        element: Any = factory(cls, index)
+        instance: Any = plain()
+        for name in names:
+            if hasattr(element, name):
+                setattr(instance, name, getattr(element, name))
+        return instance
+
+    return copy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    header = f"{'element':>36} {'__dict__ B':>11} {'slots B':>8} {'saved':>7}"
+    print(header)
+    print("-" * len(header))
+    for cls, factory in FACTORIES.items():
+        before: float = bytes_per_element(cls, without_slots(cls, factory), args.count)
+        after: float = bytes_per_element(cls, factory, args.count)
+        print(
+            f"{cls.__module__.split('.', 1)[1] + '.' + cls.__name__:>36} "
+            f"{before:>11.0f} {after:>8.0f} {1 - after / before:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Measure how script generation scales with the size of a diagram.
+
+Every diagram is built once, then only its script is regenerated, so the
+timings leave out the construction of the elements. With a linear-time
+writer the time per element stays flat as diagrams grow; a column growing
+with the size points at a quadratic step.
+
+The peak memory of building the script is compared with that of streaming
+it with `Graph.write` to a null device, which never holds the whole script.
+
+Usage:
+    python -m benchmarks.bench_script [--types flowchart,state]
+        [--sizes 1000,10000,100000] [--repeat 3]
+"""
+
+import argparse
+import os
+from functools import partial
+
+from mermaid.graph import Graph
+
+from .bench_suite import best_of, peak_memory
+from .generators import GENERATORS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--types", default=",".join(GENERATORS))
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    kinds: list[str] = args.types.split(",")
+    unknown: list[str] = [kind for kind in kinds if kind not in GENERATORS]
+    if unknown:
+        parser.error(f"unknown diagram types: {', '.join(unknown)}")
+    sizes: list[int] = [int(size) for size in args.sizes.split(",")]
+
+    header = (
+        f"{'type':>12} {'size':>7} {'script KB':>10} {'build ms':>9} {'us/elem':>8} "
+        f"{'build peak KB':>14} {'stream peak KB':>15}"
+    )
+    print(header)
+    print("-" * len(header))
+    for kind in kinds:
+        for size in sizes:
+            graph: Graph = GENERATORS[kind](size)
+            with open(os.devnull, "w", encoding="utf-8") as null:
+                stream_peak: int = peak_memory(partial(graph.write, null))
+            build_peak: int = peak_memory(graph._build_script)
+            seconds: float = best_of(graph._build_script, args.repeat)
+            print(
+                f"{kind:>12} {size:>7} {len(graph.script) / 1024:>10.1f} "
+                f"{seconds * 1000:>9.2f} {seconds * 1e6 / size:>8.3f} "
+                f"{build_peak / 1024:>14.0f} {stream_peak / 1024:>15.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
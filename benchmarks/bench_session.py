@@ -0,0 +1,58 @@
+"""Compare a fresh connection per render against the pooled RenderClient.
+
+Usage:
+    python -m benchmarks.bench_session [--renders 200] [--connect-delay 0.002]
+"""
+
+import argparse
+import time
+
+import requests
+
+from mermaid import Mermaid, RenderClient
+from mermaid.testing import FakeMermaidServer
+
+SCRIPT: str = "graph TD;\n    A-->B;\n    A-->C;\n    B-->D;\n    C-->D;"
+
+
+def bench_requests_get(server: str, renders: int) -> float:
+    """Render through module-level `requests.get`, one connection per call."""
+    path: str = Mermaid(SCRIPT)._build_path("svg")
+    start: float = time.perf_counter()
+    for _ in range(renders):
+        requests.get(server + path).raise_for_status()
+    return time.perf_counter() - start
+
+
+def bench_render_client(server: str, renders: int) -> float:
+    """Render through a pooled, keep-alive RenderClient."""
+    with RenderClient(server) as client:
+        start: float = time.perf_counter()
+        for _ in range(renders):
+            Mermaid(SCRIPT, client=client).svg_response
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument(
+        "--connect-delay",
+        type=float,
+        default=0.002,
+        help="seconds the server waits on each new connection (mimics TLS)",
+    )
+    args = parser.parse_args()
+
+    with FakeMermaidServer(connect_delay=args.connect_delay) as server:
+        fresh: float = bench_requests_get(server.url, args.renders)
+        pooled: float = bench_render_client(server.url, args.renders)
+
+    print(f"renders:             {args.renders}")
+    print(f"requests.get:        {fresh * 1000 / args.renders:8.3f} ms/render")
+    print(f"RenderClient pooled: {pooled * 1000 / args.renders:8.3f} ms/render")
+    print(f"speedup:             {fresh / pooled:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
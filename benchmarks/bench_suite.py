@@ -0,0 +1,177 @@
+"""Measure script building, encoding and rendering for every diagram type.
+
+For each diagram type and size, the suite records the time to build the
+diagram, the peak memory allocated while building it, the time to encode its
+script with each encoding, and the render throughput through `RenderClient`
+against a local `FakeMermaidServer`. Results are written as JSON; pass an
+earlier results file as `--baseline` to print the change against it.
+
+Usage:
+    python -m benchmarks.bench_suite [--types flowchart,pie] [--sizes 10,1000]
+        [--repeat 3] [--renders 20] [--output results.json]
+        [--baseline previous.json]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, Optional
+
+from mermaid import Encoding, Mermaid, RenderClient, __version__
+from mermaid.graph import Graph
+from mermaid.testing import FakeMermaidServer
+
+from .generators import GENERATORS, SIZES
+
+MAX_REQUEST_LINE: int = 65536
+"""The longest request line the local server accepts, in bytes."""
+
+
+def best_of(function: Callable[[], Any], repeat: int) -> float:
+    """Return the shortest of `repeat` timings of `function`, in seconds."""
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def peak_memory(function: Callable[[], Any]) -> int:
+    """Return the peak memory allocated while calling `function`, in bytes."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_render(client: RenderClient, graph: Graph, renders: int) -> Optional[float]:
+    """Return the renders per second, or None if the URL is too long."""
+    path: str = Mermaid(graph, client=client)._build_path("svg")
+    if len(f"GET {path} HTTP/1.1\r\n") > MAX_REQUEST_LINE:
+        return None
+    start: float = time.perf_counter()
+    for _ in range(renders):
+        Mermaid(graph, client=client).svg_response
+    return renders / (time.perf_counter() - start)
+
+
+def bench_diagram(
+    kind: str, size: int, client: RenderClient, repeat: int, renders: int
+) -> dict[str, Any]:
+    """Run every measurement for one diagram type and size."""
+    generator: Callable[[int], Graph] = GENERATORS[kind]
+    graph: Graph = generator(size)
+    result: dict[str, Any] = {
+        "type": kind,
+        "size": size,
+        "script_bytes": len(graph.script.encode("utf-8")),
+        "build_seconds": best_of(lambda: generator(size).script, repeat),
+        "build_peak_bytes": peak_memory(lambda: generator(size).script),
+        "encode_seconds": {},
+        "encoded_chars": {},
+    }
+    for encoding in Encoding:
+        result["encode_seconds"][encoding.value] = best_of(
+            partial(Mermaid._get_encoded_script, graph.script, encoding), repeat
+        )
+        result["encoded_chars"][encoding.value] = len(
+            Mermaid._get_encoded_script(graph.script, encoding)
+        )
+    result["renders_per_second"] = bench_render(client, graph, renders)
+    return result
+
+
+def compare(results: list[dict[str, Any]], baseline: list[dict[str, Any]]) -> None:
+    """Print the build and encode time ratios of `results` to `baseline`."""
+    previous: dict[tuple[str, int], dict[str, Any]] = {
+        (entry["type"], entry["size"]): entry for entry in baseline
+    }
+    print(f"\n{'type':>12} {'size':>7} {'build':>8} {'base64':>8} {'pako':>8}")
+    for entry in results:
+        before: Optional[dict[str, Any]] = previous.get((entry["type"], entry["size"]))
+        if before is None:
+            continue
+        ratios: list[float] = [
+            entry["build_seconds"] / before["build_seconds"],
+            *(
+                entry["encode_seconds"][name] / before["encode_seconds"][name]
+                for name in ("base64", "pako")
+            ),
+        ]
+        print(
+            f"{entry['type']:>12} {entry['size']:>7} "
+            + " ".join(f"{ratio:>7.2f}x" for ratio in ratios)
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--types", default=",".join(GENERATORS))
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--renders", type=int, default=20)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline")
+    args = parser.parse_args()
+
+    kinds: list[str] = args.types.split(",")
+    unknown: list[str] = [kind for kind in kinds if kind not in GENERATORS]
+    if unknown:
+        parser.error(f"unknown diagram types: {', '.join(unknown)}")
+    sizes: list[int] = [int(size) for size in args.sizes.split(",")]
+
+    header = (
+        f"{'type':>12} {'size':>7} {'script KB':>10} {'build ms':>9} "
+        f"{'peak KB':>9} {'b64 ms':>8} {'pako ms':>8} {'renders/s':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    results: list[dict[str, Any]] = []
+    with FakeMermaidServer() as server, RenderClient(server.url) as client:
+        for kind in kinds:
+            for size in sizes:
+                result = bench_diagram(kind, size, client, args.repeat, args.renders)
+                results.append(result)
+                throughput: Optional[float] = result["renders_per_second"]
+                print(
+                    f"{kind:>12} {size:>7} {result['script_bytes'] / 1024:>10.1f} "
+                    f"{result['build_seconds'] * 1000:>9.2f} "
+                    f"{result['build_peak_bytes'] / 1024:>9.0f} "
+                    f"{result['encode_seconds']['base64'] * 1000:>8.2f} "
+                    f"{result['encode_seconds']['pako'] * 1000:>8.2f} "
+                    + (f"{throughput:>10.1f}" if throughput else f"{'-':>10}")
+                )
+
+    report: dict[str, Any] = {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "mermaid_py": __version__,
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "renders": args.renders,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            compare(results, json.load(file)["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Synthetic diagrams of a given size for every diagram type.
+
+Each generator takes a number of elements and returns a deterministic diagram
+of roughly that many nodes, states, messages, entities, levels, slices, tasks
+or requirements, so that runs on different machines build the same scripts.
+"""
+
+from typing import Callable
+
+from mermaid.erdiagram import Entity, ERDiagram
+from mermaid.erdiagram import Link as ERLink
+from mermaid.flowchart import FlowChart, Link, Node
+from mermaid.graph import Graph
+from mermaid.mindmap import Level, Mindmap
+from mermaid.piechart import PieChart
+from mermaid.reqdiagram import (
+    Element,
+    Requirement,
+    RequirementDiagram,
+    Risk,
+    Type,
+    VerifyMethod,
+)
+from mermaid.reqdiagram import Link as ReqLink
+from mermaid.sequence import Link as SequenceLink
+from mermaid.sequence import Participant, SequenceDiagram
+from mermaid.statediagram import State, StateDiagram, Transition
+from mermaid.userjourney import Actor, Section, Task, UserJourney
+
+SIZES: list[int] = [10, 100, 1000, 10000, 100000]
+"""The default diagram sizes, in elements."""
+
+PARTICIPANTS: int = 10
+"""The number of participants exchanging the messages of a sequence diagram."""
+
+FAN_OUT: int = 10
+"""The number of children of every inner mindmap level."""
+
+TASKS_PER_SECTION: int = 10
+"""The number of tasks in every user journey section."""
+
+
+def build_flowchart(size: int) -> FlowChart:
+    """Build a chain of `size` labelled nodes."""
+    nodes: list[Node] = [Node(f"node{index}", f"Step {index}") for index in range(size)]
+    links: list[Link] = [
+        Link(origin, end, message="next") for origin, end in zip(nodes, nodes[1:])
+    ]
+    return FlowChart(f"flowchart-{size}", nodes, links)
+
+
+def build_state_diagram(size: int) -> StateDiagram:
+    """Build a chain of `size` labelled states."""
+    states: list[State] = [
+        State(f"state{index}", f"State {index}") for index in range(size)
+    ]
+    transitions: list[Transition] = [
+        Transition(origin, end, "next") for origin, end in zip(states, states[1:])
+    ]
+    return StateDiagram(f"state-{size}", states, transitions)  # type: ignore[arg-type]
+
+
+def build_sequence_diagram(size: int) -> SequenceDiagram:
+    """Build `size` messages passed around a ring of participants."""
+    participants: list[Participant] = [
+        Participant(f"Service{index}") for index in range(PARTICIPANTS)
+    ]
+    messages: list[SequenceLink] = [
+        SequenceLink(
+            participants[index % PARTICIPANTS],
+            participants[(index + 1) % PARTICIPANTS],
+            "Solid-arrow",
+            f"message {index}",
+        )
+        for index in range(size)
+    ]
+    return SequenceDiagram(f"sequence-{size}", [*participants, *messages])
+
+
+def build_er_diagram(size: int) -> ERDiagram:
+    """Build a chain of `size` entities with three attributes each."""
+    entities: list[Entity] = [
+        Entity(
+            f"ENTITY{index}",
+            {"id": ["int", "PK"], "name": "string", "parent": ["int", "FK"]},
+        )
+        for index in range(size)
+    ]
+    links: list[ERLink] = [
+        ERLink(origin, end, "exactly-one", "zero-or-more", "has")
+        for origin, end in zip(entities, entities[1:])
+    ]
+    return ERDiagram(f"er-{size}", entities, links)
+
+
+def build_mindmap(size: int) -> Mindmap:
+    """Build a balanced tree of `size` levels with `FAN_OUT` children each."""
+    levels: list[Level] = [Level(f"Topic {index}") for index in range(size)]
+    for index, level in enumerate(levels[1:], start=1):
+        levels[(index - 1) // FAN_OUT].add_child(level)
+    return Mindmap(f"mindmap-{size}", levels[:1])
+
+
+def build_pie_chart(size: int) -> PieChart:
+    """Build a pie chart of `size` slices."""
+    data: dict[str, float] = {f"Slice {index}": index + 1 for index in range(size)}
+    return PieChart(f"pie-{size}", data, show_data=True)
+
+
+def build_user_journey(size: int) -> UserJourney:
+    """Build `size` tasks split into sections of `TASKS_PER_SECTION`."""
+    actors: list[Actor] = [Actor("User"), Actor("Admin")]
+    tasks: list[Task] = [
+        Task(f"Task {index}", index % 5 + 1, actors) for index in range(size)
+    ]
+    sections: list[Section] = [
+        Section(
+            f"Section {start // TASKS_PER_SECTION}",
+            tasks[start : start + TASKS_PER_SECTION],
+        )
+        for start in range(0, size, TASKS_PER_SECTION)
+    ]
+    return UserJourney(f"journey-{size}", sections)  # type: ignore[arg-type]
+
+
+def build_requirement_diagram(size: int) -> RequirementDiagram:
+    """Build `size` requirements, each satisfied by its own element."""
+    requirements: list[Requirement] = [
+        Requirement(
+            f"req{index}",
+            f"requirement_{index}",
+            f"The system shall satisfy requirement {index}.",
+            Type.FUNCTIONAL,
+            Risk.MEDIUM,
+            VerifyMethod.TEST,
+        )
+        for index in range(size)
+    ]
+    elements: list[Element] = [
+        Element(f"element_{index}", "module") for index in range(size)
+    ]
+    links: list[ReqLink] = [
+        ReqLink(element, requirement, "satisfies")
+        for element, requirement in zip(elements, requirements)
+    ]
+    return RequirementDiagram(f"requirements-{size}", elements, requirements, links)
+
+
+GENERATORS: dict[str, Callable[[int], Graph]] = {
+    "flowchart": build_flowchart,
+    "state": build_state_diagram,
+    "sequence": build_sequence_diagram,
+    "er": build_er_diagram,
+    "mindmap": build_mindmap,
+    "pie": build_pie_chart,
+    "journey": build_user_journey,
+    "requirement": build_requirement_diagram,
+}
+"""The generators, by diagram type."""
@@ -5,18 +5,27 @@ It also provides utility functions for loading data and converting text to snake
 
 Classes:
     Mermaid: Represents a Mermaid diagram.
+    RenderClient: Pooled HTTP client used to render diagrams.
+    RateLimiter: Token-bucket limiter for render requests.
 
 Functions:
     load(file_path): Load data from a file.
+    render_many(graphs, formats, max_workers): Render many diagrams at once.
     text_to_snake_case(text): Convert a string of text to snake case.
 """
 
 from enum import Enum
 
-from .__main__ import Mermaid, MermaidError, Position
+from .__main__ import Encoding, Mermaid, MermaidError, Position
+from .batch import render_many
+from .cache import DiskCache, FreshnessPolicy, MemoryCache
+from .client import RenderClient, get_default_client, set_default_client
 from .configuration import Config
+from .exceptions import CircuitOpenError, RateLimitExceeded
 from .graph import Graph
 from .icon import Icon
+from .observe import EventType, RenderEvent
+from .ratelimit import RateLimiter
 from .style import Style
 from .utils import load, text_to_snake_case
 
@@ -35,12 +44,25 @@ class Direction(Enum):
 __all__ = [
     "Mermaid",
     "MermaidError",
+    "CircuitOpenError",
     "load",
     "Direction",
     "Graph",
     "Style",
     "Config",
+    "DiskCache",
+    "Encoding",
+    "EventType",
+    "FreshnessPolicy",
     "Icon",
+    "MemoryCache",
     "Position",
+    "RateLimiter",
+    "RateLimitExceeded",
+    "RenderClient",
+    "RenderEvent",
+    "get_default_client",
+    "set_default_client",
+    "render_many",
     "text_to_snake_case",
 ]
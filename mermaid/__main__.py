@@ -1,79 +1,28 @@
 import base64
-import os
+import json
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from pathlib import Path
 from typing import Optional, Union
 from urllib.parse import urlencode
 
-import requests
 from requests import Response
 
+from .cache import CacheEntry, RenderCache, RevalidatingCache, render_key
+from .client import RenderClient, get_default_client
+from .exceptions import MermaidError
 from .graph import Graph
+from .observe import EventType
 
+PAKO_THRESHOLD: int = 1024
+"""Script size in bytes above which scripts are deflate-compressed by default."""
 
-class MermaidError(Exception):
-    """
-    Custom exception for Mermaid API errors.
-
-    Parses error messages from the API response into a more readable form.
-    """
-
-    def __init__(self, status_code: int, response_text: str, url: str):
-        """
-        Initialize MermaidError with parsed error information.
-
-        Parameters:
-            status_code (int): The HTTP status code from the API response.
-            response_text (str): The response body from the API.
-            url (str): The URL that was requested.
-        """
-        self.status_code = status_code
-        self.response_text = response_text
-        self.url = url
-
-        # Parse the error message
-        readable_message = self._parse_error_message(status_code, response_text)
-        super().__init__(readable_message)
-
-    @staticmethod
-    def _parse_error_message(status_code: int, response_text: str) -> str:
-        """
-        Parse the error message from the API response into a readable form.
-
-        Parameters:
-            status_code (int): The HTTP status code.
-            response_text (str): The response body.
-
-        Returns:
-            str: A formatted error message.
-        """
-        # Build base error message
-        error_msg = f"Mermaid API Error [{status_code}]"
-
-        # Handle common status codes
-        status_messages = {
-            400: "Bad Request - Invalid diagram syntax or parameters",
-            401: "Unauthorized - Authentication required",
-            403: "Forbidden - Access denied",
-            404: "Not Found - Endpoint not available",
-            500: "Internal Server Error - Service error",
-            502: "Bad Gateway - Service unavailable",
-            503: "Service Unavailable - Please try again later",
-            504: "Gateway Timeout - Request took too long",
-        }
-
-        if status_code in status_messages:
-            error_msg += f": {status_messages[status_code]}"
-        else:
-            error_msg += f": HTTP {status_code} Error"
-
-        # Append response text if available and not too long
-        if response_text and len(response_text) < 500:
-            error_msg += f"\n\nDetails: {response_text}"
-        elif response_text:
-            error_msg += f"\n\nDetails: {response_text[:200]}..."
-
-        return error_msg
+CONTENT_TYPES: dict[str, str] = {
+    "svg": "image/svg+xml",
+    "img": "image/png",
+}
 
 
 class Position(Enum):
@@ -87,12 +36,31 @@ class Position(Enum):
     NONE = "none"
 
 
+class Encoding(Enum):
+    """
+    This class represents how a diagram script is encoded in the request URL.
+    """
+
+    BASE64 = "base64"
+    PAKO = "pako"
+
+
 class Mermaid:
     """
     This class represents a Mermaid diagram.
 
+    Rendering is lazy: nothing is requested from the Mermaid API until one of
+    `svg_response`, `img_response`, `to_svg`, `to_png` or `_repr_html_` is
+    used, and each format is fetched independently and memoized.
+
+    In lean mode only the rendered bodies are kept, or nothing at all when a
+    cache is set, instead of the full `requests.Response` objects with their
+    headers, request and connection state. The responses are then rebuilt
+    around the stored bodies on every access.
+
     Attributes:
-        _diagram (str): The base64 encoded string of the Mermaid diagram script.
+        _diagram (str): The encoded string of the Mermaid diagram script, either
+            URL-safe base64 or "pako:" followed by the deflated script.
         svg_response (Response): The response from the GET request to the Mermaid SVG API.
         img_response (Response): The response from the GET request to the Mermaid IMG API.
     """
@@ -104,6 +72,10 @@ class Mermaid:
         height: Optional[int] = None,
         scale: Optional[float] = None,
         position: Union[Position, str] = Position.NONE,
+        client: Optional[RenderClient] = None,
+        cache: Optional[RenderCache] = None,
+        encoding: Optional[Union[Encoding, str]] = None,
+        lean: bool = False,
     ):
         """
         The constructor for the Mermaid class.
@@ -115,6 +87,16 @@ class Mermaid:
             scale (Optional[float]): The scale of the SVG image.
                 Must be an float between 1 and 3, and one of height or width must be provided.
             position (Union[Position, str]): The position of the node in the Mermaid diagram.
+            client (Optional[RenderClient]): The client used to send requests.
+                Defaults to the shared module-level client.
+            cache (Optional[RenderCache]): The cache consulted before requesting a
+                render. A hit makes no network call at all.
+            encoding (Optional[Union[Encoding, str]]): How the script is encoded
+                in the URL. Defaults to base64 for scripts up to
+                `PAKO_THRESHOLD` bytes and to deflate ("pako") above.
+            lean (bool): Whether to keep only the rendered bodies rather than
+                the responses. With a cache, nothing is kept and every access
+                reads the cache.
         """
         if scale:
             assert 1 <= scale <= 3, "Scale must be between 1 and 3"
@@ -126,11 +108,34 @@ class Mermaid:
         self.__height = height if height else None
         self.__width = width if width else None
         self.__scale = scale if scale else None
+        self._client: Optional[RenderClient] = client
+        self._cache: Optional[RenderCache] = cache
+
+        script: str = graph if isinstance(graph, str) else graph.script
+        observed: bool = bool(self.client.observers)
+        if observed:
+            started: float = time.perf_counter()
+            self.client.emit(EventType.ENCODE_START, size=len(script))
+        self._diagram = self._get_encoded_script(script, encoding)
+        if observed:
+            self.client.emit(
+                EventType.ENCODE_END,
+                size=len(self._diagram),
+                duration=time.perf_counter() - started,
+            )
+        self._lean: bool = lean
+        self._responses: dict[str, Response] = {}
+        self._bodies: dict[str, bytes] = {}
 
-        self._diagram = self._get_encoded_script(
-            graph if isinstance(graph, str) else graph.script
-        )
-        self._make_request_to_mermaid()
+    @property
+    def svg_response(self) -> Response:
+        """The response from the Mermaid SVG API, fetched on first access."""
+        return self._get_response("svg")
+
+    @property
+    def img_response(self) -> Response:
+        """The response from the Mermaid IMG API, fetched on first access."""
+        return self._get_response("img")
 
     def _build_query_params(self, image_format: Optional[str] = None) -> str:
         """
@@ -162,10 +167,28 @@ class Mermaid:
         self.__position = position if isinstance(position, str) else position.value
 
     @staticmethod
-    def _get_encoded_script(script: str) -> str:
+    def _get_encoded_script(
+        script: str, encoding: Optional[Union[Encoding, str]] = Encoding.BASE64
+    ) -> str:
         # CRITICAL FIX: Explicit UTF-8 encoding before base64
         script_bytes = script.encode("utf-8")
 
+        if encoding is None:
+            encoding = (
+                Encoding.PAKO if len(script_bytes) > PAKO_THRESHOLD else Encoding.BASE64
+            )
+        encoding = Encoding(encoding)
+
+        if encoding == Encoding.PAKO:
+            # mermaid.ink inflates "pako:" payloads into a live-editor state
+            state = json.dumps(
+                {"code": script, "mermaid": {"theme": "default"}},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            compressed = zlib.compress(state.encode("utf-8"), 9)
+            return "pako:" + base64.urlsafe_b64encode(compressed).decode("ascii")
+
         # Use URL-safe base64 encoding (replaces + with -, / with _)
         encoded = base64.urlsafe_b64encode(script_bytes).decode("ascii")
         return encoded
@@ -183,53 +206,196 @@ class Mermaid:
             f'<div style="text-align:{self.__position}">{self.svg_response.text}</div>'
         )
 
-    def _make_request_to_mermaid(self) -> None:
+    def _build_path(self, endpoint: str) -> str:
         """
-        Make GET requests to the Mermaid SVG and IMG APIs using
-        the base64 encoded string of the Mermaid diagram script.
+        Build the path of the Mermaid API request for the given endpoint.
 
-        Raises:
-            MermaidError: If the API request fails.
+        Parameters:
+            endpoint (str): The API endpoint, either "svg" or "img".
+
+        Returns:
+            str: The path to request, relative to the server.
         """
-        mermaid_server_adress: str = os.getenv(
-            "MERMAID_INK_SERVER", "https://mermaid.ink"
-        )
+        image_format: Optional[str] = "png" if endpoint == "img" else None
 
-        svg_url = (
-            mermaid_server_adress
-            + "/svg/"
+        return (
+            f"/{endpoint}/"
             + self._diagram
             + "?"
-            + self._build_query_params()
+            + self._build_query_params(image_format=image_format)
         )
 
-        img_url = (
-            mermaid_server_adress
-            + "/img/"
-            + self._diagram
-            + "?"
-            + self._build_query_params(image_format="png")
+    @property
+    def client(self) -> RenderClient:
+        """The client used to send requests to the Mermaid API."""
+        return self._client if self._client is not None else get_default_client()
+
+    def _get_response(self, endpoint: str) -> Response:
+        """
+        Return the response of the given endpoint, requesting it on first use.
+
+        Parameters:
+            endpoint (str): The API endpoint, either "svg" or "img".
+
+        Raises:
+            MermaidError: If the API request fails.
+        """
+        if self._lean:
+            return self._get_lean_response(endpoint)
+        if endpoint not in self._responses:
+            self._responses[endpoint] = (
+                self._fetch(endpoint)
+                if self._cache is None
+                else self._fetch_cached(endpoint, self._cache)
+            )
+        return self._responses[endpoint]
+
+    def _get_lean_response(self, endpoint: str) -> Response:
+        """Return a response rebuilt around the stored body of an endpoint."""
+        body: Optional[bytes] = self._bodies.get(endpoint)
+        if body is None:
+            if self._cache is None:
+                response: Response = self._fetch(endpoint)
+                body = self._bodies[endpoint] = response.content
+            else:
+                response = self._fetch_cached(endpoint, self._cache)
+                body = response.content
+            response.close()
+        return _cached_response(
+            self.client.server + self._build_path(endpoint), body, endpoint
+        )
+
+    def _is_fetched(self, endpoint: str) -> bool:
+        return endpoint in self._responses or endpoint in self._bodies
+
+    def _fetch(self, endpoint: str) -> Response:
+        return self.client.get(self._build_path(endpoint))
+
+    def _fetch_cached(self, endpoint: str, cache: RenderCache) -> Response:
+        client: RenderClient = self.client
+        key: str = render_key(
+            self._diagram,
+            self.__width,
+            self.__height,
+            self.__scale,
+            "png" if endpoint == "img" else "svg",
+            ",".join(client.servers),
         )
+        if isinstance(cache, RevalidatingCache):
+            return self._fetch_revalidated(endpoint, cache, key)
+
+        url: str = client.server + self._build_path(endpoint)
+        body: Optional[bytes] = cache.get(key)
+        if body is not None:
+            if client.observers:
+                client.emit(EventType.CACHE_HIT, url=url, key=key)
+            return _cached_response(url, body, endpoint)
+
+        if client.observers:
+            client.emit(EventType.CACHE_MISS, url=url, key=key)
+        response: Response = self._fetch(endpoint)
+        cache.set(key, response.content)
+        return response
+
+    def _fetch_revalidated(
+        self, endpoint: str, cache: RevalidatingCache, key: str
+    ) -> Response:
+        """
+        Serve a render from a cache that keeps validators.
 
-        self.svg_response: Response = requests.get(svg_url)
-        if not self.svg_response.ok:
-            raise MermaidError(
-                self.svg_response.status_code, self.svg_response.text, svg_url
+        Stale entries are revalidated with a conditional GET, and a
+        `304 Not Modified` refreshes the entry without downloading its body.
+        """
+        client: RenderClient = self.client
+        path: str = self._build_path(endpoint)
+        url: str = client.server + path
+        entry: Optional[CacheEntry] = cache.lookup(key)
+        if entry is not None and (
+            cache.freshness is None or cache.freshness.is_fresh(entry)
+        ):
+            if client.observers:
+                client.emit(EventType.CACHE_HIT, url=url, key=key)
+            return _cached_response(url, entry.body, endpoint)
+
+        response: Response = client.get(
+            path, headers=entry.conditional_headers() if entry is not None else None
+        )
+        etag: Optional[str] = response.headers.get("ETag")
+        last_modified: Optional[str] = response.headers.get("Last-Modified")
+        if response.status_code == 304 and entry is not None:
+            if client.observers:
+                client.emit(EventType.CACHE_HIT, url=url, key=key, status=304)
+            cache.refresh(
+                key,
+                CacheEntry(
+                    entry.body, etag or entry.etag, last_modified or entry.last_modified
+                ),
             )
+            return _cached_response(url, entry.body, endpoint)
 
-        self.img_response: Response = requests.get(img_url)
-        if not self.img_response.ok:
-            raise MermaidError(
-                self.img_response.status_code, self.img_response.text, img_url
+        if client.observers:
+            client.emit(
+                EventType.CACHE_MISS, url=url, key=key, status=response.status_code
             )
+        cache.store(key, CacheEntry(response.content, etag, last_modified))
+        return response
+
+    def _make_request_to_mermaid(self, concurrent: bool = False) -> None:
+        """
+        Make GET requests to the Mermaid SVG and IMG APIs using
+        the base64 encoded string of the Mermaid diagram script.
+
+        Formats that were already fetched are not requested again.
+
+        Parameters:
+            concurrent (bool): Whether to send both requests at the same time
+                instead of one after the other.
+
+        Raises:
+            MermaidError: If the API request fails. When both requests fail,
+                the error of the SVG request is raised.
+        """
+        endpoints: list[str] = [
+            endpoint for endpoint in ("svg", "img") if not self._is_fetched(endpoint)
+        ]
+        if not concurrent or len(endpoints) < 2:
+            for endpoint in endpoints:
+                self._get_response(endpoint)
+            return
+
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+            futures = [
+                executor.submit(self._get_response, endpoint) for endpoint in endpoints
+            ]
+        for future in futures:
+            future.result()
+
+    def prefetch(self, concurrent: bool = True) -> None:
+        """
+        Fetch both the SVG and the PNG renderings now.
+
+        Parameters:
+            concurrent (bool): Whether to send both requests at the same time,
+                so the wait is the slower of the two rather than their sum.
+
+        Raises:
+            MermaidError: If the API request fails.
+        """
+        self._make_request_to_mermaid(concurrent=concurrent)
 
     def to_svg(self, path: Union[str, Path]) -> None:
         """
         Write the SVG response text to a file.
 
+        When the SVG was not fetched yet and no cache is set, it is streamed
+        straight to the file instead of being held in memory.
+
         Parameters:
             path (Union[str, Path]): The path of the file to write to.
         """
+        if self._can_stream("svg"):
+            self.client.download(self._build_path("svg"), path)
+            return
         with open(path, "w", encoding="utf-8") as file:
             file.write(self.svg_response.text)
 
@@ -237,12 +403,33 @@ class Mermaid:
         """
         Write the IMG response content to a file.
 
+        When the PNG was not fetched yet and no cache is set, it is streamed
+        straight to the file instead of being held in memory.
+
         Parameters:
             path (Union[str, Path]): The path of the file to write to.
         """
+        if self._can_stream("img"):
+            self.client.download(self._build_path("img"), path)
+            return
         with open(path, "wb") as file:
             file.write(self.img_response.content)
 
+    def _can_stream(self, endpoint: str) -> bool:
+        """Whether a format can be downloaded without keeping its response."""
+        return not self._is_fetched(endpoint) and self._cache is None
+
+
+def _cached_response(url: str, body: bytes, endpoint: str) -> Response:
+    """Build a successful response around a body served from a cache."""
+    response = Response()
+    response.status_code = 200
+    response.url = url
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = CONTENT_TYPES[endpoint]
+    response._content = body
+    return response
+
 
 try:
     from IPython import get_ipython
@@ -267,3 +454,6 @@ except ImportError:
     print(
         "Warning: IPython is not installed. Mermaidjs magic function is not available."
     )
+
+
+__all__ = ["Encoding", "Mermaid", "MermaidError", "Position"]
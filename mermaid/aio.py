@@ -0,0 +1,378 @@
+"""Asyncio module.
+
+This module provides an asyncio counterpart of `Mermaid`. Requests are sent
+with aiohttp when it is installed (`pip install mermaid-py[async]`), and
+otherwise through the synchronous `RenderClient` in the loop's executor.
+
+Classes:
+    AsyncRenderClient: Concurrency-bounded asyncio client for the Mermaid API.
+    AsyncMermaid: Represents a Mermaid diagram rendered with asyncio.
+
+Functions:
+    arender(graph, image_format): Render a diagram and return its content.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .__main__ import Mermaid, Position
+from .client import (
+    UNHEALTHY_STATUSES,
+    RenderClient,
+    RetryPolicy,
+    ServerPool,
+    ServerState,
+    get_default_client,
+)
+from .exceptions import CircuitOpenError, MermaidError
+from .graph import Graph
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - depends on the environment
+    aiohttp = None  # type: ignore[assignment]
+
+
+class AsyncRenderClient:
+    """AsyncRenderClient class.
+
+    This class sends Mermaid API requests from a running event loop. At most
+    `max_concurrency` requests are in flight at once, whichever transport is
+    used, and the rate limiter of the synchronous client, if any, applies.
+
+    With aiohttp, the settings of the synchronous client are applied too:
+    requests are balanced across the servers of its pool and fail over on
+    connection errors, time out after its timeout, and are retried under its
+    retry policy.
+
+    Attributes:
+        max_concurrency (int): The maximum number of concurrent requests.
+    """
+
+    def __init__(
+        self,
+        server: Optional[str] = None,
+        max_concurrency: int = 16,
+        client: Optional[RenderClient] = None,
+    ) -> None:
+        """Initialize a new AsyncRenderClient.
+
+        Args:
+            server (Optional[str]): The base URL of the mermaid.ink server.
+                Defaults to the server of the synchronous client.
+            max_concurrency (int): The maximum number of concurrent requests.
+            client (Optional[RenderClient]): The synchronous client whose
+                settings apply, and which sends the requests when aiohttp is
+                not installed. Defaults to a client for `server`, created on
+                first use, or to the shared client when no server is given.
+        """
+        self._server: Optional[str] = server
+        self._client: Optional[RenderClient] = client
+        self.max_concurrency: int = max_concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Any = None
+
+    @property
+    def client(self) -> RenderClient:
+        """The synchronous client whose settings apply to the requests."""
+        if self._client is None and self._server:
+            self._client = RenderClient(self._server)
+        return self._client if self._client is not None else get_default_client()
+
+    @property
+    def server(self) -> str:
+        """The base URL of the mermaid.ink server."""
+        return self._server if self._server else self.client.server
+
+    async def _bind_loop(self) -> asyncio.Semaphore:
+        """Create the loop-bound state on first use in the running loop.
+
+        The session of a previous loop is closed, as it cannot be used from
+        another loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._semaphore is None:
+            await self._close_stale_session()
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _close_stale_session(self) -> None:
+        """Close the aiohttp session opened in the previous loop, if any."""
+        session, self._session = self._session, None
+        if session is None or session.closed:
+            return
+        previous: Optional[asyncio.AbstractEventLoop] = self._loop
+        if previous is None or previous.is_closed():
+            # The connections died with their loop: this only marks the
+            # connector closed, without touching the closed loop.
+            await session.connector.close()
+        elif previous.is_running():
+            # The loop runs in another thread: close the session there.
+            asyncio.run_coroutine_threadsafe(session.close(), previous)
+        else:
+            # An idle loop, e.g. one left by `run_until_complete`, only
+            # closes its connections while it runs: run it in a worker thread.
+            await asyncio.get_running_loop().run_in_executor(
+                None, previous.run_until_complete, session.close()
+            )
+
+    async def get(self, path: str) -> bytes:
+        """Send a GET request for the given API path.
+
+        Args:
+            path (str): The path of the request, e.g. "/svg/<diagram>?width=100".
+
+        Returns:
+            bytes: The body of the successful response.
+
+        Raises:
+            MermaidError: If the API responds with an error status.
+        """
+        async with await self._bind_loop():
+            if aiohttp is None:
+                return await self._get_in_executor(path)
+            return await self._get_with_aiohttp(path)
+
+    async def _get_in_executor(self, path: str) -> bytes:
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, self.client.get, path)
+        return response.content
+
+    async def _get_with_aiohttp(self, path: str) -> bytes:
+        """Send a request with aiohttp, retrying transient failures."""
+        client: RenderClient = self.client
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+            )
+        retry: Optional[RetryPolicy] = client.retry
+        attempt: int = 0
+        failure: Optional[Exception] = None
+        while True:
+            attempt += 1
+            try:
+                url, response, body = await self._send_once(client, path)
+            except CircuitOpenError:
+                if failure is None:
+                    raise
+                raise failure from None
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as error:
+                if retry is None or attempt > retry.retries:
+                    raise
+                failure = error
+                await asyncio.sleep(retry.delay(attempt))
+                continue
+
+            if response.status < 400:
+                return body
+            rejected = MermaidError(
+                response.status, body.decode("utf-8", "replace"), url, attempt
+            )
+            if (
+                retry is None
+                or attempt > retry.retries
+                or response.status not in retry.statuses
+            ):
+                raise rejected
+            failure = rejected
+            await asyncio.sleep(retry.delay(attempt, response))
+
+    async def _send_once(
+        self, client: RenderClient, path: str
+    ) -> tuple[str, Any, bytes]:
+        """Send one attempt, failing over to other servers on connection errors.
+
+        Returns:
+            tuple[str, Any, bytes]: The URL, the response and its body.
+        """
+        pool: ServerPool = client.pool
+        timeout = _client_timeout(client.timeout)
+        tried: list[ServerState] = []
+        error: Optional[Exception] = None
+        while True:
+            if client.rate_limiter is not None:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, client.rate_limiter.acquire
+                )
+            try:
+                server: ServerState = pool.acquire(exclude=tried)
+            except CircuitOpenError:
+                if error is None:
+                    raise
+                raise error from None
+            tried.append(server)
+            url: str = server.url + path
+            try:
+                async with self._session.get(url, timeout=timeout) as response:
+                    body: bytes = await response.read()
+            except asyncio.TimeoutError:
+                pool.release(server, ok=False)
+                raise
+            except aiohttp.ClientConnectionError as connection_error:
+                pool.release(server, ok=False)
+                error = connection_error
+                continue
+            except BaseException:
+                pool.release(server, ok=False)
+                raise
+            pool.release(server, ok=response.status not in UNHEALTHY_STATUSES)
+            return url, response, body
+
+    async def close(self) -> None:
+        """Close the aiohttp session, if one was opened."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncRenderClient":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.close()
+
+
+def _client_timeout(timeout: Optional[Union[float, tuple[float, float]]]) -> Any:
+    """Translate the timeout of a `RenderClient` into an `aiohttp.ClientTimeout`.
+
+    As with requests, a single value bounds both connecting and every read
+    of the response, and None waits forever.
+    """
+    if timeout is None:
+        return aiohttp.ClientTimeout(total=None)
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
+
+class AsyncMermaid:
+    """AsyncMermaid class.
+
+    This class mirrors `Mermaid` for asyncio code: the same options are
+    accepted and each format is fetched on first use and memoized.
+    """
+
+    def __init__(
+        self,
+        graph: Union[Graph, str],
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        scale: Optional[float] = None,
+        position: Union[Position, str] = Position.NONE,
+        client: Optional[AsyncRenderClient] = None,
+    ) -> None:
+        """Initialize a new AsyncMermaid.
+
+        Args:
+            graph (Union[Graph, str]): The Mermaid diagram or its script.
+            width (Optional[int]): The width of the SVG image.
+            height (Optional[int]): The height of the SVG image.
+            scale (Optional[float]): The scale of the SVG image.
+                Must be an float between 1 and 3, and one of height or width must be provided.
+            position (Union[Position, str]): The position of the node in the Mermaid diagram.
+            client (Optional[AsyncRenderClient]): The client used to send requests.
+                Defaults to the shared module-level async client.
+        """
+        self._mermaid: Mermaid = Mermaid(graph, width, height, scale, position)
+        self._client: Optional[AsyncRenderClient] = client
+        self._bodies: dict[str, bytes] = {}
+
+    @property
+    def client(self) -> AsyncRenderClient:
+        """The client used to send requests to the Mermaid API."""
+        return self._client if self._client is not None else get_default_async_client()
+
+    async def _get_body(self, endpoint: str) -> bytes:
+        if endpoint not in self._bodies:
+            path: str = self._mermaid._build_path(endpoint)
+            self._bodies[endpoint] = await self.client.get(path)
+        return self._bodies[endpoint]
+
+    async def svg(self) -> str:
+        """Return the SVG rendering of the diagram."""
+        return (await self._get_body("svg")).decode("utf-8")
+
+    async def png(self) -> bytes:
+        """Return the PNG rendering of the diagram."""
+        return await self._get_body("img")
+
+    async def prefetch(self) -> None:
+        """Fetch both the SVG and the PNG renderings concurrently."""
+        await asyncio.gather(self._get_body("svg"), self._get_body("img"))
+
+    async def to_svg(self, path: Union[str, Path]) -> None:
+        """Write the SVG rendering to a file.
+
+        Args:
+            path (Union[str, Path]): The path of the file to write to.
+        """
+        svg: str = await self.svg()
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(svg)
+
+    async def to_png(self, path: Union[str, Path]) -> None:
+        """Write the PNG rendering to a file.
+
+        Args:
+            path (Union[str, Path]): The path of the file to write to.
+        """
+        png: bytes = await self.png()
+        with open(path, "wb") as file:
+            file.write(png)
+
+
+_default_async_client: Optional[AsyncRenderClient] = None
+
+
+def get_default_async_client() -> AsyncRenderClient:
+    """Return the module-level client shared by every `AsyncMermaid` object.
+
+    Returns:
+        AsyncRenderClient: The default async client, created on first use.
+    """
+    global _default_async_client
+    if _default_async_client is None:
+        _default_async_client = AsyncRenderClient()
+    return _default_async_client
+
+
+async def arender(
+    graph: Union[Graph, str],
+    image_format: str = "svg",
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    scale: Optional[float] = None,
+    client: Optional[AsyncRenderClient] = None,
+) -> Union[str, bytes]:
+    """Render a diagram and return its content.
+
+    Args:
+        graph (Union[Graph, str]): The Mermaid diagram or its script.
+        image_format (str): Either "svg" or "png".
+        width (Optional[int]): The width of the image.
+        height (Optional[int]): The height of the image.
+        scale (Optional[float]): The scale of the image.
+        client (Optional[AsyncRenderClient]): The client used to send requests.
+
+    Returns:
+        Union[str, bytes]: The SVG text or the PNG bytes.
+
+    Raises:
+        ValueError: If the format is not "svg" or "png".
+        MermaidError: If the API request fails.
+    """
+    mermaid = AsyncMermaid(graph, width, height, scale, client=client)
+    if image_format == "svg":
+        return await mermaid.svg()
+    if image_format == "png":
+        return await mermaid.png()
+    raise ValueError(f"Unsupported format '{image_format}', expected 'svg' or 'png'")
+
+
+__all__ = [
+    "AsyncMermaid",
+    "AsyncRenderClient",
+    "arender",
+    "get_default_async_client",
+]
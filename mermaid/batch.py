@@ -0,0 +1,127 @@
+"""Batch module.
+
+This module provides `render_many`, which renders many diagrams through a
+bounded pool of worker threads.
+
+Functions:
+    render_many(graphs, formats, max_workers): Render many diagrams at once.
+"""
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional, Union
+
+from requests import RequestException
+
+from .__main__ import Mermaid, Position
+from .cache import RenderCache
+from .client import RenderClient
+from .exceptions import MermaidError
+from .graph import Graph
+
+FORMAT_ENDPOINTS: dict[str, str] = {
+    "svg": "svg",
+    "png": "img",
+}
+
+RenderResult = tuple[int, Union[Mermaid, MermaidError, RequestException]]
+
+
+def _render(
+    mermaid: Mermaid, endpoints: list[str]
+) -> Union[Mermaid, MermaidError, RequestException]:
+    try:
+        for endpoint in endpoints:
+            mermaid._get_response(endpoint)
+    except (MermaidError, RequestException) as error:
+        return error
+    return mermaid
+
+
+def render_many(
+    graphs: Iterable[Union[Graph, str]],
+    formats: Iterable[str] = ("svg", "png"),
+    max_workers: int = 8,
+    ordered: bool = True,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    scale: Optional[float] = None,
+    position: Union[Position, str] = Position.NONE,
+    client: Optional[RenderClient] = None,
+    cache: Optional[RenderCache] = None,
+    lean: bool = False,
+) -> Iterator[RenderResult]:
+    """Render many diagrams through a bounded pool of worker threads.
+
+    Graphs are consumed lazily and at most `2 * max_workers` renders are in
+    flight at any time, so arbitrarily long iterables can be rendered with
+    bounded memory.
+
+    Args:
+        graphs (Iterable[Union[Graph, str]]): The diagrams to render.
+        formats (Iterable[str]): The formats to fetch for every diagram,
+            among "svg" and "png".
+        max_workers (int): The number of worker threads.
+        ordered (bool): Whether to yield results in input order. When False,
+            results are yielded as soon as they complete.
+        width (Optional[int]): The width of the rendered images.
+        height (Optional[int]): The height of the rendered images.
+        scale (Optional[float]): The scale of the rendered images.
+        position (Union[Position, str]): The position used by `_repr_html_`.
+        client (Optional[RenderClient]): The client used to send requests.
+        cache (Optional[RenderCache]): The cache consulted before every request.
+        lean (bool): Whether the `Mermaid` objects keep only the rendered
+            bodies rather than the responses.
+
+    Yields:
+        tuple[int, Union[Mermaid, MermaidError, RequestException]]: The index
+            of the diagram in `graphs` and either the rendered `Mermaid`
+            object or the error that made it fail. HTTP errors are captured
+            as `MermaidError` and transport failures as the underlying
+            `requests` exception, so one failure never aborts the batch.
+
+    Raises:
+        ValueError: If a format is not "svg" or "png".
+    """
+    endpoints: list[str] = []
+    for image_format in formats:
+        if image_format not in FORMAT_ENDPOINTS:
+            raise ValueError(
+                f"Unsupported format '{image_format}', expected 'svg' or 'png'"
+            )
+        endpoints.append(FORMAT_ENDPOINTS[image_format])
+
+    window: int = 2 * max_workers
+    in_flight: deque[tuple[int, Future]] = deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for index, graph in enumerate(graphs):
+            mermaid = Mermaid(
+                graph, width, height, scale, position, client, cache, lean=lean
+            )
+            in_flight.append((index, executor.submit(_render, mermaid, endpoints)))
+            if len(in_flight) >= window:
+                yield from _drain(in_flight, ordered, until=window - 1)
+        yield from _drain(in_flight, ordered, until=0)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _drain(
+    in_flight: deque[tuple[int, Future]], ordered: bool, until: int
+) -> Iterator[RenderResult]:
+    """Yield finished renders until at most `until` remain in flight."""
+    while len(in_flight) > until:
+        if ordered:
+            index, future = in_flight.popleft()
+            yield index, future.result()
+            continue
+
+        done, _ = wait([future for _, future in in_flight], return_when=FIRST_COMPLETED)
+        for item in [item for item in in_flight if item[1] in done]:
+            in_flight.remove(item)
+            yield item[0], item[1].result()
+
+
+__all__ = ["render_many"]
@@ -0,0 +1,514 @@
+"""Cache module.
+
+This module provides caches for rendered diagrams so that identical renders
+are served without a round trip to the Mermaid API.
+
+Classes:
+    CacheEntry: A cached body along with its HTTP validators.
+    FreshnessPolicy: How long cached entries are used before revalidation.
+    RenderCache: Interface shared by every render cache.
+    RevalidatingCache: Interface of caches that keep HTTP validators.
+    MemoryCache: In-process, byte-bounded LRU render cache.
+    DiskCache: Persistent, size-bounded, content-addressed render cache.
+
+Functions:
+    render_key(script, width, height, scale, image_format, server): Build a cache key.
+    default_cache_dir(): Return the per-user cache directory.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Protocol, Union, runtime_checkable
+
+_LOW_WATER: float = 0.9
+"""The share of `DiskCache.max_bytes` that an eviction brings the cache down to."""
+
+
+def render_key(
+    script: str,
+    width: Optional[int],
+    height: Optional[int],
+    scale: Optional[float],
+    image_format: str,
+    server: str,
+) -> str:
+    """Build the cache key of a render.
+
+    Args:
+        script (str): The (encoded) diagram script.
+        width (Optional[int]): The width of the image.
+        height (Optional[int]): The height of the image.
+        scale (Optional[float]): The scale of the image.
+        image_format (str): The rendered format, "svg" or "png".
+        server (str): The base URL of the server that renders the diagram.
+
+    Returns:
+        str: A hex SHA-256 digest identifying the render.
+    """
+    parts = [script, str(width), str(height), str(scale), image_format, server]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory of mermaid-py.
+
+    The `MERMAID_CACHE_DIR` environment variable takes precedence over the
+    platform default.
+
+    Returns:
+        Path: The cache directory, which may not exist yet.
+    """
+    if os.getenv("MERMAID_CACHE_DIR"):
+        return Path(os.environ["MERMAID_CACHE_DIR"])
+    if sys.platform == "win32":
+        base = Path(os.getenv("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / "mermaid-py"
+
+
+@dataclass
+class CacheEntry:
+    """CacheEntry class.
+
+    This class holds a cached body along with the validators needed to ask
+    the server whether it changed.
+
+    Attributes:
+        body (bytes): The rendered body.
+        etag (Optional[str]): The `ETag` header of the response.
+        last_modified (Optional[str]): The `Last-Modified` header of the
+            response.
+        stored_at (float): The `time.time()` at which the body was last
+            fetched or revalidated.
+    """
+
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    stored_at: float = field(default_factory=lambda: time.time())
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Return the headers of a conditional GET revalidating the entry.
+
+        Returns:
+            dict[str, str]: The `If-None-Match` and `If-Modified-Since`
+                headers, for the validators the entry has.
+        """
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class FreshnessPolicy:
+    """FreshnessPolicy class.
+
+    This class decides how long a cached render is served without asking
+    the server. Older entries are revalidated with a conditional GET, so a
+    server upgrade that changes the rendering is picked up, while an
+    unchanged render costs a `304 Not Modified` without a body.
+
+    Attributes:
+        max_age (float): How long an entry is fresh after it was fetched or
+            revalidated, in seconds.
+    """
+
+    max_age: float = 24 * 60 * 60.0
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Return whether an entry can be served without revalidation.
+
+        Args:
+            entry (CacheEntry): The cached entry.
+
+        Returns:
+            bool: True if the entry is younger than `max_age`.
+        """
+        return time.time() - entry.stored_at < self.max_age
+
+
+class RenderCache(Protocol):
+    """RenderCache interface.
+
+    Any object with these two methods can be passed as `Mermaid(cache=...)`.
+    """
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, body: bytes) -> None: ...
+
+
+@runtime_checkable
+class RevalidatingCache(RenderCache, Protocol):
+    """RevalidatingCache interface.
+
+    Caches with these methods also keep the validators of their entries.
+    `Mermaid` then revalidates the entries that `freshness` considers stale
+    instead of serving them forever. A `freshness` of None keeps every entry
+    fresh.
+    """
+
+    freshness: Optional[FreshnessPolicy]
+
+    def lookup(self, key: str) -> Optional[CacheEntry]: ...
+
+    def store(self, key: str, entry: CacheEntry) -> None: ...
+
+    def refresh(self, key: str, entry: CacheEntry) -> None: ...
+
+
+class MemoryCache:
+    """MemoryCache class.
+
+    This class keeps rendered bodies in process memory. It is bounded by the
+    total size of the bodies rather than by their count, so a few large PNGs
+    cannot exhaust memory, and evicts the least recently used entries first.
+    It is safe to share between threads.
+
+    Attributes:
+        max_bytes (int): The total byte budget of the cache.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that found nothing.
+        revalidations (int): The number of lookups that found a stale entry,
+            which is revalidated with the server instead of being served.
+        evictions (int): The number of entries removed to stay within budget.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        freshness: Optional[FreshnessPolicy] = None,
+    ) -> None:
+        """Initialize a new MemoryCache.
+
+        Args:
+            max_bytes (int): The total byte budget of the cache.
+            freshness (Optional[FreshnessPolicy]): When to revalidate entries.
+                None serves them until they are evicted.
+        """
+        self.max_bytes: int = max_bytes
+        self.freshness: Optional[FreshnessPolicy] = freshness
+        self.hits: int = 0
+        self.misses: int = 0
+        self.revalidations: int = 0
+        self.evictions: int = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._size: int = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """The total size in bytes of the cached bodies."""
+        return self._size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached body of a key and mark it as recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[bytes]: The cached body, or None on a miss.
+        """
+        entry: Optional[CacheEntry] = self._find(key, check_freshness=False)
+        return entry.body if entry is not None else None
+
+    def set(self, key: str, body: bytes) -> None:
+        """Store the body of a key, evicting old entries when over budget.
+
+        Args:
+            key (str): The cache key.
+            body (bytes): The rendered body.
+        """
+        self.store(key, CacheEntry(body))
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Return the cached entry of a key and mark it as recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[CacheEntry]: The cached entry, or None on a miss.
+        """
+        return self._find(key, check_freshness=True)
+
+    def _find(self, key: str, check_freshness: bool) -> Optional[CacheEntry]:
+        """Return the entry of a key, counting it as a hit, miss or revalidation."""
+        with self._lock:
+            entry: Optional[CacheEntry] = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if (
+                check_freshness
+                and self.freshness is not None
+                and not self.freshness.is_fresh(entry)
+            ):
+                self.revalidations += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def store(self, key: str, entry: CacheEntry) -> None:
+        """Store the entry of a key, evicting old entries when over budget.
+
+        Args:
+            key (str): The cache key.
+            entry (CacheEntry): The entry to store.
+        """
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            previous: Optional[CacheEntry] = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body)
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+                self.evictions += 1
+
+    def refresh(self, key: str, entry: CacheEntry) -> None:
+        """Replace the validators of an entry that the server revalidated.
+
+        Args:
+            key (str): The cache key.
+            entry (CacheEntry): The revalidated entry, with the same body.
+        """
+        self.store(key, entry)
+
+    def clear(self) -> None:
+        """Remove every entry of the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """DiskCache class.
+
+    This class stores rendered bodies on disk, one file per key. Files are
+    written to a temporary name and renamed into place, so concurrent
+    processes never observe a partial entry. When the total size exceeds
+    `max_bytes`, the least recently used entries are removed until it is
+    back under 90% of it, so that the next stores do not each scan the
+    directory again.
+
+    The validators of an entry are kept in a small hidden file next to its
+    body, so revalidating an entry never rewrites the body.
+
+    Attributes:
+        directory (Path): The directory holding the entries.
+        max_bytes (int): The total byte budget of the cache.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        freshness: Optional[FreshnessPolicy] = None,
+    ) -> None:
+        """Initialize a new DiskCache.
+
+        Args:
+            directory (Optional[Union[str, Path]]): The directory holding the
+                entries. Defaults to `default_cache_dir()`.
+            max_bytes (int): The total byte budget of the bodies.
+            freshness (Optional[FreshnessPolicy]): When to revalidate entries.
+                None serves them until they are evicted.
+        """
+        self.directory: Path = Path(directory) if directory else default_cache_dir()
+        self.max_bytes: int = max_bytes
+        self.freshness: Optional[FreshnessPolicy] = freshness
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._size: int = sum(size for _, _, size in self._entries())
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    @staticmethod
+    def _meta_path(path: Path) -> Path:
+        return path.with_name(f".{path.name}.meta")
+
+    def _entries(self) -> list[tuple[float, Path, int]]:
+        """Return (last use, path, size) for every entry of the cache."""
+        entries: list[tuple[float, Path, int]] = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, Path(entry.path), stat.st_size))
+        return entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached body of a key and mark it as recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[bytes]: The cached body, or None on a miss.
+        """
+        path: Path = self._path(key)
+        try:
+            body: bytes = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return body
+
+    def set(self, key: str, body: bytes) -> None:
+        """Store the body of a key, evicting old entries when over budget.
+
+        Args:
+            key (str): The cache key.
+            body (bytes): The rendered body.
+        """
+        if len(body) > self.max_bytes:
+            return
+        path: Path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        try:
+            replaced: int = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        self._write(path, body)
+
+        with self._lock:
+            self._size += len(body) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Return the cached entry of a key and mark it as recently used.
+
+        Entries stored with `set` have no validators and an unknown age, so
+        they are stale under any freshness policy.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[CacheEntry]: The cached entry, or None on a miss.
+        """
+        body: Optional[bytes] = self.get(key)
+        if body is None:
+            return None
+        try:
+            meta = json.loads(self._meta_path(self._path(key)).read_bytes())
+        except (FileNotFoundError, ValueError):
+            return CacheEntry(body, stored_at=0.0)
+        return CacheEntry(
+            body, meta.get("etag"), meta.get("last_modified"), meta["stored_at"]
+        )
+
+    def store(self, key: str, entry: CacheEntry) -> None:
+        """Store the entry of a key, evicting old entries when over budget.
+
+        Args:
+            key (str): The cache key.
+            entry (CacheEntry): The entry to store.
+        """
+        self.set(key, entry.body)
+        if self._path(key).exists():
+            self.refresh(key, entry)
+
+    def refresh(self, key: str, entry: CacheEntry) -> None:
+        """Replace the validators of an entry without rewriting its body.
+
+        Args:
+            key (str): The cache key.
+            entry (CacheEntry): The revalidated entry, with the same body.
+        """
+        meta: dict[str, object] = {
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "stored_at": entry.stored_at,
+        }
+        path: Path = self._meta_path(self._path(key))
+        path.parent.mkdir(exist_ok=True)
+        self._write(path, json.dumps(meta).encode("utf-8"))
+
+    @staticmethod
+    def _write(path: Path, content: bytes) -> None:
+        """Write a file atomically through a temporary file."""
+        descriptor, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries down to the low-water mark."""
+        entries = sorted(self._entries())
+        size: int = sum(entry_size for _, _, entry_size in entries)
+        if size <= self.max_bytes:
+            self._size = size
+            return
+        target: float = self.max_bytes * _LOW_WATER
+        for _, path, entry_size in entries:
+            if size <= target:
+                break
+            self._remove(path)
+            size -= entry_size
+        self._size = size
+
+    def _remove(self, path: Path) -> None:
+        """Remove the body of an entry and its validators."""
+        for entry_path in (path, self._meta_path(path)):
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """Remove every entry of the cache."""
+        with self._lock:
+            for _, path, _ in self._entries():
+                self._remove(path)
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+
+__all__ = [
+    "CacheEntry",
+    "DiskCache",
+    "FreshnessPolicy",
+    "MemoryCache",
+    "RenderCache",
+    "RevalidatingCache",
+    "default_cache_dir",
+    "render_key",
+]
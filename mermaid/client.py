@@ -0,0 +1,983 @@
+"""Client module.
+
+This module provides the RenderClient class used by `Mermaid` to talk to a
+mermaid.ink server, along with a process-wide default client.
+
+Classes:
+    RetryPolicy: When and how long to wait before retrying a failed render.
+    HedgePolicy: When to duplicate a slow render on another server.
+    BreakerState: The states of a circuit breaker.
+    CircuitBreaker: Fails fast on a server after consecutive failures.
+    ServerState: Load and circuit breaker of one mermaid.ink server.
+    ServerPool: Least-outstanding-requests balancer over several servers.
+    RenderClient: Pooled, keep-alive HTTP client for the Mermaid API.
+
+Functions:
+    get_default_client(): Return the shared module-level client.
+    set_default_client(client): Replace the shared module-level client.
+"""
+
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from .exceptions import CircuitOpenError, MermaidError
+from .observe import EventType, RenderEvent, RenderObserver
+from .ratelimit import RateLimiter
+
+DEFAULT_SERVER: str = "https://mermaid.ink"
+
+DEFAULT_TIMEOUT: tuple[float, float] = (10.0, 60.0)
+"""Default (connect, read) timeouts in seconds."""
+
+DEFAULT_CHUNK_SIZE: int = 64 * 1024
+"""Default size in bytes of the chunks written by `RenderClient.download`."""
+
+UNHEALTHY_STATUSES: frozenset[int] = frozenset({502, 503, 504})
+"""Statuses counted as a failure of the server rather than of the diagram."""
+
+
+@dataclass
+class RetryPolicy:
+    """RetryPolicy class.
+
+    This class decides whether a failed render is retried and how long to
+    wait first. Renders are plain GET requests, so they are always safe to
+    repeat; only transient failures are retried: connection errors, timeouts
+    and the statuses in `statuses`.
+
+    Attributes:
+        retries (int): The maximum number of retries after the first attempt.
+        backoff_factor (float): The base delay in seconds. The n-th retry waits
+            a random time between 0 and `backoff_factor * 2 ** (n - 1)`.
+        backoff_max (float): The maximum delay in seconds between attempts,
+            including delays requested with `Retry-After`.
+        statuses (frozenset[int]): The HTTP statuses considered transient.
+        respect_retry_after (bool): Whether to honor the `Retry-After` header.
+    """
+
+    retries: int = 3
+    backoff_factor: float = 0.5
+    backoff_max: float = 30.0
+    statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+    respect_retry_after: bool = True
+
+    def backoff(self, attempt: int) -> float:
+        """Return the jittered delay before the retry following `attempt`.
+
+        Args:
+            attempt (int): The number of the attempt that just failed.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        ceiling: float = min(self.backoff_max, self.backoff_factor * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def delay(self, attempt: int, response: Optional[Response] = None) -> float:
+        """Return the delay before the retry, honoring `Retry-After`.
+
+        Args:
+            attempt (int): The number of the attempt that just failed.
+            response (Optional[Response]): The failed response, if any.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        if self.respect_retry_after and response is not None:
+            retry_after: Optional[float] = _parse_retry_after(
+                response.headers.get("Retry-After")
+            )
+            if retry_after is not None:
+                return min(self.backoff_max, retry_after)
+        return self.backoff(attempt)
+
+
+@dataclass
+class HedgePolicy:
+    """HedgePolicy class.
+
+    This class decides when a request is hedged: if it has not completed
+    after the `percentile`-th percentile of recent request latencies, a
+    duplicate is sent to another server and the first successful response
+    is used. Hedging trades a few extra requests for a shorter tail.
+
+    Attributes:
+        percentile (float): The percentile of recent latencies, between 0
+            and 100, after which a request is hedged.
+        initial_delay (float): The delay used until `min_samples` latencies
+            were measured, in seconds.
+        min_samples (int): The number of latencies needed to use the
+            percentile.
+        window (int): The number of recent latencies kept.
+        min_delay (float): The shortest delay before hedging, in seconds.
+        max_workers (int): The number of threads sending hedged requests.
+    """
+
+    percentile: float = 95.0
+    initial_delay: float = 1.0
+    min_samples: int = 20
+    window: int = 200
+    min_delay: float = 0.0
+    max_workers: int = 32
+
+    def delay(self, latencies: Sequence[float]) -> float:
+        """Return how long to wait for a request before hedging it.
+
+        Args:
+            latencies (Sequence[float]): Recent request latencies, in seconds.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        if len(latencies) < max(1, self.min_samples):
+            return max(self.min_delay, self.initial_delay)
+        ordered: list[float] = sorted(latencies)
+        rank: int = math.ceil(self.percentile / 100 * len(ordered))
+        return max(self.min_delay, ordered[min(len(ordered), max(1, rank)) - 1])
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a `Retry-After` header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date: datetime = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+def _parse_servers(servers: Union[str, Sequence[str]]) -> tuple[str, ...]:
+    """Parse a server list given as a sequence or as comma-separated URLs.
+
+    Args:
+        servers (Union[str, Sequence[str]]): The base URLs of the servers.
+
+    Returns:
+        tuple[str, ...]: The base URLs, without trailing slashes.
+    """
+    if isinstance(servers, str):
+        servers = servers.split(",")
+    return tuple(server.strip().rstrip("/") for server in servers if server.strip())
+
+
+class BreakerState(Enum):
+    """The states of a `CircuitBreaker`."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """CircuitBreaker class.
+
+    This class stops sending requests to a server that keeps failing. It
+    opens after `failure_threshold` consecutive failures, so requests fail
+    fast instead of waiting for a timeout each. Once `cooldown` seconds have
+    passed, a single probe request is let through: its success closes the
+    breaker again and its failure keeps it open for another cooldown.
+
+    It is not thread-safe by itself; `ServerPool` calls it under its lock.
+
+    Attributes:
+        failure_threshold (int): The consecutive failures that open it.
+        cooldown (float): How long it stays open before a probe, in seconds.
+        failures (int): The current number of consecutive failures.
+        opened_at (float): The `time.monotonic()` time at which it last opened.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0) -> None:
+        """Initialize a new, closed CircuitBreaker.
+
+        Args:
+            failure_threshold (int): The consecutive failures that open it.
+            cooldown (float): How long it stays open before a probe, in seconds.
+        """
+        self.failure_threshold: int = failure_threshold
+        self.cooldown: float = cooldown
+        self.failures: int = 0
+        self.opened_at: float = 0.0
+        self._open: bool = False
+        self._probing: bool = False
+
+    @property
+    def state(self) -> BreakerState:
+        """The current state of the breaker."""
+        if not self._open:
+            return BreakerState.CLOSED
+        if self._probing or time.monotonic() >= self.opened_at + self.cooldown:
+            return BreakerState.HALF_OPEN
+        return BreakerState.OPEN
+
+    @property
+    def available(self) -> bool:
+        """Whether a request may be sent now."""
+        if not self._open:
+            return True
+        return not self._probing and self.state is BreakerState.HALF_OPEN
+
+    def on_request(self) -> None:
+        """Record that a request is sent; the first one after a cooldown is a probe."""
+        if self._open:
+            self._probing = True
+
+    def on_success(self) -> None:
+        """Record a successful request and close the breaker."""
+        self.failures = 0
+        self._open = False
+        self._probing = False
+
+    def on_failure(self) -> None:
+        """Record a failed request, opening the breaker if needed."""
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self._open = True
+            self._probing = False
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class ServerState:
+    """ServerState class.
+
+    This class holds the load and the circuit breaker of one server of a
+    `ServerPool`.
+
+    Attributes:
+        url (str): The base URL of the server.
+        breaker (CircuitBreaker): The circuit breaker of the server.
+        outstanding (int): The number of requests currently sent to it.
+    """
+
+    url: str
+    breaker: CircuitBreaker
+    outstanding: int = 0
+
+    @property
+    def state(self) -> BreakerState:
+        """The state of the circuit breaker of the server."""
+        return self.breaker.state
+
+
+class ServerPool:
+    """ServerPool class.
+
+    This class balances requests across several mermaid.ink servers. Each
+    request goes to an available server with the fewest outstanding
+    requests, ties being broken round-robin. Every server has a
+    `CircuitBreaker` fed with the outcome of its requests: connection
+    errors, timeouts and gateway errors count as failures. Servers whose
+    breaker is open are skipped, and a server due for a probe is preferred
+    so that it is re-admitted as soon as it recovers. The breaker of a
+    pool with a single server only reports its health: there is no other
+    server to send the requests to, so they are never blocked.
+
+    Attributes:
+        servers (list[ServerState]): The state of every server of the pool.
+    """
+
+    def __init__(
+        self,
+        servers: Union[str, Sequence[str]],
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+    ) -> None:
+        """Initialize a new ServerPool.
+
+        Args:
+            servers (Union[str, Sequence[str]]): The base URLs of the servers,
+                as a sequence or as comma-separated URLs.
+            failure_threshold (int): The consecutive failures that open the
+                breaker of a server.
+            cooldown (float): How long a breaker stays open before a probe,
+                in seconds.
+
+        Raises:
+            ValueError: If no server is given.
+        """
+        urls: tuple[str, ...] = _parse_servers(servers)
+        if not urls:
+            raise ValueError("At least one server is required")
+        self.servers: list[ServerState] = [
+            ServerState(url, CircuitBreaker(failure_threshold, cooldown))
+            for url in urls
+        ]
+        self._next: int = 0
+        self._lock = threading.Lock()
+
+    @property
+    def urls(self) -> tuple[str, ...]:
+        """The base URLs of the servers of the pool."""
+        return tuple(server.url for server in self.servers)
+
+    def states(self) -> dict[str, BreakerState]:
+        """Return the breaker state of every server, e.g. for health checks.
+
+        Returns:
+            dict[str, BreakerState]: The state of each server, by base URL.
+        """
+        with self._lock:
+            return {server.url: server.state for server in self.servers}
+
+    def acquire(self, exclude: Sequence[ServerState] = ()) -> ServerState:
+        """Pick the server of the next request and count it as outstanding.
+
+        Args:
+            exclude (Sequence[ServerState]): Servers that must not be picked,
+                e.g. those that already failed the current request.
+
+        Returns:
+            ServerState: The chosen server. It must be passed to `release`
+                once the request completes.
+
+        Raises:
+            CircuitOpenError: If the breaker of every candidate is open.
+        """
+        with self._lock:
+            single: bool = len(self.servers) == 1
+            candidates: list[ServerState] = [
+                server
+                for server in self.servers
+                if server not in exclude and (single or server.breaker.available)
+            ]
+            if not candidates:
+                raise CircuitOpenError(
+                    "The circuit breaker of every server is open: "
+                    + ", ".join(self.urls)
+                )
+            probes: list[ServerState] = [
+                server
+                for server in candidates
+                if server.state is BreakerState.HALF_OPEN
+            ]
+            if probes:
+                candidates = probes
+            start: int = self._next % len(candidates)
+            self._next += 1
+            candidates = candidates[start:] + candidates[:start]
+
+            chosen = min(candidates, key=lambda server: server.outstanding)
+            chosen.breaker.on_request()
+            chosen.outstanding += 1
+            return chosen
+
+    def release(self, server: ServerState, ok: bool) -> None:
+        """Record the outcome of a request sent with `acquire`.
+
+        Args:
+            server (ServerState): The server returned by `acquire`.
+            ok (bool): Whether the server handled the request.
+        """
+        with self._lock:
+            server.outstanding -= 1
+            if ok:
+                server.breaker.on_success()
+            else:
+                server.breaker.on_failure()
+
+    def __len__(self) -> int:
+        return len(self.servers)
+
+
+class RenderClient:
+    """RenderClient class.
+
+    This class wraps a `requests.Session` whose connection pool is shared by
+    every render, so consecutive requests to the same server reuse an open
+    keep-alive connection instead of paying TCP and TLS setup each time.
+
+    Several servers can be given, in which case requests are balanced across
+    them by a `ServerPool` and a request that cannot connect to one server
+    fails over to the next. Each server has a circuit breaker, so a server
+    that keeps failing is skipped instead of slowing every render down.
+
+    Concurrent requests for the same URL are coalesced: the first caller
+    sends the request and every other caller waits for, and shares, its
+    response or its error.
+
+    With a `HedgePolicy` and several servers, a request that is slower than
+    usual is duplicated on another server; the first successful response
+    wins and the other one is discarded.
+
+    Observers registered on the client receive a `RenderEvent` for every
+    step of a render. Without observers, no event is built.
+
+    Attributes:
+        session (requests.Session): The session used to send requests.
+        coalesced (int): The number of calls served by another in-flight call.
+        observers (list[RenderObserver]): The callables receiving render events.
+        hedged (int): The number of requests duplicated on another server.
+        hedge_wins (int): The number of hedged requests won by the duplicate.
+    """
+
+    def __init__(
+        self,
+        server: Optional[Union[str, Sequence[str]]] = None,
+        session: Optional[requests.Session] = None,
+        pool_connections: int = 4,
+        pool_maxsize: int = 16,
+        pool_block: bool = False,
+        timeout: Optional[Union[float, tuple[float, float]]] = DEFAULT_TIMEOUT,
+        retry: Optional[RetryPolicy] = None,
+        coalesce: bool = True,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        observers: Optional[Sequence[RenderObserver]] = None,
+        hedge: Optional[HedgePolicy] = None,
+    ) -> None:
+        """Initialize a new RenderClient.
+
+        Args:
+            server (Optional[Union[str, Sequence[str]]]): The base URL of the
+                mermaid.ink server, or several of them as a sequence or as
+                comma-separated URLs. When not provided, the
+                `MERMAID_INK_SERVER` environment variable, which accepts the
+                same syntax, is read on every request, falling back to
+                https://mermaid.ink.
+            session (Optional[requests.Session]): An existing session to use.
+                When provided, the pool options below are ignored.
+            pool_connections (int): The number of per-host pools to keep.
+            pool_maxsize (int): The maximum number of connections kept alive
+                per host.
+            pool_block (bool): Whether to block when all the connections of a
+                host are busy instead of opening a throwaway connection.
+            timeout (Optional[Union[float, tuple[float, float]]]): The connect
+                and read timeouts in seconds, or one value for both. None
+                waits forever.
+            retry (Optional[RetryPolicy]): The policy used to retry transient
+                failures. None sends every request once.
+            coalesce (bool): Whether concurrent requests for the same URL share
+                a single in-flight request.
+            failure_threshold (int): The consecutive failures, timeouts or
+                gateway errors that open the circuit breaker of a server.
+            cooldown (float): How long a breaker stays open before a probe
+                request is let through, in seconds.
+            rate_limiter (Optional[RateLimiter]): The limiter every request,
+                retries included, must go through. It can be shared by
+                several clients.
+            observers (Optional[Sequence[RenderObserver]]): The callables
+                receiving a `RenderEvent` for every step of a render.
+            hedge (Optional[HedgePolicy]): The policy used to duplicate slow
+                requests on another server. It only applies with several
+                servers. None never hedges.
+        """
+        self._servers: tuple[str, ...] = _parse_servers(server) if server else ()
+        self.failure_threshold: int = failure_threshold
+        self.cooldown: float = cooldown
+        self.rate_limiter: Optional[RateLimiter] = rate_limiter
+        self.observers: list[RenderObserver] = list(observers or ())
+        self.hedge: Optional[HedgePolicy] = hedge
+        self.hedged: int = 0
+        self.hedge_wins: int = 0
+        self._latencies: deque[float] = deque(maxlen=hedge.window if hedge else 1)
+        self._hedge_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pool: Optional[ServerPool] = None
+        self._pool_lock = threading.Lock()
+        self.timeout: Optional[Union[float, tuple[float, float]]] = timeout
+        self.retry: Optional[RetryPolicy] = retry
+        self.coalesce: bool = coalesce
+        self.coalesced: int = 0
+        self._in_flight: dict[str, Future] = {}
+        self._in_flight_lock = threading.Lock()
+        self.session: requests.Session = (
+            session
+            if session is not None
+            else self.create_session(pool_connections, pool_maxsize, pool_block)
+        )
+
+    @staticmethod
+    def create_session(
+        pool_connections: int = 4, pool_maxsize: int = 16, pool_block: bool = False
+    ) -> requests.Session:
+        """Create a session with a sized keep-alive connection pool.
+
+        Args:
+            pool_connections (int): The number of per-host pools to keep.
+            pool_maxsize (int): The maximum number of connections kept alive
+                per host.
+            pool_block (bool): Whether to block when the pool of a host is
+                exhausted.
+
+        Returns:
+            requests.Session: The configured session.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Connection"] = "keep-alive"
+        return session
+
+    def add_observer(self, observer: RenderObserver) -> None:
+        """Register a callable receiving a `RenderEvent` for every render step.
+
+        Args:
+            observer (RenderObserver): The observer to register.
+        """
+        self.observers = [*self.observers, observer]
+
+    def remove_observer(self, observer: RenderObserver) -> None:
+        """Unregister an observer added with `add_observer`.
+
+        Args:
+            observer (RenderObserver): The observer to unregister.
+
+        Raises:
+            ValueError: If the observer is not registered.
+        """
+        observers: list[RenderObserver] = list(self.observers)
+        observers.remove(observer)
+        self.observers = observers
+
+    def emit(self, type_: EventType, **fields: Any) -> None:
+        """Send an event to every observer.
+
+        Callers check `observers` first, so that no event is built when
+        nobody listens.
+
+        Args:
+            type_ (EventType): The kind of event.
+            **fields (Any): The attributes of the `RenderEvent`.
+        """
+        event = RenderEvent(type_, **fields)
+        for observer in self.observers:
+            observer(event)
+
+    @property
+    def servers(self) -> tuple[str, ...]:
+        """The base URLs of the mermaid.ink servers."""
+        if self._servers:
+            return self._servers
+        return _parse_servers(os.getenv("MERMAID_INK_SERVER", "")) or (DEFAULT_SERVER,)
+
+    @property
+    def server(self) -> str:
+        """The base URL of the first mermaid.ink server."""
+        return self.servers[0]
+
+    @property
+    def pool(self) -> ServerPool:
+        """The pool balancing requests across the servers.
+
+        It is rebuilt, and its breakers reset, when the servers change.
+        """
+        servers: tuple[str, ...] = self.servers
+        with self._pool_lock:
+            if self._pool is None or self._pool.urls != servers:
+                self._pool = ServerPool(servers, self.failure_threshold, self.cooldown)
+            return self._pool
+
+    def get(self, path: str, headers: Optional[dict[str, str]] = None) -> Response:
+        """Send a GET request for the given API path.
+
+        Transient failures are retried according to the retry policy, and
+        concurrent calls for the same path and headers share one request.
+
+        Args:
+            path (str): The path of the request, e.g. "/svg/<diagram>?width=100".
+            headers (Optional[dict[str, str]]): Extra request headers, e.g. the
+                validators of a conditional GET.
+
+        Returns:
+            Response: The successful response.
+
+        Raises:
+            MermaidError: If the API responds with an error status. Its
+                `attempts` attribute holds the number of requests sent.
+            CircuitOpenError: If the circuit breaker of every server is open.
+            RateLimitExceeded: If the rate limiter does not block and has no
+                token left.
+            requests.RequestException: If the server cannot be reached.
+        """
+        if not self.coalesce:
+            return self._send(path, headers=headers)
+
+        key: str = path if not headers else f"{path}\0{sorted(headers.items())}"
+        with self._in_flight_lock:
+            call: Optional[Future] = self._in_flight.get(key)
+            leader: bool = call is None
+            if call is None:
+                call = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return call.result()
+
+        try:
+            response: Response = self._send(path, headers=headers)
+        except BaseException as error:
+            call.set_exception(error)
+            raise
+        else:
+            call.set_result(response)
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+        return response
+
+    def _send(
+        self,
+        path: str,
+        stream: bool = False,
+        headers: Optional[dict[str, str]] = None,
+    ) -> Response:
+        """Send a GET request, retrying transient failures.
+
+        Open circuit breakers are not retried: when they open after a failed
+        attempt, that failure is raised instead.
+        """
+        pool: ServerPool = self.pool
+        attempt: int = 0
+        failure: Optional[Exception] = None
+        while True:
+            attempt += 1
+            try:
+                if self.hedge is not None and len(pool) > 1:
+                    server, response = self._send_hedged(
+                        pool, self.hedge, path, stream, headers, attempt
+                    )
+                else:
+                    server, response = self._send_once(
+                        pool, path, stream, headers, attempt
+                    )
+            except CircuitOpenError:
+                if failure is None:
+                    raise
+                raise failure from None
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if not self._can_retry(attempt):
+                    raise
+                failure = error
+                self._wait(attempt, url=getattr(error.request, "url", None))
+                continue
+
+            if response.ok:
+                return response
+            rejected = MermaidError(
+                response.status_code, response.text, server.url + path, attempt
+            )
+            if self._can_retry(attempt) and response.status_code in (
+                self.retry.statuses if self.retry else ()
+            ):
+                response.close()
+                failure = rejected
+                self._wait(attempt, response, server.url + path)
+                continue
+            raise rejected
+
+    def _send_once(
+        self,
+        pool: ServerPool,
+        path: str,
+        stream: bool = False,
+        headers: Optional[dict[str, str]] = None,
+        attempt: int = 1,
+        tried: Optional[list[ServerState]] = None,
+    ) -> tuple[ServerState, Response]:
+        """Send one attempt, failing over to other servers on connection errors.
+
+        Every server picked is appended to `tried`, which concurrent hedged
+        attempts share so that they go to different servers.
+        """
+        tried = [] if tried is None else tried
+        error: Optional[requests.ConnectionError] = None
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                server: ServerState = pool.acquire(exclude=tried)
+            except CircuitOpenError:
+                if error is None:
+                    raise
+                raise error from None
+            tried.append(server)
+            url: str = server.url + path
+            observed: bool = bool(self.observers)
+            timed: bool = observed or self.hedge is not None
+            sent: float = time.perf_counter() if timed else 0.0
+            if observed:
+                self.emit(EventType.REQUEST_SENT, url=url, attempt=attempt)
+            try:
+                response: Response = self.session.get(
+                    url, timeout=self.timeout, stream=stream, headers=headers
+                )
+            except requests.ConnectionError as connection_error:
+                pool.release(server, ok=False)
+                if observed:
+                    self.emit(
+                        EventType.ERROR,
+                        url=url,
+                        attempt=attempt,
+                        error=connection_error,
+                    )
+                error = connection_error
+                continue
+            except BaseException as request_error:
+                pool.release(server, ok=False)
+                if observed:
+                    self.emit(
+                        EventType.ERROR, url=url, attempt=attempt, error=request_error
+                    )
+                raise
+            pool.release(server, ok=response.status_code not in UNHEALTHY_STATUSES)
+            if self.hedge is not None and response.ok:
+                self._latencies.append(time.perf_counter() - sent)
+            if observed:
+                self._emit_response(url, attempt, response, sent, stream)
+            return server, response
+
+    def _send_hedged(
+        self,
+        pool: ServerPool,
+        hedge: HedgePolicy,
+        path: str,
+        stream: bool = False,
+        headers: Optional[dict[str, str]] = None,
+        attempt: int = 1,
+    ) -> tuple[ServerState, Response]:
+        """Send one attempt, duplicating it on another server if it is slow.
+
+        The first successful response wins. When the first to complete
+        fails, the other is waited for; when both fail, the outcome of the
+        original request is used. The loser is cancelled if it has not
+        started yet, and otherwise closed as soon as it completes.
+        """
+        tried: list[ServerState] = []
+        executor: ThreadPoolExecutor = self._hedge_executor(hedge)
+        primary: Future = executor.submit(
+            self._send_once, pool, path, stream, headers, attempt, tried
+        )
+        done, _ = wait([primary], timeout=hedge.delay(tuple(self._latencies)))
+        if done or not any(
+            server not in tried and server.breaker.available for server in pool.servers
+        ):
+            return primary.result()
+
+        with self._hedge_lock:
+            self.hedged += 1
+        secondary: Future = executor.submit(
+            self._send_once, pool, path, stream, headers, attempt, tried
+        )
+        winner: Optional[Future] = None
+        pending: set[Future] = {primary, secondary}
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next(
+                (
+                    future
+                    for future in (primary, secondary)
+                    if future in done
+                    and future.exception() is None
+                    and future.result()[1].ok
+                ),
+                None,
+            )
+        if winner is None:
+            winner = primary
+        loser: Future = secondary if winner is primary else primary
+        if not loser.cancel():
+            loser.add_done_callback(_close_response)
+        if winner is secondary:
+            with self._hedge_lock:
+                self.hedge_wins += 1
+        return winner.result()
+
+    def _hedge_executor(self, hedge: HedgePolicy) -> ThreadPoolExecutor:
+        with self._hedge_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=hedge.max_workers, thread_name_prefix="mermaid-hedge"
+                )
+            return self._executor
+
+    def _emit_response(
+        self, url: str, attempt: int, response: Response, sent: float, stream: bool
+    ) -> None:
+        """Emit the events of a received response."""
+        first_byte: float = response.elapsed.total_seconds()
+        self.emit(
+            EventType.FIRST_BYTE,
+            url=url,
+            attempt=attempt,
+            status=response.status_code,
+            duration=first_byte,
+            timestamp=time.time() - (time.perf_counter() - sent) + first_byte,
+        )
+        if not response.ok:
+            self.emit(
+                EventType.ERROR, url=url, attempt=attempt, status=response.status_code
+            )
+        elif not stream:
+            self.emit(
+                EventType.BYTES_RECEIVED,
+                url=url,
+                attempt=attempt,
+                status=response.status_code,
+                size=len(response.content),
+                duration=time.perf_counter() - sent,
+            )
+
+    def download(
+        self,
+        path: str,
+        destination: Union[str, Path],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """Stream the body of a GET request to a file.
+
+        The body is written chunk by chunk to a temporary file next to
+        `destination`, which is then renamed into place. Memory use does not
+        depend on the size of the body, and a failed download never leaves a
+        partial file behind. Downloads are retried like `get` but are never
+        coalesced.
+
+        Args:
+            path (str): The path of the request, e.g. "/img/<diagram>?type=png".
+            destination (Union[str, Path]): The path of the file to write to.
+            chunk_size (int): The size in bytes of the chunks to write.
+
+        Returns:
+            int: The number of bytes written.
+
+        Raises:
+            MermaidError: If the API responds with an error status.
+            CircuitOpenError: If the circuit breaker of every server is open.
+            requests.RequestException: If the server cannot be reached.
+        """
+        destination = Path(destination)
+        temp_path: Path = destination.with_name(
+            f".{destination.name}.{uuid.uuid4().hex}.tmp"
+        )
+        size: int = 0
+        started: float = time.perf_counter()
+        with self._send(path, stream=True) as response:
+            try:
+                with open(temp_path, "xb") as file:
+                    for chunk in response.iter_content(chunk_size):
+                        file.write(chunk)
+                        size += len(chunk)
+                os.replace(temp_path, destination)
+            except BaseException as error:
+                temp_path.unlink(missing_ok=True)
+                if self.observers:
+                    self.emit(EventType.ERROR, url=response.url, error=error)
+                raise
+        if self.observers:
+            self.emit(
+                EventType.BYTES_RECEIVED,
+                url=response.url,
+                status=response.status_code,
+                size=size,
+                duration=time.perf_counter() - started,
+            )
+        return size
+
+    def _can_retry(self, attempt: int) -> bool:
+        return self.retry is not None and attempt <= self.retry.retries
+
+    def _wait(
+        self,
+        attempt: int,
+        response: Optional[Response] = None,
+        url: Optional[str] = None,
+    ) -> None:
+        if self.retry is not None:
+            delay: float = self.retry.delay(attempt, response)
+            if self.observers:
+                self.emit(
+                    EventType.RETRY,
+                    url=url,
+                    attempt=attempt,
+                    status=response.status_code if response is not None else None,
+                    duration=delay,
+                )
+            time.sleep(delay)
+
+    def close(self) -> None:
+        """Close the session and release its pooled connections."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self) -> "RenderClient":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+def _close_response(future: Future) -> None:
+    """Close the response of a discarded hedged attempt, if it has one."""
+    if not future.cancelled() and future.exception() is None:
+        future.result()[1].close()
+
+
+_default_client: Optional[RenderClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> RenderClient:
+    """Return the module-level client shared by every `Mermaid` object.
+
+    Returns:
+        RenderClient: The default client, created on first use.
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = RenderClient()
+    return _default_client
+
+
+def set_default_client(client: Optional[RenderClient]) -> None:
+    """Replace the module-level client shared by every `Mermaid` object.
+
+    Args:
+        client (Optional[RenderClient]): The new default client. Passing None
+            resets it so that a fresh client is created on next use.
+    """
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+
+__all__ = [
+    "BreakerState",
+    "CircuitBreaker",
+    "HedgePolicy",
+    "RenderClient",
+    "RetryPolicy",
+    "ServerPool",
+    "ServerState",
+    "get_default_client",
+    "set_default_client",
+]
@@ -9,12 +9,12 @@ Classes:
     Link: Represents a link between entities in an ER diagram.
 """
 
-from typing import Optional
+from typing import Iterator, Optional
 
 from mermaid.configuration import Config
 from mermaid.erdiagram.entity import Entity
 from mermaid.erdiagram.link import LIST_CARDINALITIES, Link
-from mermaid.graph import Graph
+from mermaid.graph import Graph, ScriptWriter
 
 
 class ERDiagram(Graph):
@@ -44,20 +44,21 @@ class ERDiagram(Graph):
             links (Optional[list[Link]]): The links of the ER diagram.
             config (Optional[Config]): The configuration for the ER diagram.
         """
-        super().__init__(title, "", config)
+        super().__init__(title, config=config)
         self.entities: list[Entity] = entities if entities is not None else []
         self.links: list[Link] = links if links is not None else []
-        self._build_script()
 
-    def _build_script(self) -> None:
-        """Build the script of the ER diagram."""
-        super()._build_script()
-        script: str = "\nerDiagram"
+    def _write_diagram(self, writer: ScriptWriter) -> Iterator[None]:
+        """Write the entities and links of the ER diagram."""
+        writer.write("\nerDiagram")
         for entity in self.entities:
-            script += f"\n\t{entity}"
+            writer.write("\n\t")
+            writer.write_element(entity)
+            yield
         for link in self.links:
-            script += f"\n\t{link}"
-        self.script += script + "\n"
+            writer.write("\n\t", str(link))
+            yield
+        writer.write("\n")
 
 
 __all__ = ["ERDiagram", "Entity", "Link", "LIST_CARDINALITIES"]
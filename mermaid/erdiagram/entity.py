@@ -1,7 +1,9 @@
 from typing import Optional, Union
 
+from mermaid.graph import ScriptElement, ScriptWriter
 
-class Entity:
+
+class Entity(ScriptElement):
     """Entity class.
 
     This class represents an entity in an ER diagram.
@@ -11,6 +13,8 @@ class Entity:
         attributes (list[str]): The attributes of the entity.
     """
 
+    __slots__ = ("name", "attributes")
+
     def __init__(
         self, name: str, attributes: Optional[dict[str, Union[list[str], str]]] = None
     ) -> None:
@@ -25,10 +29,16 @@ class Entity:
             attributes if attributes is not None else {}
         )
 
-    def __str__(self) -> str:
-        string_attributes: str = self.build_attributes()
-        string: str = "".join([self.name, "{\n", string_attributes, "}"])
-        return string
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write the script of the entity and of its attributes.
+
+        Args:
+            writer (ScriptWriter): The writer to write to.
+        """
+        writer.write(self.name, "{\n")
+        for att_name, att_def in self.attributes.items():
+            writer.write(self._attribute_line(att_name, att_def))
+        writer.write("}")
 
     def update_attributes(self, attributes: dict[str, str]) -> None:
         """Update the attributes of the entity.
@@ -64,20 +74,19 @@ class Entity:
         Returns:
             str: The string representation of the attributes.
         """
-        string_attributes: str = ""
-        for att_name, att_def in self.attributes.items():
-            string: str = ""
-            if isinstance(att_def, str):
-                string = f"\t{att_def} {att_name}\n"
-            else:
-                if len(att_def) == 1:
-                    string = f"{att_def[0]} {att_name}\n"
-                elif len(att_def) == 2:
-                    if att_def[1] in ["PK", "FK", "UK"]:
-                        string = f"\t{att_def[0]} {att_name} {att_def[1]}\n"
-                    else:
-                        string = f'\t{att_def[0]} {att_name} "{att_def[1]}"\n'
-                else:
-                    string = f'\t{att_def[0]} {att_name} {att_def[1]} "{att_def[2]}"\n'
-            string_attributes += string
-        return string_attributes
+        return "".join(
+            self._attribute_line(att_name, att_def)
+            for att_name, att_def in self.attributes.items()
+        )
+
+    @staticmethod
+    def _attribute_line(att_name: str, att_def: Union[list[str], str]) -> str:
+        if isinstance(att_def, str):
+            return f"\t{att_def} {att_name}\n"
+        if len(att_def) == 1:
+            return f"{att_def[0]} {att_name}\n"
+        if len(att_def) == 2:
+            if att_def[1] in ["PK", "FK", "UK"]:
+                return f"\t{att_def[0]} {att_name} {att_def[1]}\n"
+            return f'\t{att_def[0]} {att_name} "{att_def[1]}"\n'
+        return f'\t{att_def[0]} {att_name} {att_def[1]} "{att_def[2]}"\n'
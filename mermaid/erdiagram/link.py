@@ -22,6 +22,8 @@ class Link:
         dotted (bool): Whether the link is dotted or not.
     """
 
+    __slots__ = ("origin", "end", "label", "left_symbol", "right_symbol", "dotted")
+
     def __init__(
         self,
         origin: Entity,
@@ -0,0 +1,105 @@
+"""Exceptions raised by mermaid-py."""
+
+import requests
+
+
+class MermaidError(Exception):
+    """
+    Custom exception for Mermaid API errors.
+
+    Parses error messages from the API response into a more readable form.
+    """
+
+    def __init__(
+        self, status_code: int, response_text: str, url: str, attempts: int = 1
+    ):
+        """
+        Initialize MermaidError with parsed error information.
+
+        Parameters:
+            status_code (int): The HTTP status code from the API response.
+            response_text (str): The response body from the API.
+            url (str): The URL that was requested.
+            attempts (int): The number of requests sent before giving up.
+        """
+        self.status_code = status_code
+        self.response_text = response_text
+        self.url = url
+        self.attempts = attempts
+
+        # Parse the error message
+        readable_message = self._parse_error_message(status_code, response_text)
+        super().__init__(readable_message)
+
+    @staticmethod
+    def _parse_error_message(status_code: int, response_text: str) -> str:
+        """
+        Parse the error message from the API response into a readable form.
+
+        Parameters:
+            status_code (int): The HTTP status code.
+            response_text (str): The response body.
+
+        Returns:
+            str: A formatted error message.
+        """
+        # Build base error message
+        error_msg = f"Mermaid API Error [{status_code}]"
+
+        # Handle common status codes
+        status_messages = {
+            400: "Bad Request - Invalid diagram syntax or parameters",
+            401: "Unauthorized - Authentication required",
+            403: "Forbidden - Access denied",
+            404: "Not Found - Endpoint not available",
+            429: "Too Many Requests - Rate limit exceeded",
+            500: "Internal Server Error - Service error",
+            502: "Bad Gateway - Service unavailable",
+            503: "Service Unavailable - Please try again later",
+            504: "Gateway Timeout - Request took too long",
+        }
+
+        if status_code in status_messages:
+            error_msg += f": {status_messages[status_code]}"
+        else:
+            error_msg += f": HTTP {status_code} Error"
+
+        # Append response text if available and not too long
+        if response_text and len(response_text) < 500:
+            error_msg += f"\n\nDetails: {response_text}"
+        elif response_text:
+            error_msg += f"\n\nDetails: {response_text[:200]}..."
+
+        return error_msg
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Raised without sending a request when every server is failing.
+
+    It derives from `requests.ConnectionError`, so it is handled like the
+    connection errors that opened the circuit breakers, but it is not retried.
+    """
+
+
+class RateLimitExceeded(requests.RequestException):
+    """
+    Raised without sending a request when the rate limiter has no token.
+
+    Attributes:
+        retry_after (float): The time, in seconds, until a token is available.
+    """
+
+    def __init__(self, retry_after: float):
+        """
+        Initialize RateLimitExceeded.
+
+        Parameters:
+            retry_after (float): The time, in seconds, until a token is
+                available.
+        """
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit exceeded, retry in {retry_after:.3f}s")
+
+
+__all__ = ["CircuitOpenError", "MermaidError", "RateLimitExceeded"]
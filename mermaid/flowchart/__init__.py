@@ -9,11 +9,11 @@ Classes:
     Link: Represents a link between nodes in a flowchart.
 """
 
-from typing import Optional, Union
+from typing import Iterator, Optional, Union
 
 from mermaid import Direction
 from mermaid.configuration import Config
-from mermaid.graph import Graph
+from mermaid.graph import Graph, ScriptWriter
 from mermaid.style import Style
 
 from .link import Link, LinkHead, LinkShape
@@ -50,7 +50,7 @@ class FlowChart(Graph):
             orientation (str): The orientation of the flowchart.
             config (Optional[Config]): The configuration for the flowchart.
         """
-        super().__init__(title, "", config)
+        super().__init__(title, config=config)
         self.orientation: str = (
             orientation if isinstance(orientation, str) else orientation.value
         )
@@ -59,19 +59,65 @@ class FlowChart(Graph):
         self.styles: set[Style] = set()
         for node in self.nodes:
             self.styles.update(node.styles)
-        self._build_script()
 
-    def _build_script(self) -> None:
-        super()._build_script()
-        script: str = f"\nflowchart {self.orientation}"
+    def add_node(self, node: Node) -> None:
+        """Add a node to the flowchart.
+
+        If the script is already built, only the lines of the node, and of
+        its styles not defined yet, are appended to it.
+
+        Args:
+            node (Node): The node to add.
+        """
+        styles: Optional[ScriptWriter] = self._cached_section("styles")
+        nodes: Optional[ScriptWriter] = self._cached_section("nodes")
+        # Bypass the observed list: the cached script is updated below.
+        list.append(self.nodes, node)
+        new_styles: list[Style] = [
+            style for style in node.styles if style not in self.styles
+        ]
+        self.styles.update(new_styles)
+        if styles is None or nodes is None:
+            return
+        for style in new_styles:
+            styles.write("\n\t", str(style))
+        nodes.write("\n\t")
+        nodes.write_element(node)
+
+    def add_link(self, link: Link) -> None:
+        """Add a link to the flowchart.
+
+        If the script is already built, only the line of the link is
+        appended to it.
+
+        Args:
+            link (Link): The link to add.
+        """
+        links: Optional[ScriptWriter] = self._cached_section("links")
+        list.append(self.links, link)
+        if links is not None:
+            links.write("\n\t", str(link))
+
+    def _write_diagram(self, writer: ScriptWriter) -> Iterator[None]:
+        # Updated in place: assigning it would invalidate the script.
+        self.styles.clear()
+        for node in self.nodes:
+            self.styles.update(node.styles)
+        writer.write(f"\nflowchart {self.orientation}")
+        styles: ScriptWriter = writer.section("styles")
         for style in self.styles:
-            script += f"\n\t{style}"
+            styles.write("\n\t", str(style))
 
+        nodes: ScriptWriter = writer.section("nodes")
         for node in self.nodes:
-            script += f"\n\t{node}"
+            nodes.write("\n\t")
+            nodes.write_element(node)
+            yield
+        links: ScriptWriter = writer.section("links")
         for link in self.links:
-            script += f"\n\t{link}"
-        self.script += script + "\n"
+            links.write("\n\t", str(link))
+            yield
+        writer.write("\n")
 
 
 __all__ = [
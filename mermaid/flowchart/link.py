@@ -58,6 +58,8 @@ class Link:
         message (str): The message of the link.
     """
 
+    __slots__ = ("origin", "end", "head_left", "head_right", "shape", "message")
+
     def __init__(
         self,
         origin: Node,
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from typing import Optional, Union
 
 from mermaid import Direction, text_to_snake_case
+from mermaid.graph import ScriptElement, ScriptWriter
 from mermaid.style import Style
 
 
@@ -45,7 +46,7 @@ HREF_TYPES: dict[str, str] = {
 }
 
 
-class Node:
+class Node(ScriptElement):
     """Node class.
 
     This class represents a node in a flowchart.
@@ -60,6 +61,17 @@ class Node:
         styles (list[Style]): The styles of the node.
     """
 
+    __slots__ = (
+        "id_",
+        "content",
+        "shape",
+        "href",
+        "href_type",
+        "sub_nodes",
+        "styles",
+        "direction",
+    )
+
     def __init__(
         self,
         id_: str,
@@ -94,34 +106,30 @@ class Node:
             direction if isinstance(direction, str) else direction.value
         )
 
-    def __str__(self) -> str:
-        """Return a string representation of the node.
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write the script of the node.
 
-        If the node has sub-nodes, it returns a string representation of a subgraph.
-        Otherwise, it returns a string representation of a single node.
+        If the node has sub-nodes, it writes a subgraph containing them.
+        Otherwise, it writes a single node.
 
-        Returns:
-            str: A string representation of the node.
+        Args:
+            writer (ScriptWriter): The writer to write to.
         """
-        string: str = ""
         if len(self.sub_nodes):
-            string = "\n".join(
-                [
-                    f'subgraph {self.id_} ["{self.content}"]',
-                    f"\tdirection {self.direction}",
-                    "\n".join([str(f"\t{node}") for node in self.sub_nodes]),
-                    "end",
-                ]
+            writer.write(
+                f'subgraph {self.id_} ["{self.content}"]',
+                f"\n\tdirection {self.direction}",
             )
+            for node in self.sub_nodes:
+                writer.write("\n\t")
+                writer.write_element(node)
+            writer.write("\nend")
         else:
-            string = "".join(
-                [self.id_, self.shape.start, f'"{self.content}"', self.shape.end]
+            writer.write(
+                self.id_, self.shape.start, f'"{self.content}"', self.shape.end
             )
             if self.href != "#":
-                string = "".join(
-                    [string, "\n", f'click {self.id_} "{self.href}" {self.href_type}']
-                )
+                writer.write(f'\nclick {self.id_} "{self.href}" {self.href_type}')
 
         for style in self.styles:
-            string += f"\n{self.id_}:::{style.name}"
-        return string
+            writer.write(f"\n{self.id_}:::{style.name}")
@@ -4,32 +4,375 @@ This module provides the Graph base class for creating and manipulating
 different types of diagrams such as flowcharts, ER diagrams, etc.
 
 Classes:
+    ObservedList: A list reporting its mutations.
+    ObservedDict: A dict reporting its mutations.
+    ScriptWriter: Collects the fragments of a script and joins them once.
+    ScriptElement: Base class of the elements that write nested content.
     Graph: Represents a base class for different types of diagrams.
 """
 
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    TextIO,
+    TypeVar,
+    Union,
+)
 
 from mermaid.configuration import Config
 
+_STREAM_FRAGMENTS: int = 4096
+"""The number of fragments buffered before a streamed chunk is flushed."""
+
+_T = TypeVar("_T")
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+
+
+class ScriptWriter:
+    """ScriptWriter class.
+
+    This class collects the fragments of a diagram script and joins them
+    once, so that building a script takes time linear in its length instead
+    of copying the partial script on every append. Elements containing other
+    elements write into the same writer, so nested content is never joined
+    more than once either.
+
+    A writer can also hold named sections: writers nested at a fixed place
+    of the script, which can still be appended to once the rest of the
+    script is written.
+    """
+
+    __slots__ = ("_fragments", "_sections")
+
+    def __init__(self) -> None:
+        """Initialize a new, empty ScriptWriter."""
+        self._fragments: list[Union[str, ScriptWriter]] = []
+        self._sections: Optional[dict[str, ScriptWriter]] = None
+
+    def write(self, *fragments: str) -> None:
+        """Append fragments to the script.
+
+        Args:
+            *fragments (str): The fragments, written in order.
+        """
+        self._fragments.extend(fragments)
+
+    def write_element(self, element: object) -> None:
+        """Append the script of an element.
+
+        A `ScriptElement` writes its fragments directly; any other element,
+        or one that overrides `__str__`, is written as its string.
+
+        Args:
+            element (object): The element to write.
+        """
+        if (
+            isinstance(element, ScriptElement)
+            and type(element).__str__ is ScriptElement.__str__
+        ):
+            element.write_script(self)
+        else:
+            self._fragments.append(str(element))
+
+    def section(self, name: str) -> "ScriptWriter":
+        """Start a named section at the current position of the script.
+
+        Args:
+            name (str): The name of the section.
+
+        Returns:
+            ScriptWriter: The writer of the section.
+        """
+        section = ScriptWriter()
+        self._fragments.append(section)
+        if self._sections is None:
+            self._sections = {}
+        self._sections[name] = section
+        return section
+
+    def get_section(self, name: str) -> Optional["ScriptWriter"]:
+        """Return a section started with `section`.
+
+        Args:
+            name (str): The name of the section.
+
+        Returns:
+            Optional[ScriptWriter]: The writer of the section, or None if
+                there is no section with that name.
+        """
+        return self._sections.get(name) if self._sections is not None else None
+
+    def getvalue(self) -> str:
+        """Return the script written so far.
+
+        Returns:
+            str: The script.
+        """
+        if self._sections is None:
+            return "".join(self._fragments)  # type: ignore[arg-type]
+        return "".join(
+            fragment if isinstance(fragment, str) else fragment.getvalue()
+            for fragment in self._fragments
+        )
+
+
+class _StreamWriter(ScriptWriter):
+    """A writer passing its content to a sink as it is written.
+
+    Once `_STREAM_FRAGMENTS` fragments are buffered, they are joined and
+    flushed to the sink, even in the middle of a nested element. Its
+    sections are written in place: a streamed script is written in order
+    and never appended to afterwards.
+    """
+
+    __slots__ = ("_sink",)
+
+    def __init__(self, sink: Callable[[str], Any]) -> None:
+        """Initialize a new StreamWriter.
+
+        Args:
+            sink (Callable[[str], Any]): Called with each chunk of the script.
+        """
+        super().__init__()
+        self._sink: Callable[[str], Any] = sink
+
+    def write(self, *fragments: str) -> None:
+        self._fragments.extend(fragments)
+        if len(self._fragments) >= _STREAM_FRAGMENTS:
+            self.flush()
+
+    def write_element(self, element: object) -> None:
+        super().write_element(element)
+        if len(self._fragments) >= _STREAM_FRAGMENTS:
+            self.flush()
+
+    def section(self, name: str) -> ScriptWriter:
+        return self
+
+    def flush(self) -> None:
+        """Pass the content written since the last flush to the sink."""
+        if self._fragments:
+            self._sink("".join(self._fragments))  # type: ignore[arg-type]
+            self._fragments.clear()
+
+
+class ScriptElement:
+    """ScriptElement class.
+
+    This class is the base of the elements whose script contains other
+    elements, such as subgraphs or composite states. They implement
+    `write_script`, and their string representation is built from it.
+    """
+
+    __slots__ = ()
+
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write the script of the element.
+
+        Args:
+            writer (ScriptWriter): The writer to write to.
+        """
+        raise NotImplementedError
+
+    def __str__(self) -> str:
+        writer = ScriptWriter()
+        self.write_script(writer)
+        return writer.getvalue()
+
+
+class ObservedList(list[_T]):
+    """ObservedList class.
+
+    A list calling `on_change` after every mutation, so that a diagram can
+    drop its cached script when its elements change.
+    """
+
+    __slots__ = ("on_change",)
+
+    def __init__(self, iterable: Iterable[_T], on_change: Callable[[], None]) -> None:
+        """Initialize a new ObservedList.
+
+        Args:
+            iterable (Iterable): The initial items.
+            on_change (Callable[[], None]): Called after every mutation.
+        """
+        super().__init__(iterable)
+        self.on_change: Callable[[], None] = on_change
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), (list(self), self.on_change)
+
+
+class ObservedDict(dict[_K, _V]):
+    """ObservedDict class.
+
+    A dict calling `on_change` after every mutation, so that a diagram can
+    drop its cached script when its data changes.
+    """
+
+    __slots__ = ("on_change",)
+
+    def __init__(self, mapping: Mapping[_K, _V], on_change: Callable[[], None]) -> None:
+        """Initialize a new ObservedDict.
+
+        Args:
+            mapping (Mapping): The initial items.
+            on_change (Callable[[], None]): Called after every mutation.
+        """
+        super().__init__(mapping)
+        self.on_change: Callable[[], None] = on_change
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), (dict(self), self.on_change)
+
+
+def _observe(cls: type, methods: tuple[str, ...]) -> None:
+    """Make the given methods of a container class call `on_change`."""
+
+    def wrap(name: str) -> Callable[..., Any]:
+        method: Callable[..., Any] = getattr(cls.__mro__[1], name)
+
+        def observed(self: Any, *args: Any, **kwargs: Any) -> Any:
+            result = method(self, *args, **kwargs)
+            self.on_change()
+            return result
+
+        observed.__name__ = name
+        observed.__doc__ = method.__doc__
+        return observed
+
+    for name in methods:
+        setattr(cls, name, wrap(name))
+
+
+_observe(
+    ObservedList,
+    (
+        "__setitem__",
+        "__delitem__",
+        "__iadd__",
+        "__imul__",
+        "append",
+        "extend",
+        "insert",
+        "pop",
+        "remove",
+        "clear",
+        "sort",
+        "reverse",
+    ),
+)
+_observe(
+    ObservedDict,
+    (
+        "__setitem__",
+        "__delitem__",
+        "__ior__",
+        "pop",
+        "popitem",
+        "setdefault",
+        "update",
+        "clear",
+    ),
+)
+
 
-@dataclass
 class Graph:
     """Graph base class.
 
     This class serves as a base for other classes representing different
     types of diagrams like `Flowchart`, `ERDiagram`, etc.
 
+    A graph given a script keeps it as is. Subclasses generate their script
+    from their elements instead: it is built the first time `script` is
+    read and cached until the diagram changes. Assigning an attribute, or
+    mutating one of its lists or dicts, drops the cached script; after
+    changing an element in place, call `invalidate`.
+
     Attributes:
         title (str): The title of the diagram.
         script (str): The main script to create the diagram.
         config (Optional[Config]): The configuration for the diagram.
     """
 
-    title: str
-    script: str
-    config: Optional[Config] = None
+    def __init__(
+        self,
+        title: str,
+        script: Optional[str] = None,
+        config: Optional[Config] = None,
+    ) -> None:
+        """Initialize a new Graph.
+
+        Args:
+            title (str): The title of the diagram.
+            script (Optional[str]): The script of the diagram. If not given,
+                the script is generated from the elements of the diagram.
+            config (Optional[Config]): The configuration for the diagram.
+        """
+        self._generated: bool = script is None
+        self._script: Optional[str] = script
+        self._writer: Optional[ScriptWriter] = None
+        self.title: str = title
+        self.config: Optional[Config] = config
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name.startswith("_") or name == "script" or not self._generated:
+            super().__setattr__(name, value)
+            return
+        if type(value) is list:
+            value = ObservedList(value, self.invalidate)
+        elif type(value) is dict:
+            value = ObservedDict(value, self.invalidate)
+        super().__setattr__(name, value)
+        self.invalidate()
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__qualname__}(title={self.title!r}, "
+            f"script={self.script!r}, config={self.config!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Graph) or other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.title, self.script, self.config) == (
+            other.title,
+            other.script,
+            other.config,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    @property
+    def script(self) -> str:
+        """The script of the diagram, built on first access."""
+        if self._script is None:
+            if self._writer is None:
+                self._build_script()
+            else:
+                self._script = self._writer.getvalue()
+        return self._script  # type: ignore[return-value]
+
+    @script.setter
+    def script(self, script: str) -> None:
+        self._script = script
+        self._writer = None
+
+    def invalidate(self) -> None:
+        """Drop the cached script, so that the next access rebuilds it.
+
+        Call it after changing an element of the diagram in place, such as
+        the content of a node. A graph given a script keeps it.
+        """
+        if self._generated:
+            self._script = None
+            self._writer = None
 
     def save(self, path: Optional[Union[Path, str]] = None) -> None:
         """Save the diagram to a file.
@@ -49,15 +392,118 @@ class Graph:
 
         if path.suffix not in [".mmd", ".mermaid"]:
             raise ValueError("File extension must be '.mmd' or '.mermaid'")
-        with open(path, "w") as file:
-            file.write(self.script)
+        with open(path, "w", encoding="utf-8") as file:
+            self.write(file)
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield the lines of the script, each ending with its newline.
+
+        The lines are generated from the top-level elements of the diagram
+        as they are consumed, so the whole script is not held in memory as
+        one string. The lines of a single element, such as the root level of
+        a mindmap with all its children, are all generated before the first
+        of them is yielded; `write` streams those too. A script already
+        built, or given to the graph, is split instead.
+
+        Yields:
+            str: The next line of the script.
+        """
+        pending: str = ""
+        for chunk in self._iter_chunks():
+            text: str = pending + chunk
+            end: int = text.rfind("\n") + 1
+            pending = text[end:]
+            if end:
+                for line in text[: end - 1].split("\n"):
+                    yield line + "\n"
+        if pending:
+            yield pending
+
+    def write(self, fp: TextIO) -> None:
+        """Write the script to a file-like object.
+
+        The script is written in chunks of about `_STREAM_FRAGMENTS`
+        fragments as it is generated, including inside nested elements, so
+        only one chunk is held in memory at a time. A script already built,
+        or given to the graph, is written at once.
+
+        Args:
+            fp (TextIO): The text stream to write to.
+        """
+        for _ in self._stream(fp.write):
+            pass
+
+    def _iter_chunks(self) -> Iterator[str]:
+        """Yield the chunks of the script flushed by each top-level element."""
+        chunks: list[str] = []
+        for _ in self._stream(chunks.append):
+            yield from chunks
+            chunks.clear()
+        yield from chunks
+
+    def _stream(self, sink: Callable[[str], Any]) -> Iterator[None]:
+        """Pass the script to `sink` in chunks, pausing after each top-level element."""
+        if self._script is not None or self._writer is not None:
+            sink(self.script)
+            return
+        writer = _StreamWriter(sink)
+        yield from self._write_script(writer)
+        writer.flush()
 
     def _build_script(self) -> None:
-        script: str = f"---\ntitle: {self.title}\n---"
+        # Fragments are joined in chunks as they are written, so that the
+        # many small strings of a large diagram are never all alive at once.
+        chunks: list[str] = []
+        writer = _StreamWriter(chunks.append)
+        for _ in self._write_script(writer):
+            pass
+        writer.flush()
+        self._script = "".join(chunks)
+
+    def _cached_section(self, name: str) -> Optional[ScriptWriter]:
+        """Return a section of the cached script to append new lines to.
+
+        A built script does not keep its fragments, which would take several
+        times its size, so the first append writes them again; the writer is
+        then kept for the next appends. It must be called before the new
+        element is added to the diagram, so that it is not written twice.
+
+        The joined script is dropped, so that the next read joins it again
+        with the new lines. Without a cached script, nothing is appended and
+        None is returned: the script is built in full on the next read.
+
+        Args:
+            name (str): The name of the section.
+
+        Returns:
+            Optional[ScriptWriter]: The writer of the section, or None.
+        """
+        if self._writer is None and self._script is not None and self._generated:
+            writer = ScriptWriter()
+            for _ in self._write_script(writer):
+                pass
+            self._writer = writer
+        section = self._writer.get_section(name) if self._writer else None
+        if section is None:
+            self.invalidate()
+        else:
+            self._script = None
+        return section
+
+    def _write_script(self, writer: ScriptWriter) -> Iterator[None]:
+        """Write the front matter and configuration, then the diagram."""
+        writer.write(f"---\ntitle: {self.title}\n---")
         if self.config:
-            script += "\n" + str(self.config)
-        script += self.script
-        self.script = script
+            writer.write("\n", str(self.config))
+        yield from self._write_diagram(writer)
+
+    def _write_diagram(self, writer: ScriptWriter) -> Iterator[None]:
+        """Write the diagram itself. Subclasses write it from their elements.
+
+        It yields after each top-level element, so that a streamed script
+        can be drained as it is written.
+        """
+        yield from ()
 
 
-__all__ = ["Graph"]
+__all__ = ["Graph", "ObservedDict", "ObservedList", "ScriptElement", "ScriptWriter"]
@@ -7,10 +7,10 @@ Classes:
     Mindmap: Represents a mindmap diagram.
 """
 
-from typing import Optional
+from typing import Iterator, Optional
 
 from mermaid.configuration import Config
-from mermaid.graph import Graph
+from mermaid.graph import Graph, ScriptWriter
 
 from .level import Level, LevelShape
 
@@ -42,21 +42,17 @@ class Mindmap(Graph):
             shape (Optional[LevelShape]): The shape of the level. Defaults to None.
             config (Optional[Config]): The configuration for the mindmap. Defaults to None.
         """
-        super().__init__(title, "", config)
+        super().__init__(title, config=config)
         self.levels: list[Level] = levels if levels else []
         self.shape: LevelShape = shape if shape else LevelShape.DEFAULT
-        self._build_script()
 
-    def _build_script(self) -> None:
-        super()._build_script()
-        script: str = "\nmindmap"
-        script += f"\n\t{self.shape.start}{self.title}{self.shape.end}"
-        script += "\n"
+    def _write_diagram(self, writer: ScriptWriter) -> Iterator[None]:
+        writer.write(
+            "\nmindmap", f"\n\t{self.shape.start}{self.title}{self.shape.end}", "\n"
+        )
         for level in self.levels:
-            script += f"{level}"
-
-        # script += '\n'
-        self.script += script
+            writer.write_element(level)
+            yield
 
 
 __all__ = ["Mindmap", "Level", "LevelShape"]
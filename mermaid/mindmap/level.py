@@ -13,6 +13,7 @@ from enum import Enum
 from typing import Optional
 
 from mermaid import text_to_snake_case
+from mermaid.graph import ScriptElement, ScriptWriter
 from mermaid.icon import Icon
 
 
@@ -43,9 +44,11 @@ class LevelShape(Enum):
         self.start: str = start
 
 
-class Level:
+class Level(ScriptElement):
     """Class for a level in a mindmap"""
 
+    __slots__ = ("id_", "name", "children", "shape", "icon")
+
     def __init__(
         self,
         name: str,
@@ -82,13 +85,21 @@ class Level:
         """
         self.children.append(child)
 
-    def __str__(self) -> str:
-        """String representation of the level
+    def write_script(self, writer: ScriptWriter, depth: int = 2) -> None:
+        """Write the level and its children, indented by depth
 
-        Returns:
-            str: The string representation of the level
+        Args:
+            writer (ScriptWriter): The writer to write to
+            depth (int, optional): The depth of the level. Defaults to 2.
         """
-        return self.list_str_to_str(self.list_str())
+        indent: str = "\t" * depth
+        writer.write(indent, f"{self.shape.start}{self.name}{self.shape.end}\n")
+        if not len(self.children):
+            if self.icon:
+                writer.write(indent, f"::icon({self.icon.type_} {self.icon.name})\n")
+            return
+        for child in self.children:
+            child.write_script(writer, depth + 1)
 
     def list_str(self) -> list:
         """List representation of the level
@@ -0,0 +1,189 @@
+"""Observe module.
+
+This module provides the events emitted while rendering a diagram, so that
+render time can be broken down into encoding, server time, download and
+cache lookups. Observers are registered on a `RenderClient`; when none is
+registered, no event is built at all.
+
+Every attempt of a request emits `REQUEST_SENT`, then `FIRST_BYTE` once the
+response headers arrive, and ends with either `BYTES_RECEIVED` or `ERROR`.
+
+Classes:
+    EventType: The kinds of render events.
+    RenderEvent: One event of a render.
+    OpenTelemetryObserver: Observer turning render events into OpenTelemetry spans.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Optional
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover - depends on the environment
+    trace = None  # type: ignore[assignment]
+
+
+class EventType(Enum):
+    """The kinds of events emitted while rendering a diagram."""
+
+    ENCODE_START = "encode_start"
+    ENCODE_END = "encode_end"
+    REQUEST_SENT = "request_sent"
+    FIRST_BYTE = "first_byte"
+    BYTES_RECEIVED = "bytes_received"
+    CACHE_HIT = "cache_hit"
+    CACHE_MISS = "cache_miss"
+    RETRY = "retry"
+    ERROR = "error"
+
+
+@dataclass
+class RenderEvent:
+    """RenderEvent class.
+
+    This class describes one step of a render. Only the attributes relevant
+    to its type are set.
+
+    Attributes:
+        type (EventType): The kind of event.
+        url (Optional[str]): The URL requested.
+        attempt (Optional[int]): The number of the attempt, starting at 1.
+        status (Optional[int]): The HTTP status of the response.
+        size (Optional[int]): The length of the script for `ENCODE_START`,
+            of the encoded script for `ENCODE_END`, or the number of bytes
+            received.
+        duration (Optional[float]): The time the step took, in seconds: the
+            encoding, the wait for the first byte, the whole request, or the
+            delay before a retry.
+        key (Optional[str]): The cache key looked up.
+        error (Optional[BaseException]): The error that failed the attempt.
+        timestamp (float): When the event happened, as a `time.time()` value.
+    """
+
+    type: EventType
+    url: Optional[str] = None
+    attempt: Optional[int] = None
+    status: Optional[int] = None
+    size: Optional[int] = None
+    duration: Optional[float] = None
+    key: Optional[str] = None
+    error: Optional[BaseException] = None
+    timestamp: float = field(default_factory=lambda: time.time())
+
+
+RenderObserver = Callable[[RenderEvent], None]
+"""An observer is any callable taking a `RenderEvent`."""
+
+
+_SPAN_STARTS: dict[EventType, str] = {
+    EventType.ENCODE_START: "encode",
+    EventType.REQUEST_SENT: "request",
+}
+_SPAN_ENDS: dict[EventType, str] = {
+    EventType.ENCODE_END: "encode",
+    EventType.BYTES_RECEIVED: "request",
+}
+
+
+def _nanoseconds(timestamp: float) -> int:
+    return int(timestamp * 1e9)
+
+
+def _attributes(event: RenderEvent) -> dict[str, Any]:
+    """Return the span attributes describing an event."""
+    attributes: dict[str, Any] = {
+        name: value
+        for name, value in (
+            ("http.url", event.url),
+            ("http.status_code", event.status),
+            ("mermaid.attempt", event.attempt),
+            ("mermaid.size", event.size),
+            ("mermaid.duration", event.duration),
+            ("mermaid.cache.key", event.key),
+        )
+        if value is not None
+    }
+    if event.error is not None:
+        attributes["exception.type"] = type(event.error).__name__
+        attributes["exception.message"] = str(event.error)
+    return attributes
+
+
+class OpenTelemetryObserver:
+    """OpenTelemetryObserver class.
+
+    This class turns render events into OpenTelemetry spans: a
+    "mermaid.encode" span per encoding and a "mermaid.request" span per
+    attempt, the latter carrying a "first_byte" event. Cache lookups,
+    retries and errors are added as events of the span current at the time.
+
+    It requires the `opentelemetry-api` package (`pip install
+    mermaid-py[otel]`) unless a tracer is given.
+
+    Attributes:
+        tracer (Any): The tracer the spans are started with.
+    """
+
+    def __init__(self, tracer: Optional[Any] = None) -> None:
+        """Initialize a new OpenTelemetryObserver.
+
+        Args:
+            tracer (Optional[Any]): The tracer to use. Defaults to the tracer
+                named "mermaid" of the global tracer provider.
+
+        Raises:
+            ImportError: If no tracer is given and opentelemetry-api is not
+                installed.
+        """
+        if tracer is None:
+            if trace is None:
+                raise ImportError(
+                    "OpenTelemetryObserver requires opentelemetry-api: "
+                    "pip install mermaid-py[otel]"
+                )
+            tracer = trace.get_tracer("mermaid")
+        self.tracer: Any = tracer
+        self._local = threading.local()
+
+    def _spans(self) -> dict[str, Any]:
+        spans: Optional[dict[str, Any]] = getattr(self._local, "spans", None)
+        if spans is None:
+            spans = self._local.spans = {}
+        return spans
+
+    def __call__(self, event: RenderEvent) -> None:
+        spans: dict[str, Any] = self._spans()
+        timestamp: int = _nanoseconds(event.timestamp)
+        attributes: dict[str, Any] = _attributes(event)
+        if event.type in _SPAN_STARTS:
+            name: str = _SPAN_STARTS[event.type]
+            spans[name] = self.tracer.start_span(
+                f"mermaid.{name}", start_time=timestamp, attributes=attributes
+            )
+        elif event.type in _SPAN_ENDS:
+            span: Optional[Any] = spans.pop(_SPAN_ENDS[event.type], None)
+            if span is not None:
+                span.set_attributes(attributes)
+                span.end(end_time=timestamp)
+        elif event.type is EventType.FIRST_BYTE and "request" in spans:
+            spans["request"].set_attributes(attributes)
+            spans["request"].add_event("first_byte", timestamp=timestamp)
+        else:
+            span = spans.pop("request", None) if event.type is EventType.ERROR else None
+            target: Optional[Any] = span if span is not None else self._current_span()
+            if target is not None:
+                target.add_event(
+                    event.type.value, attributes=attributes, timestamp=timestamp
+                )
+            if span is not None:
+                span.end(end_time=timestamp)
+
+    @staticmethod
+    def _current_span() -> Optional[Any]:
+        return trace.get_current_span() if trace is not None else None
+
+
+__all__ = ["EventType", "OpenTelemetryObserver", "RenderEvent", "RenderObserver"]
@@ -9,10 +9,10 @@ Classes:
     PieChart: Represents a PieChart diagram.
 """
 
-from typing import Optional
+from typing import Iterator, Optional
 
 from mermaid.configuration import Config
-from mermaid.graph import Graph
+from mermaid.graph import Graph, ScriptWriter
 
 
 class PieChart(Graph):
@@ -41,20 +41,19 @@ class PieChart(Graph):
             show_data (bool): Whether to show data on the pie chart. Defaults to False.
             config (Optional[Config]): The configuration for the pie chart. Defaults to None.
         """
-        super().__init__(title, "", config)
+        super().__init__(title, config=config)
         self.data: dict[str, float] = data
         self.show_data: bool = show_data
-        self._build_script()
 
-    def _build_script(self) -> None:
+    def _write_diagram(self, writer: ScriptWriter) -> Iterator[None]:
         """
-        Build the Mermaid diagram script for the pie chart.
+        Write the Mermaid diagram script of the pie chart.
         """
-        super()._build_script()
         showData: str = " showData" if self.show_data else ""
-        script: str = f"\npie{showData}"
+        writer.write(f"\npie{showData}")
 
         for key, value in self.data.items():
-            script += f'\n\t"{key}" : {value}'
+            writer.write(f'\n\t"{key}" : {value}')
+            yield
 
-        self.script += script + "\n"
+        writer.write("\n")
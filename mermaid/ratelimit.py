@@ -0,0 +1,190 @@
+"""Rate limit module.
+
+This module provides the token-bucket rate limiter that `RenderClient` can
+apply to every request it sends.
+
+Classes:
+    RateLimiter: Token-bucket limiter shared by threads and, optionally, processes.
+"""
+
+import os
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from .exceptions import RateLimitExceeded
+
+if sys.platform == "win32":  # pragma: no cover - depends on the platform
+    import msvcrt
+
+    def _lock(file: BinaryIO) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(file: BinaryIO) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock(file: BinaryIO) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(file: BinaryIO) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+_STATE = struct.Struct("<dd")
+"""The state of a shared bucket on disk: available tokens and update time."""
+
+
+class RateLimiter:
+    """RateLimiter class.
+
+    This class is a token bucket: it holds up to `burst` tokens, refilled at
+    `rate` tokens per second, and every request takes one. A request that
+    finds the bucket empty either waits for its token or is rejected with
+    `RateLimitExceeded`. Waiting requests reserve their token first, so they
+    are served in arrival order without holding a lock while they sleep.
+
+    The bucket is shared by every thread using the limiter. With a
+    `lock_file`, its state lives in that file instead and is shared by every
+    process using the same file.
+
+    Attributes:
+        rate (float): The sustained number of requests per second.
+        burst (int): The number of requests that can be sent at once.
+        block (bool): Whether to wait for a token rather than raise.
+        timeout (Optional[float]): The longest wait, in seconds, before
+            raising instead. None waits as long as needed.
+        lock_file (Optional[Path]): The file holding the shared state.
+        acquired (int): The number of requests let through.
+        delayed (int): The number of requests that had to wait.
+        rejected (int): The number of requests rejected.
+        total_wait (float): The total time spent waiting, in seconds.
+        max_wait (float): The longest single wait, in seconds.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        block: bool = True,
+        timeout: Optional[float] = None,
+        lock_file: Optional[Union[str, Path]] = None,
+    ) -> None:
+        """Initialize a new RateLimiter with a full bucket.
+
+        Args:
+            rate (float): The sustained number of requests per second.
+            burst (int): The number of requests that can be sent at once.
+            block (bool): Whether to wait for a token rather than raise.
+            timeout (Optional[float]): The longest wait, in seconds, before
+                raising instead. None waits as long as needed.
+            lock_file (Optional[Union[str, Path]]): A file through which the
+                bucket is shared with other processes.
+
+        Raises:
+            ValueError: If `rate` is not positive or `burst` is below 1.
+        """
+        if rate <= 0:
+            raise ValueError("The rate must be positive")
+        if burst < 1:
+            raise ValueError("The burst must be at least 1")
+        self.rate: float = rate
+        self.burst: int = burst
+        self.block: bool = block
+        self.timeout: Optional[float] = timeout
+        self.lock_file: Optional[Path] = Path(lock_file) if lock_file else None
+        self.acquired: int = 0
+        self.delayed: int = 0
+        self.rejected: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+        self._tokens: float = float(burst)
+        self._updated: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def mean_wait(self) -> float:
+        """The mean wait per request let through, in seconds."""
+        return self.total_wait / self.acquired if self.acquired else 0.0
+
+    def acquire(self) -> float:
+        """Take a token, waiting for one if the policy allows it.
+
+        Returns:
+            float: The time waited, in seconds.
+
+        Raises:
+            RateLimitExceeded: If no token is available and the limiter does
+                not block, or the wait would exceed `timeout`.
+        """
+        with self._lock:
+            if self.lock_file is None:
+                wait: float = self._reserve_local()
+            else:
+                wait = self._reserve_shared(self.lock_file)
+            if wait > 0:
+                self.delayed += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            self.acquired += 1
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def _reserve_local(self) -> float:
+        now: float = time.monotonic()
+        self._tokens, wait = self._take(self._tokens, now - self._updated)
+        self._updated = now
+        return wait
+
+    def _reserve_shared(self, lock_file: Path) -> float:
+        lock_file.parent.mkdir(parents=True, exist_ok=True)
+        descriptor: int = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o666)
+        with os.fdopen(descriptor, "r+b") as file:
+            _lock(file)
+            try:
+                now: float = time.time()
+                state: bytes = file.read(_STATE.size)
+                if len(state) == _STATE.size:
+                    tokens, updated = _STATE.unpack(state)
+                else:
+                    tokens, updated = float(self.burst), now
+                tokens, wait = self._take(tokens, max(0.0, now - updated))
+                file.seek(0)
+                file.write(_STATE.pack(tokens, now))
+                file.flush()
+            finally:
+                _unlock(file)
+        return wait
+
+    def _take(self, tokens: float, elapsed: float) -> tuple[float, float]:
+        """Refill the bucket and take a token from it.
+
+        The bucket may go below zero: a negative level is the tokens already
+        promised to waiting requests.
+
+        Returns:
+            tuple[float, float]: The new level of the bucket and the time to
+                wait for the token taken.
+
+        Raises:
+            RateLimitExceeded: If the token cannot be waited for.
+        """
+        tokens = min(float(self.burst), tokens + elapsed * self.rate)
+        wait: float = max(0.0, (1.0 - tokens) / self.rate)
+        if wait > 0 and (
+            not self.block or (self.timeout is not None and wait > self.timeout)
+        ):
+            self.rejected += 1
+            raise RateLimitExceeded(wait)
+        return tokens - 1.0, wait
+
+
+__all__ = ["RateLimiter"]
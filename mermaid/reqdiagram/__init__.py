@@ -10,10 +10,10 @@ Classes:
     Requirement: Represents a requirement in a requirement diagram.
 """
 
-from typing import Optional
+from typing import Iterator, Optional
 
 from mermaid.configuration import Config
-from mermaid.graph import Graph
+from mermaid.graph import Graph, ScriptWriter
 
 from .element import Element
 from .link import Link
@@ -50,25 +50,25 @@ class RequirementDiagram(Graph):
             links (list[Link]): The links between elements and requirements in the diagram.
             config (Optional[Config]): The configuration for the diagram. Defaults to None.
         """
-        super().__init__(title, "", config)
+        super().__init__(title, config=config)
         self.elements: list[Element] = elements if elements is not None else []
         self.requirements: list[Requirement] = (
             requirements if requirements is not None else []
         )
         self.links: list[Link] = links if links is not None else []
-        self._build_script()
 
-    def _build_script(self) -> None:
-        super()._build_script()
-        script: str = "\nrequirementDiagram\n"
+    def _write_diagram(self, writer: ScriptWriter) -> Iterator[None]:
+        writer.write("\nrequirementDiagram\n")
         for element in self.elements:
-            script += str(element) + "\n"
+            writer.write(str(element), "\n")
+            yield
         for requirement in self.requirements:
-            script += str(requirement) + "\n"
+            writer.write(str(requirement), "\n")
+            yield
 
         for link in self.links:
-            script += f"{link}\n"
-        self.script += script
+            writer.write(str(link), "\n")
+            yield
 
 
 __all__ = [
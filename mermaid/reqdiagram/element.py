@@ -13,6 +13,8 @@ class Element:
         Task: Represents a task in a section of a user's journey.
     """
 
+    __slots__ = ("name", "type_", "docRef")
+
     def __init__(self, name: str, type_: str, docRef: Optional[str] = None) -> None:
         """Initialize a new Element.
 
@@ -15,6 +15,8 @@ class Link:
         type_ (str): The type of the link.
     """
 
+    __slots__ = ("source", "destination", "type_")
+
     def __init__(
         self,
         source: Union[Element, Requirement],
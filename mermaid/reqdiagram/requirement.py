@@ -54,6 +54,8 @@ class Requirement:
         verifymethod (Union[str, VerifyMethod]): The verification method of the requirement.
     """
 
+    __slots__ = ("id_", "name", "text", "type_", "risk", "verifymethod")
+
     def __init__(
         self,
         id_: str,
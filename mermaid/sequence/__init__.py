@@ -1,8 +1,8 @@
+from typing import Iterator, Union
 from typing import Optional as Option
-from typing import Union
 
 from mermaid.configuration import Config
-from mermaid.graph import Graph
+from mermaid.graph import Graph, ScriptWriter
 from mermaid.sequence.element import Actor, Box, Note, NotePosition, Participant, Rect
 from mermaid.sequence.link import ArrowTypes, Link
 from mermaid.sequence.logic import Alt, Break, Critical, Loop, Optional, Parallel
@@ -51,19 +51,50 @@ class SequenceDiagram(Graph):
             auto_number (bool): Whether to automatically number the elements in the diagram. Defaults to False.
             config (Optional[Config]): The configuration for the sequence diagram. Defaults to None.
         """
-        super().__init__(title, "", config)
+        super().__init__(title, config=config)
         self.elements = elements
         self.auto_number = auto_number
-        self._build_script()
 
-    def _build_script(self) -> None:
-        super()._build_script()
-        script: str = "\nsequenceDiagram\n"
+    def add_element(
+        self,
+        element: Union[
+            Actor,
+            Participant,
+            Box,
+            Note,
+            Link,
+            Alt,
+            Break,
+            Critical,
+            Loop,
+            Optional,
+            Parallel,
+        ],
+    ) -> None:
+        """Add an element to the sequence diagram.
+
+        If the script is already built, only the lines of the element are
+        appended to it.
+
+        Args:
+            element (Union[Actor, Participant, Box, Note, Link, Alt, Break,
+                           Critical, Loop, Optional, Parallel]):
+                The element to add.
+        """
+        elements: Option[ScriptWriter] = self._cached_section("elements")
+        # Bypass the observed list: the cached script is updated below.
+        list.append(self.elements, element)
+        if elements is not None:
+            elements.write_element(element)
+
+    def _write_diagram(self, writer: ScriptWriter) -> Iterator[None]:
+        writer.write("\nsequenceDiagram\n")
         if self.auto_number:
-            script += "\tautonumber\n"
+            writer.write("\tautonumber\n")
+        elements: ScriptWriter = writer.section("elements")
         for element in self.elements:
-            script += str(element)
-        self.script += script
+            elements.write_element(element)
+            yield
 
 
 __all__ = [
@@ -3,6 +3,7 @@
 from enum import Enum
 from typing import Union
 
+from mermaid.graph import ScriptElement, ScriptWriter
 from mermaid.utils import text_to_snake_case
 
 
@@ -13,6 +14,8 @@ class Actor:
         name (str): Name of the actor.
     """
 
+    __slots__ = ("name", "id_")
+
     def __init__(self, name: str):
         """Initialize actor.
 
@@ -38,6 +41,8 @@ class Participant:
         name (str): Name of the participant.
     """
 
+    __slots__ = ("name", "id_")
+
     def __init__(self, name: str):
         """Initialize participant.
 
@@ -56,7 +61,7 @@ class Participant:
         return f"\tparticipant {self.id_} as {self.name}\n"
 
 
-class Box:
+class Box(ScriptElement):
     """Box class for mermaid sequence diagram.
 
     Args:
@@ -64,21 +69,22 @@ class Box:
         name (str): Name of the box.
     """
 
+    __slots__ = ("elements", "name")
+
     def __init__(self, name: str, elements: list[Union[Actor, Participant]]):
         self.elements = elements
         self.name = name
 
-    def __str__(self):
-        """Return box string.
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write box script.
 
-        Returns:
-            str: Box string.
+        Args:
+            writer (ScriptWriter): The writer to write to.
         """
-        box_str = f"\tbox {self.name}\n"
+        writer.write(f"\tbox {self.name}\n")
         for element in self.elements:
-            box_str += str(element)
-        box_str += "\tend\n"
-        return box_str
+            writer.write_element(element)
+        writer.write("\tend\n")
 
 
 class NotePosition(Enum):
@@ -101,6 +107,8 @@ class Note:
         actor (Union[Actor, Participant], optional): Actor or Participant to attach the note to. Defaults to None.
     """
 
+    __slots__ = ("note", "element", "position")
+
     def __init__(
         self,
         note: str,
@@ -137,7 +145,7 @@ class Note:
             return f"\tNote {self.position} {self.element.id_}: {self.note}\n"
 
 
-class Rect:
+class Rect(ScriptElement):
     """Rect class for mermaid sequence diagram.
 
     Args:
@@ -145,6 +153,8 @@ class Rect:
         color (tuple[int, ...]): RGB color tuple.
     """
 
+    __slots__ = ("elements", "color")
+
     def __init__(self, elements: list["Rect"], color: tuple[int, ...]) -> None:
         # FIXME: Add type hints for Link and Logic to include links and Logics
         # and avoid the circular import
@@ -159,14 +169,13 @@ class Rect:
         if len(color) != 3 or not all((x >= 0 and x <= 255) for x in color):
             raise ValueError("color must be a tuple of 3 integers between 0 and 255")
 
-    def __str__(self) -> str:
-        """Return rect string.
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write rect script.
 
-        Returns:
-            str: Rect string.
+        Args:
+            writer (ScriptWriter): The writer to write to.
         """
-        rect_str = f"\trect rgb({self.color[0]},{self.color[1]},{self.color[2]})\n"
+        writer.write(f"\trect rgb({self.color[0]},{self.color[1]},{self.color[2]})\n")
         for element in self.elements:
-            rect_str += str(element)
-        rect_str += "\tend\n"
-        return rect_str
+            writer.write_element(element)
+        writer.write("\tend\n")
@@ -41,6 +41,15 @@ class Link:
 
     """
 
+    __slots__ = (
+        "source",
+        "target",
+        "type_",
+        "activate_target",
+        "deactivate_target",
+        "message",
+    )
+
     def __init__(
         self,
         source: Union[Actor, Participant],
@@ -1,12 +1,13 @@
 from typing import Union
 
+from mermaid.graph import ScriptElement, ScriptWriter
 from mermaid.sequence.link import Link
 
 
-class Logic:
+class Logic(ScriptElement):
     """Logic class for mermaid sequence diagram."""
 
-    pass
+    __slots__ = ()
 
 
 class Loop(Logic):
@@ -17,6 +18,8 @@ class Loop(Logic):
         link (List[Link]): List of Link objects.
     """
 
+    __slots__ = ("condition", "link")
+
     def __init__(self, condition: str, link: list[Link]):
         """Initialize loop.
 
@@ -27,17 +30,16 @@ class Loop(Logic):
         self.condition = condition
         self.link = link
 
-    def __str__(self) -> str:
-        """Return loop string.
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write loop script.
 
-        Returns:
-            str: Loop string.
+        Args:
+            writer (ScriptWriter): The writer to write to.
         """
-        return (
-            f"\tloop {self.condition}\n"
-            + "".join([str(link) for link in self.link])
-            + "\tend\n"
-        )
+        writer.write(f"\tloop {self.condition}\n")
+        for link in self.link:
+            writer.write_element(link)
+        writer.write("\tend\n")
 
 
 class Alt(Logic):
@@ -48,6 +50,8 @@ class Alt(Logic):
         and list of Link objects.
     """
 
+    __slots__ = ("condition_links",)
+
     def __init__(self, condition_links: dict[str, list[Link]]):
         """Initialize alt.
 
@@ -57,27 +61,19 @@ class Alt(Logic):
         """
         self.condition_links = condition_links
 
-    def __str__(self) -> str:
-        """Return alt string.
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write alt script.
 
-        Returns:
-            str: Alt string.
+        Args:
+            writer (ScriptWriter): The writer to write to.
         """
-        alt_str = ""
-        n = 1
+        keyword = "alt"
         for condition, links in self.condition_links.items():
-            if n == 1:
-                alt_str += f"\talt {condition}\n" + "".join(
-                    [str(link) for link in links]
-                )
-                n += 1
-            else:
-                alt_str += f"\telse {condition}\n" + "".join(
-                    [str(link) for link in links]
-                )
-
-        alt_str += "\tend\n"
-        return alt_str
+            writer.write(f"\t{keyword} {condition}\n")
+            for link in links:
+                writer.write_element(link)
+            keyword = "else"
+        writer.write("\tend\n")
 
 
 class Optional(Logic):
@@ -88,6 +84,8 @@ class Optional(Logic):
         statements (List[Link]): List of Link objects.
     """
 
+    __slots__ = ("condition", "statements")
+
     def __init__(self, condition: str, statements: list[Link]) -> None:
         """Initialize loop.
 
@@ -98,20 +96,19 @@ class Optional(Logic):
         self.condition = condition
         self.statements = statements
 
-    def __str__(self) -> str:
-        """Return loop string.
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write opt script.
 
-        Returns:
-            str: Loop string.
+        Args:
+            writer (ScriptWriter): The writer to write to.
         """
-        return (
-            f"\topt {self.condition}\n"
-            + "".join([str(statement) for statement in self.statements])
-            + "\tend\n"
-        )
+        writer.write(f"\topt {self.condition}\n")
+        for statement in self.statements:
+            writer.write_element(statement)
+        writer.write("\tend\n")
 
 
-class Parallel:
+class Parallel(ScriptElement):
     """Parallel class for mermaid sequence diagram.
 
     Args:
@@ -119,6 +116,8 @@ class Parallel:
         condition and Link or Logic objects.
     """
 
+    __slots__ = ("condition_elements",)
+
     def __init__(self, condition_elements: dict[str, list[Union[Link, Logic]]]) -> None:
         """Initialize parallel.
 
@@ -128,26 +127,19 @@ class Parallel:
         """
         self.condition_elements = condition_elements
 
-    def __str__(self) -> str:
-        """Return parallel string.
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write parallel script.
 
-        Returns:
-            str: Parallel string.
+        Args:
+            writer (ScriptWriter): The writer to write to.
         """
-        parallel_str = ""
-        n = 1
+        keyword = "par"
         for condition, elements in self.condition_elements.items():
-            if n == 1:
-                parallel_str += f"\tpar {condition}\n" + "".join(
-                    [str(element) for element in elements]
-                )
-                n += 1
-            else:
-                parallel_str += f"\tand {condition}\n" + "".join(
-                    [str(element) for element in elements]
-                )
-        parallel_str += "\tend\n"
-        return parallel_str
+            writer.write(f"\t{keyword} {condition}\n")
+            for element in elements:
+                writer.write_element(element)
+            keyword = "and"
+        writer.write("\tend\n")
 
 
 class Critical(Logic):
@@ -158,6 +150,8 @@ class Critical(Logic):
         link (List[Link]): List of Link objects.
     """
 
+    __slots__ = ("condition", "statements", "optional_statements")
+
     def __init__(
         self,
         condition: str,
@@ -174,21 +168,20 @@ class Critical(Logic):
         self.statements = statements
         self.optional_statements = optional_statements
 
-    def __str__(self) -> str:
-        """Return loop string.
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write critical script.
 
-        Returns:
-            str: Loop string.
+        Args:
+            writer (ScriptWriter): The writer to write to.
         """
-        critical_str = f"\tcritical {self.condition}\n" + "".join(
-            [str(statement) for statement in self.statements]
-        )
+        writer.write(f"\tcritical {self.condition}\n")
+        for statement in self.statements:
+            writer.write_element(statement)
         for condition, statements in self.optional_statements.items():
-            critical_str += f"\toption {condition}\n" + "".join(
-                [str(statement) for statement in statements]
-            )
-        critical_str += "\tend\n"
-        return critical_str
+            writer.write(f"\toption {condition}\n")
+            for statement in statements:
+                writer.write_element(statement)
+        writer.write("\tend\n")
 
 
 class Break(Logic):
@@ -199,6 +192,8 @@ class Break(Logic):
         link (List[Link]): List of Link objects.
     """
 
+    __slots__ = ("condition", "statements")
+
     def __init__(self, condition: str, statements: list[Union[Link, Logic]]) -> None:
         """Initialize loop.
 
@@ -209,14 +204,13 @@ class Break(Logic):
         self.condition = condition
         self.statements = statements
 
-    def __str__(self) -> str:
-        """Return loop string.
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write break script.
 
-        Returns:
-            str: Loop string.
+        Args:
+            writer (ScriptWriter): The writer to write to.
         """
-        break_str = f"\tbreak {self.condition}\n" + "".join(
-            [str(statement) for statement in self.statements]
-        )
-        break_str += "\tend\n"
-        return break_str
+        writer.write(f"\tbreak {self.condition}\n")
+        for statement in self.statements:
+            writer.write_element(statement)
+        writer.write("\tend\n")
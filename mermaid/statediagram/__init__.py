@@ -4,11 +4,11 @@ StateDiagram class.
 This module contains the StateDiagram class.
 """
 
-from typing import Optional, Union
+from typing import Iterator, Optional, Union
 
 from mermaid import Direction
 from mermaid.configuration import Config
-from mermaid.graph import Graph
+from mermaid.graph import Graph, ScriptWriter
 from mermaid.style import Style
 
 from .base import BaseTransition
@@ -47,7 +47,7 @@ class StateDiagram(Graph):
             direction (Optional[Union[str,Direction]], optional): Direction of the stateDiagram. Defaults to None.
             config (Optional[Config], optional): Configuration for the stateDiagram. Defaults to None.
         """
-        super().__init__(title, "", config)
+        super().__init__(title, config=config)
         self.states: list[State] = states if states is not None else []
         self.transitions: list[BaseTransition] = (
             transitions if transitions is not None else []
@@ -64,22 +64,67 @@ class StateDiagram(Graph):
                 direction if isinstance(direction, str) else direction.value
             )
 
-        self._build_script()
+    def add_state(self, state: State) -> None:
+        """Add a state to the state diagram.
 
-    def _build_script(self) -> None:
-        super()._build_script()
+        If the script is already built, only the lines of the state, and of
+        its styles not defined yet, are appended to it.
+
+        Args:
+            state (State): The state to add.
+        """
+        styles: Optional[ScriptWriter] = self._cached_section("styles")
+        states: Optional[ScriptWriter] = self._cached_section("states")
+        # Bypass the observed list: the cached script is updated below.
+        list.append(self.states, state)
+        new_styles: list[Style] = [
+            style for style in state.styles if style not in self.styles
+        ]
+        self.styles.update(new_styles)
+        if styles is None or states is None:
+            return
+        for style in new_styles:
+            styles.write("\n\t", str(style))
+        states.write("\n\t")
+        states.write_element(state)
+
+    def add_transition(self, transition: BaseTransition) -> None:
+        """Add a transition to the state diagram.
+
+        If the script is already built, only the line of the transition is
+        appended to it.
+
+        Args:
+            transition (BaseTransition): The transition to add.
+        """
+        transitions: Optional[ScriptWriter] = self._cached_section("transitions")
+        list.append(self.transitions, transition)
+        if transitions is not None:
+            transitions.write("\n\t", str(transition))
+
+    def _write_diagram(self, writer: ScriptWriter) -> Iterator[None]:
         str_version: str = f"-{self.version}" if self.version != "v1" else ""
-        script: str = f"\nstateDiagram{str_version}"
+        # Updated in place: assigning it would invalidate the script.
+        self.styles.clear()
+        for state in self.states:
+            self.styles.update(state.styles)
+        writer.write(f"\nstateDiagram{str_version}")
         if self.direction:
-            script += f"\n\tdirection {self.direction}"
+            writer.write(f"\n\tdirection {self.direction}")
+        styles: ScriptWriter = writer.section("styles")
         for style in self.styles:
-            script += f"\n\t{style}"
+            styles.write("\n\t", str(style))
+        states: ScriptWriter = writer.section("states")
         for state in self.states:
-            script += f"\n\t{state}"
+            states.write("\n\t")
+            states.write_element(state)
+            yield
+        transitions: ScriptWriter = writer.section("transitions")
         for transition in self.transitions:
-            script += f"\n\t{transition}"
+            transitions.write("\n\t", str(transition))
+            yield
 
-        self.script += script + "\n"
+        writer.write("\n")
 
 
 __all__ = [
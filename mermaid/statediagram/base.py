@@ -1,2 +1,2 @@
 class BaseTransition:
-    pass
+    __slots__ = ()
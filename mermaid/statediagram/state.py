@@ -6,12 +6,13 @@ This module contains the classes to represent the states in a state diagram.
 from typing import Optional, Union
 
 from mermaid import Direction, text_to_snake_case
+from mermaid.graph import ScriptElement, ScriptWriter
 from mermaid.style import Style
 
 from .base import BaseTransition
 
 
-class State:
+class State(ScriptElement):
     """State class.
 
     This class represents a state in a state diagram.
@@ -22,6 +23,8 @@ class State:
         styles (list[Style]): The styles of the state.
     """
 
+    __slots__ = ("id_", "content", "styles")
+
     def __init__(
         self, id_: str, content: str = "", styles: Optional[list[Style]] = None
     ) -> None:
@@ -36,12 +39,11 @@ class State:
         self.content: str = content if content else id_
         self.styles: list[Style] = styles if styles is not None else []
 
-    def __str__(self) -> str:
-        """Return the string representation of the state."""
-        string: str = f"{self.id_} : {self.content}"
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write the script of the state."""
+        writer.write(f"{self.id_} : {self.content}")
         for style in self.styles:
-            string += f"\n{self.id_}:::{style.name}"
-        return string
+            writer.write(f"\n{self.id_}:::{style.name}")
 
 
 class Start(State):
@@ -50,12 +52,14 @@ class Start(State):
     This class represents the start state in a state diagram.
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(id_="[*]")
         self.id_: str = "[*]"
 
-    def __str__(self) -> str:
-        return f"{self.id_}"
+    def write_script(self, writer: ScriptWriter) -> None:
+        writer.write(self.id_)
 
 
 class End(State):
@@ -64,12 +68,14 @@ class End(State):
     This class represents the end state in a state diagram.
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(id_="[*]")
         self.id_: str = "[*]"
 
-    def __str__(self) -> str:
-        return f"{self.id_}"
+    def write_script(self, writer: ScriptWriter) -> None:
+        writer.write(self.id_)
 
 
 class Composite(State):
@@ -84,6 +90,8 @@ class Composite(State):
         styles (list[Style]): The styles of the composite state.
     """
 
+    __slots__ = ("sub_states", "transitions", "direction")
+
     def __init__(
         self,
         id_: str,
@@ -111,23 +119,22 @@ class Composite(State):
             direction.value if isinstance(direction, Direction) else direction
         )
 
-    def __str__(self) -> str:
-        """Return the string representation of the state."""
-        string: str = super().__str__()
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write the script of the state and of its sub states."""
+        super().write_script(writer)
 
         if len(self.sub_states):
-            string += f"\nstate {self.id_} {{"
+            writer.write(f"\nstate {self.id_} {{")
             if self.direction:
-                string += f"\n\tdirection {self.direction}"
+                writer.write(f"\n\tdirection {self.direction}")
             for state in self.sub_states:
-                string += f"\n\t{str(state)}"
+                writer.write("\n\t")
+                writer.write_element(state)
 
             for transition in self.transitions:
-                string += f"\n\t{str(transition)}"
-
-            string += "\n}"
+                writer.write("\n\t", str(transition))
 
-        return string
+            writer.write("\n}")
 
 
 class Concurrent(Composite):
@@ -140,6 +147,8 @@ class Concurrent(Composite):
         styles (list[Style]): The styles of the concurrent state.
     """
 
+    __slots__ = ("groups",)
+
     def __init__(
         self,
         id_: str,
@@ -160,17 +169,17 @@ class Concurrent(Composite):
             sub_groups if sub_groups is not None else []
         )
 
-    def __str__(self) -> str:
-        """Return the string representation of the state."""
-        string: str = super().__str__()
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write the script of the state and of its groups."""
+        super().write_script(writer)
         if len(self.groups):
-            string += f"\nstate {self.id_} {{"
-            for states, transitions in self.groups:
+            writer.write(f"\nstate {self.id_} {{")
+            for index, (states, transitions) in enumerate(self.groups):
+                if index:
+                    writer.write("\n\t--")
                 for state in states:
-                    string += f"\n\t{str(state)}"
+                    writer.write("\n\t")
+                    writer.write_element(state)
                 for transition in transitions:
-                    string += f"\n\t{str(transition)}"
-                string += "\n\t--"
-            string = string[:-4]
-            string += "\n}"
-        return string
+                    writer.write("\n\t", str(transition))
+            writer.write("\n}")
@@ -17,6 +17,8 @@ class Transition(BaseTransition):
         label (str): The label of the transition.
     """
 
+    __slots__ = ("from_state", "to_state", "label")
+
     def __init__(
         self, from_: Optional[State] = None, to: Optional[State] = None, label: str = ""
     ) -> None:
@@ -53,6 +55,8 @@ class Choice(BaseTransition):
         conditions (list[str]): The conditions of the choice.
     """
 
+    __slots__ = ("id_", "from_state", "to_states", "conditions")
+
     def __init__(
         self,
         id_: str,
@@ -100,6 +104,8 @@ class Fork(BaseTransition):
         to_states (list[State]): The states to which the fork ends.
     """
 
+    __slots__ = ("id_", "from_state", "to_states")
+
     def __init__(
         self, id_: str, from_: Optional[State] = None, to: Optional[list[State]] = None
     ) -> None:
@@ -137,6 +143,8 @@ class Join(BaseTransition):
         to_state (State): The state to which the join ends.
     """
 
+    __slots__ = ("id_", "from_states", "to_state")
+
     def __init__(
         self, id_: str, from_: Optional[list[State]] = None, to: Optional[State] = None
     ) -> None:
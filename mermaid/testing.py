@@ -0,0 +1,206 @@
+"""Testing module.
+
+This module provides an in-process stand-in for a mermaid.ink server, so the
+client can be tested and benchmarked offline. It runs the standard library
+`http.server` on a background thread and answers `/svg/` and `/img/` with
+deterministic bodies.
+
+Classes:
+    FakeMermaidServer: Fake mermaid.ink server with latency and error injection.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+SVG_BODY: bytes = b'<svg xmlns="http://www.w3.org/2000/svg"></svg>'
+"""The SVG body served by default."""
+
+PNG_BODY: bytes = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+"""The PNG body served by default."""
+
+CONTENT_TYPES: dict[str, str] = {"svg": "image/svg+xml", "img": "image/png"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        super().setup()
+        fake: FakeMermaidServer = self.server.fake  # type: ignore[attr-defined]
+        if fake.connect_delay:
+            time.sleep(fake.connect_delay)
+
+    def do_GET(self) -> None:
+        fake: FakeMermaidServer = self.server.fake  # type: ignore[attr-defined]
+        endpoint: str = self.path.split("/", 2)[1] if self.path.count("/") > 1 else ""
+        status, body, headers = fake._respond(
+            endpoint, self.headers.get("If-None-Match")
+        )
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class FakeMermaidServer:
+    """FakeMermaidServer class.
+
+    This class serves `/svg/<diagram>` and `/img/<diagram>` like mermaid.ink,
+    without rendering anything: every diagram gets the same SVG or PNG body,
+    with an `ETag` honored by `If-None-Match`. Other paths answer 404.
+
+    Faults are injected through attributes that can be changed while the
+    server runs. Use it as a context manager, or call `start` and `stop`.
+
+    Attributes:
+        latency (float): The delay before every response, in seconds.
+        connect_delay (float): The delay before the first response of every
+            connection, to mimic TCP and TLS setup, in seconds.
+        error_rate (float): The fraction of requests answered with
+            `error_status`, drawn from a random generator seeded with `seed`.
+        error_status (int): The status of injected errors.
+        status (Optional[int]): A status returned for every request instead
+            of rendering. None renders normally.
+        body_size (Optional[int]): The size in bytes the bodies are padded
+            to. None serves `SVG_BODY` and `PNG_BODY` as is.
+        request_count (int): The number of requests received.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        status: Optional[int] = None,
+        body_size: Optional[int] = None,
+        connect_delay: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize a new FakeMermaidServer listening on a free local port.
+
+        Args:
+            latency (float): The delay before every response, in seconds.
+            error_rate (float): The fraction of requests answered with
+                `error_status`.
+            error_status (int): The status of injected errors.
+            status (Optional[int]): A status returned for every request.
+            body_size (Optional[int]): The size in bytes the bodies are
+                padded to.
+            connect_delay (float): The delay before the first response of
+                every connection, in seconds.
+            seed (int): The seed of the generator drawing injected errors.
+        """
+        self.latency: float = latency
+        self.error_rate: float = error_rate
+        self.error_status: int = error_status
+        self.status: Optional[int] = status
+        self.body_size: Optional[int] = body_size
+        self.connect_delay: float = connect_delay
+        self.request_count: int = 0
+        self._random = random.Random(seed)
+        self._bodies: dict[tuple[str, Optional[int]], bytes] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self  # type: ignore[attr-defined]
+
+    @property
+    def url(self) -> str:
+        """The base URL of the server."""
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def body(self, endpoint: str) -> bytes:
+        """Return the body served for an endpoint with the current settings.
+
+        Args:
+            endpoint (str): The API endpoint, either "svg" or "img".
+
+        Returns:
+            bytes: The body of a successful response.
+        """
+        key: tuple[str, Optional[int]] = (endpoint, self.body_size)
+        body: Optional[bytes] = self._bodies.get(key)
+        if body is None:
+            body = SVG_BODY if endpoint == "svg" else PNG_BODY
+            padding: int = (self.body_size or 0) - len(body)
+            if padding > 0 and endpoint == "svg":
+                comment: bytes = b"<!--" + b"x" * max(0, padding - 7) + b"-->"
+                body = body[:-6] + comment + body[-6:]
+            elif padding > 0:
+                body += b"\x00" * padding
+            self._bodies[key] = body
+        return body
+
+    def _respond(
+        self, endpoint: str, if_none_match: Optional[str]
+    ) -> tuple[int, bytes, dict[str, str]]:
+        """Return the status, body and headers answering a request."""
+        with self._lock:
+            self.request_count += 1
+            failed: bool = (
+                self.error_rate > 0 and self._random.random() < self.error_rate
+            )
+        if self.latency:
+            time.sleep(self.latency)
+
+        status: Optional[int] = self.error_status if failed else self.status
+        if status is None or status == 200:
+            if endpoint not in CONTENT_TYPES:
+                status = 404
+            else:
+                body: bytes = self.body(endpoint)
+                etag: str = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                headers: dict[str, str] = {
+                    "Content-Type": CONTENT_TYPES[endpoint],
+                    "ETag": etag,
+                }
+                if if_none_match == etag:
+                    return 304, b"", {"ETag": etag}
+                return 200, body, headers
+
+        try:
+            phrase: str = HTTPStatus(status).phrase
+        except ValueError:
+            phrase = ""
+        return status, phrase.encode("utf-8"), {"Content-Type": "text/plain"}
+
+    def start(self) -> "FakeMermaidServer":
+        """Start serving on a background thread.
+
+        Returns:
+            FakeMermaidServer: The server itself.
+        """
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeMermaidServer":
+        return self.start()
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
+
+
+__all__ = ["FakeMermaidServer", "PNG_BODY", "SVG_BODY"]
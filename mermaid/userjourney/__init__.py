@@ -9,10 +9,10 @@ Classes:
     Task: Represents a task in a section of a user's journey.
 """
 
-from typing import Optional, Union
+from typing import Iterator, Optional, Union
 
 from mermaid.configuration import Config
-from mermaid.graph import Graph
+from mermaid.graph import Graph, ScriptWriter
 
 from .actor import Actor
 from .section import Section
@@ -43,18 +43,17 @@ class UserJourney(Graph):
             sections (list[Union[Section, Task]]): The sections in the user's journey.
             config (Optional[Config]): The configuration for the user's journey. Defaults to None.
         """
-        super().__init__(title, "", config)
+        super().__init__(title, config=config)
         self.title: str = title
         self.sections: list[Union[Section, Task]] = sections
-        self._build_script()
 
-    def _build_script(self) -> None:
-        """Build the script for the user's journey."""
-        super()._build_script()
-        script: str = f"\njourney\n\ttitle {self.title}\n"
+    def _write_diagram(self, writer: ScriptWriter) -> Iterator[None]:
+        """Write the script for the user's journey."""
+        writer.write(f"\njourney\n\ttitle {self.title}\n")
         for section in self.sections:
-            script += f"{section}\n"
-        self.script += script
+            writer.write_element(section)
+            writer.write("\n")
+            yield
 
 
 __all__ = [
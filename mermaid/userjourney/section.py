@@ -1,7 +1,9 @@
+from mermaid.graph import ScriptElement, ScriptWriter
+
 from .task import Task
 
 
-class Section:
+class Section(ScriptElement):
     """Section class.
 
     This class represents a section in a user's journey.
@@ -12,6 +14,8 @@ class Section:
         tasks (list[Task]): The tasks in the section.
     """
 
+    __slots__ = ("name", "tasks")
+
     def __init__(self, name: str, tasks: list[Task]) -> None:
         """Initialize a new Section.
 
@@ -22,13 +26,12 @@ class Section:
         self.name: str = name
         self.tasks: list[Task] = tasks
 
-    def __str__(self) -> str:
-        """Return a string representation of the section.
+    def write_script(self, writer: ScriptWriter) -> None:
+        """Write the script of the section and of its tasks.
 
-        Returns:
-            str: A string representation of the section.
+        Args:
+            writer (ScriptWriter): The writer to write to.
         """
-        string: str = f"\tsection {self.name}\n"
+        writer.write(f"\tsection {self.name}\n")
         for task in self.tasks:
-            string += f"{task}\n"
-        return string
+            writer.write(str(task), "\n")
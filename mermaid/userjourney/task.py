@@ -12,6 +12,8 @@ class Task:
         name (str): The name of the task.
     """
 
+    __slots__ = ("name", "score", "actors")
+
     def __init__(
         self, name: str, score: int, actors: Union[list[Actor], Actor]
     ) -> None:
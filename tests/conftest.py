@@ -1,6 +1,11 @@
 import os
 import shutil
 
+import pytest
+
+from mermaid import set_default_client
+from mermaid.testing import FakeMermaidServer
+
 
 def pytest_configure(config):
     """
@@ -12,10 +17,34 @@ def pytest_configure(config):
     mermaid_server = (
         f"\033[92m{mermaid_server}\033[0m"
         if mermaid_server != "Not Set"
-        else "\033[91mNot Set\033[0m"
+        else "\033[91mNot Set (using the fake server)\033[0m"
     )
     # Print the environment variable at the start
     word = " Custom Environment Information "
     line = word.center(shutil.get_terminal_size(fallback=(80, 20))[0], "=")
     print(f"\033[1m{line}\033[0m")
     print(f"\033[92mMERMAID_INK_SERVER \033[0m: {mermaid_server}")
+
+
+@pytest.fixture
+def mermaid_server(monkeypatch):
+    """
+    Start a fake mermaid.ink server and point `MERMAID_INK_SERVER` at it.
+    """
+    with FakeMermaidServer() as server:
+        monkeypatch.setenv("MERMAID_INK_SERVER", server.url)
+        set_default_client(None)
+        yield server
+        set_default_client(None)
+
+
+@pytest.fixture
+def mermaid_ink(request):
+    """
+    Use the server of `MERMAID_INK_SERVER` when it is set, e.g. the container
+    started by `make mermaid.ink/up`, and the fake server otherwise.
+    """
+    if os.getenv("MERMAID_INK_SERVER"):
+        yield None
+    else:
+        yield request.getfixturevalue("mermaid_server")
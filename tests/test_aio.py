@@ -0,0 +1,285 @@
+import asyncio
+import gc
+import os
+import socket
+import threading
+import time
+import unittest
+import warnings
+from unittest import mock
+
+from mermaid import (
+    Mermaid,
+    MermaidError,
+    RateLimiter,
+    RenderClient,
+    aio,
+    set_default_client,
+)
+from mermaid.aio import AsyncMermaid, AsyncRenderClient, arender
+from mermaid.client import BreakerState, RetryPolicy
+from mermaid.graph import Graph
+from mermaid.testing import PNG_BODY, SVG_BODY, FakeMermaidServer
+
+
+class TestAsyncMermaidExecutorFallback(unittest.TestCase):
+    def setUp(self) -> None:
+        set_default_client(None)
+        self.addCleanup(set_default_client, None)
+        self.graph: Graph = Graph("async-graph", "graph TD;\n    A-->B;")
+        self.lock = threading.Lock()
+        self.active: int = 0
+        self.max_active: int = 0
+        patcher = mock.patch.object(aio, "aiohttp", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        response = mock.Mock()
+        response.ok = "/bad/" not in url
+        response.status_code = 200 if response.ok else 400
+        response.content = b"<svg></svg>" if "/svg/" in url else b"png"
+        response.text = "bad"
+        return response
+
+    def test_svg_and_png(self):
+        async def main():
+            mermaid = AsyncMermaid(self.graph, width=100)
+            return await mermaid.svg(), await mermaid.png()
+
+        with mock.patch("requests.Session.get", side_effect=self.get) as mock_get:
+            svg, png = asyncio.run(main())
+
+        self.assertEqual(svg, "<svg></svg>")
+        self.assertEqual(png, b"png")
+        self.assertEqual(
+            mock_get.call_args_list[0][0][0],
+            RenderClient().server + Mermaid(self.graph, width=100)._build_path("svg"),
+        )
+
+    def test_concurrency_is_bounded(self):
+        client = AsyncRenderClient(max_concurrency=2)
+
+        async def main():
+            await asyncio.gather(
+                *[
+                    arender(f"graph TD;\n    A{index}-->B;", client=client)
+                    for index in range(8)
+                ]
+            )
+
+        with mock.patch("requests.Session.get", side_effect=self.get) as mock_get:
+            asyncio.run(main())
+
+        self.assertEqual(mock_get.call_count, 8)
+        self.assertLessEqual(self.max_active, 2)
+
+    def test_errors_are_mermaid_errors(self):
+        client = AsyncRenderClient(client=RenderClient("http://local/bad"))
+        with mock.patch("requests.Session.get", side_effect=self.get):
+            with self.assertRaises(MermaidError) as context:
+                asyncio.run(arender(self.graph, client=client))
+
+        self.assertTrue(context.exception.url.startswith("http://local/bad/svg/"))
+
+    def test_unknown_format_raises(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(arender(self.graph, image_format="pdf"))
+
+
+@unittest.skipIf(aio.aiohttp is None, "aiohttp is not installed")
+class TestAsyncMermaidAiohttp(unittest.TestCase):
+    def setUp(self) -> None:
+        self.graph: Graph = Graph("async-graph", "graph TD;\n    A-->B;")
+
+    def test_svg_and_png(self):
+        async def main(server):
+            async with AsyncRenderClient(server) as client:
+                mermaid = AsyncMermaid(self.graph, client=client)
+                await mermaid.prefetch()
+                return await mermaid.svg(), await mermaid.png()
+
+        with FakeMermaidServer() as server:
+            svg, png = asyncio.run(main(server.url))
+
+        self.assertEqual(svg, SVG_BODY.decode())
+        self.assertEqual(png, PNG_BODY)
+
+    def test_to_files(self):
+        async def main(server):
+            async with AsyncRenderClient(server) as client:
+                mermaid = AsyncMermaid(self.graph, client=client)
+                await mermaid.to_svg("./async-graph.svg")
+                await mermaid.to_png("./async-graph.png")
+
+        try:
+            with FakeMermaidServer() as server:
+                asyncio.run(main(server.url))
+            self.assertTrue(os.path.exists("./async-graph.svg"))
+            self.assertTrue(os.path.exists("./async-graph.png"))
+        finally:
+            for path in ["./async-graph.svg", "./async-graph.png"]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def test_rate_limiter_of_client_applies(self):
+        limiter = RateLimiter(rate=1000, burst=1)
+
+        async def main(server):
+            client = RenderClient(server, rate_limiter=limiter)
+            async with AsyncRenderClient(server, client=client) as async_client:
+                await AsyncMermaid(self.graph, client=async_client).prefetch()
+
+        with FakeMermaidServer() as server:
+            asyncio.run(main(server.url))
+
+        self.assertEqual(limiter.acquired, 2)
+
+    def test_error_status_raises_mermaid_error(self):
+        async def main(server):
+            async with AsyncRenderClient(server + "/missing") as client:
+                await arender(self.graph, client=client)
+
+        with FakeMermaidServer() as server:
+            with self.assertRaises(MermaidError) as context:
+                asyncio.run(main(server.url))
+
+        self.assertEqual(context.exception.status_code, 404)
+
+    def test_sync_client_is_created_on_first_use(self):
+        client = AsyncRenderClient("http://local:3000")
+        self.assertIsNone(client._client)
+        self.assertEqual(client.client.server, "http://local:3000")
+
+    def test_requests_fail_over_across_the_pool(self):
+        with socket.socket() as closed:
+            closed.bind(("127.0.0.1", 0))
+            dead: str = f"http://127.0.0.1:{closed.getsockname()[1]}"
+
+        async def main(client):
+            async with client:
+                for _ in range(4):
+                    await arender(self.graph, client=client)
+
+        with FakeMermaidServer() as server:
+            sync_client = RenderClient([dead, server.url], failure_threshold=1)
+            asyncio.run(main(AsyncRenderClient(client=sync_client)))
+
+        self.assertEqual(server.request_count, 4)
+        self.assertEqual(
+            sync_client.pool.states(),
+            {dead: BreakerState.OPEN, server.url: BreakerState.CLOSED},
+        )
+
+    def test_timeout_of_client_applies(self):
+        async def main(client):
+            async with client:
+                await arender(self.graph, client=client)
+
+        with FakeMermaidServer(latency=2.0) as server:
+            client = AsyncRenderClient(client=RenderClient(server.url, timeout=0.1))
+            started: float = time.perf_counter()
+            with self.assertRaises(asyncio.TimeoutError):
+                asyncio.run(main(client))
+
+        self.assertLess(time.perf_counter() - started, 1.5)
+
+    def test_retry_policy_of_client_applies(self):
+        retry = RetryPolicy(retries=2, backoff_factor=0)
+
+        async def main(client):
+            async with client:
+                await arender(self.graph, client=client)
+
+        with FakeMermaidServer(status=503) as server:
+            client = AsyncRenderClient(client=RenderClient(server.url, retry=retry))
+            with self.assertRaises(MermaidError) as context:
+                asyncio.run(main(client))
+
+        self.assertEqual(server.request_count, 3)
+        self.assertEqual(context.exception.attempts, 3)
+
+    def test_session_is_closed_when_the_loop_changes(self):
+        sessions = []
+
+        async def main(client):
+            await arender(self.graph, client=client)
+            sessions.append(client._session)
+
+        with FakeMermaidServer() as server:
+            client = AsyncRenderClient(server.url)
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                asyncio.run(main(client))
+                asyncio.run(main(client))
+                asyncio.run(client.close())
+                gc.collect()
+
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertTrue(all(session.closed for session in sessions))
+        self.assertEqual(
+            [
+                warning.message
+                for warning in caught
+                if "Unclosed" in str(warning.message)
+            ],
+            [],
+        )
+
+    def test_session_of_an_idle_loop_is_closed(self):
+        async def main(client):
+            await arender(self.graph, client=client)
+            return client._session
+
+        async def main_and_close(client):
+            await main(client)
+            await client.close()
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        with FakeMermaidServer() as server:
+            client = AsyncRenderClient(server.url)
+            first = loop.run_until_complete(main(client))
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                asyncio.run(main_and_close(client))
+                self.assertTrue(first.closed)
+                del first
+                gc.collect()
+
+        self.assertEqual(
+            [
+                warning.message
+                for warning in caught
+                if "Unclosed" in str(warning.message)
+            ],
+            [],
+        )
+
+    def test_session_of_a_running_loop_is_closed_in_that_loop(self):
+        async def main(client):
+            await arender(self.graph, client=client)
+            return client._session
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever)
+        thread.start()
+        try:
+            with FakeMermaidServer() as server:
+                client = AsyncRenderClient(server.url)
+                first = asyncio.run_coroutine_threadsafe(main(client), loop).result()
+                asyncio.run(main(client))
+                asyncio.run(client.close())
+                asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), loop).result()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+        self.assertTrue(first.closed)
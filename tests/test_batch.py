@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from mermaid import Mermaid, MermaidError, render_many, set_default_client
+from mermaid.graph import Graph
+
+
+class TestRenderMany(unittest.TestCase):
+    def setUp(self) -> None:
+        set_default_client(None)
+        self.addCleanup(set_default_client, None)
+        self.graphs: list[Graph] = [
+            Graph(f"graph-{index}", f"graph TD;\n    A{index}-->B{index};")
+            for index in range(10)
+        ]
+        self.lock = threading.Lock()
+        self.active: int = 0
+        self.max_active: int = 0
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        response = mock.Mock()
+        response.ok = True
+        response.status_code = 200
+        response.url = url
+        return response
+
+    def test_results_in_input_order(self):
+        with mock.patch("requests.Session.get", side_effect=self.get):
+            results = list(render_many(self.graphs, formats=["svg"], max_workers=4))
+
+        self.assertEqual([index for index, _ in results], list(range(10)))
+        for index, mermaid in results:
+            self.assertIsInstance(mermaid, Mermaid)
+            self.assertEqual(
+                mermaid.svg_response.url,
+                mermaid.client.server + Mermaid(self.graphs[index])._build_path("svg"),
+            )
+
+    def test_results_in_completion_order(self):
+        with mock.patch("requests.Session.get", side_effect=self.get):
+            results = list(render_many(self.graphs, max_workers=4, ordered=False))
+
+        self.assertEqual(sorted(index for index, _ in results), list(range(10)))
+
+    def test_worker_pool_is_bounded(self):
+        with mock.patch("requests.Session.get", side_effect=self.get) as mock_get:
+            list(render_many(self.graphs, formats=["svg", "png"], max_workers=3))
+
+        self.assertEqual(mock_get.call_count, 20)
+        self.assertLessEqual(self.max_active, 3)
+
+    def test_failures_are_captured(self):
+        failing: str = Mermaid(self.graphs[3])._diagram
+        unreachable: str = Mermaid("unreachable")._diagram
+
+        def get(url, **kwargs):
+            if unreachable in url:
+                raise requests.ConnectionError("refused")
+            response = self.get(url)
+            response.ok = failing not in url
+            response.status_code = 200 if response.ok else 400
+            response.text = "bad diagram"
+            return response
+
+        with mock.patch("requests.Session.get", side_effect=get):
+            results = dict(render_many(self.graphs + ["unreachable"], formats=["svg"]))
+
+        self.assertIsInstance(results[3], MermaidError)
+        self.assertEqual(results[3].status_code, 400)
+        self.assertIsInstance(results[10], requests.ConnectionError)
+        self.assertIsInstance(results[4], Mermaid)
+
+    def test_unknown_format_raises(self):
+        with self.assertRaises(ValueError):
+            list(render_many(self.graphs, formats=["pdf"]))
@@ -0,0 +1,326 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from mermaid import DiskCache, MemoryCache, Mermaid, RenderClient
+from mermaid.cache import (
+    CacheEntry,
+    FreshnessPolicy,
+    default_cache_dir,
+    render_key,
+)
+from mermaid.graph import Graph
+
+
+class TestRenderKey(unittest.TestCase):
+    def test_key_depends_on_every_part(self):
+        base = ("script", 100, None, 2.0, "svg", "https://mermaid.ink")
+        keys = {render_key(*base)}
+        for index, value in enumerate(["other", 200, 300, 3.0, "png", "http://x"]):
+            parts = list(base)
+            parts[index] = value
+            keys.add(render_key(*parts))
+
+        self.assertEqual(len(keys), 7)
+        self.assertEqual(render_key(*base), render_key(*base))
+
+    def test_default_cache_dir_honours_environment(self):
+        with mock.patch.dict(os.environ, {"MERMAID_CACHE_DIR": "/tmp/mmd"}):
+            self.assertEqual(default_cache_dir(), Path("/tmp/mmd"))
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(default_cache_dir().name, "mermaid-py")
+
+
+class TestMemoryCache(unittest.TestCase):
+    def test_get_and_set_count_hits_and_misses(self):
+        cache = MemoryCache()
+        self.assertIsNone(cache.get("key"))
+
+        cache.set("key", b"body")
+
+        self.assertEqual(cache.get("key"), b"body")
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 1, 0))
+
+    def test_budget_is_in_bytes(self):
+        cache = MemoryCache(max_bytes=100)
+        cache.set("small-1", b"x" * 10)
+        cache.set("small-2", b"x" * 10)
+        cache.get("small-1")
+
+        cache.set("large", b"x" * 85)
+
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get("small-2"))
+        self.assertEqual(cache.get("small-1"), b"x" * 10)
+        self.assertEqual(cache.size, 95)
+
+    def test_bodies_over_budget_are_not_stored(self):
+        cache = MemoryCache(max_bytes=10)
+        cache.set("key", b"x" * 11)
+
+        self.assertEqual(len(cache), 0)
+
+    def test_replacing_a_key_keeps_size_exact(self):
+        cache = MemoryCache()
+        cache.set("key", b"x" * 10)
+        cache.set("key", b"x" * 4)
+
+        self.assertEqual(cache.size, 4)
+        self.assertEqual(len(cache), 1)
+
+    def test_concurrent_use(self):
+        cache = MemoryCache(max_bytes=1000)
+
+        def work(worker):
+            for index in range(500):
+                cache.set(f"{worker}-{index % 50}", b"x" * 10)
+                cache.get(f"{worker}-{(index + 1) % 50}")
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLessEqual(cache.size, 1000)
+        self.assertEqual(cache.size, 10 * len(cache))
+        self.assertEqual(cache.hits + cache.misses, 8 * 500)
+
+    def test_mermaid_cache_hit_makes_no_request(self):
+        cache = MemoryCache()
+        client = RenderClient("http://local:3000")
+        response = mock.Mock()
+        response.ok = True
+        response.headers = {}
+        response.content = b"png"
+
+        with mock.patch.object(client.session, "get", return_value=response) as get:
+            Mermaid("graph TD; A-->B;", client=client, cache=cache).img_response
+            hit = Mermaid("graph TD; A-->B;", client=client, cache=cache).img_response
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(hit.content, b"png")
+        self.assertEqual(cache.hits, 1)
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory: str = tempfile.mkdtemp()
+
+    def test_get_and_set(self):
+        cache = DiskCache(self.directory)
+        self.assertIsNone(cache.get("ab" * 32))
+
+        cache.set("ab" * 32, b"<svg></svg>")
+
+        self.assertEqual(cache.get("ab" * 32), b"<svg></svg>")
+        self.assertEqual(DiskCache(self.directory).get("ab" * 32), b"<svg></svg>")
+
+    def test_set_leaves_no_temporary_files(self):
+        cache = DiskCache(self.directory)
+        cache.set("cd" * 32, b"body")
+
+        self.assertEqual(os.listdir(os.path.join(self.directory, "cd")), ["cd" * 32])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = DiskCache(self.directory, max_bytes=35)
+        for index, key in enumerate(["aa", "bb", "cc"]):
+            cache.set(key * 32, b"x" * 10)
+            os.utime(cache._path(key * 32), (index, index))
+        cache.get("aa" * 32)
+
+        cache.set("dd" * 32, b"x" * 10)
+
+        self.assertIsNone(cache.get("bb" * 32))
+        self.assertIsNotNone(cache.get("aa" * 32))
+        self.assertIsNotNone(cache.get("dd" * 32))
+        self.assertEqual(len(cache), 3)
+
+    def test_replacing_a_key_keeps_size_exact(self):
+        cache = DiskCache(self.directory, max_bytes=100)
+        for _ in range(20):
+            cache.set("aa" * 32, b"x" * 10)
+        cache.set("aa" * 32, b"x" * 4)
+
+        self.assertEqual(cache._size, 4)
+        self.assertEqual(len(cache), 1)
+
+    def test_eviction_leaves_headroom(self):
+        cache = DiskCache(self.directory, max_bytes=100)
+        for index in range(10):
+            cache.set(f"{index:02}" * 32, b"x" * 10)
+            os.utime(cache._path(f"{index:02}" * 32), (index, index))
+
+        cache.set("aa" * 32, b"x" * 10)
+        self.assertEqual(len(cache), 9)
+        self.assertIsNone(cache.get("00" * 32))
+        self.assertIsNone(cache.get("01" * 32))
+
+        with mock.patch.object(cache, "_entries") as entries:
+            cache.set("bb" * 32, b"x" * 10)
+        entries.assert_not_called()
+
+    def test_clear(self):
+        cache = DiskCache(self.directory)
+        cache.set("ef" * 32, b"body")
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+
+    def test_mermaid_cache_hit_makes_no_request(self):
+        cache = DiskCache(self.directory)
+        client = RenderClient("http://local:3000")
+        graph = Graph("cached-graph", "graph TD;\n    A-->B;")
+        response = mock.Mock()
+        response.ok = True
+        response.headers = {}
+        response.content = b"<svg>cached</svg>"
+
+        with mock.patch.object(client.session, "get", return_value=response) as get:
+            Mermaid(graph, width=100, client=client, cache=cache).svg_response
+            hit = Mermaid(graph, width=100, client=client, cache=cache).svg_response
+            Mermaid(graph, width=200, client=client, cache=cache).svg_response
+
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(hit.status_code, 200)
+        self.assertEqual(hit.text, "<svg>cached</svg>")
+        self.assertEqual(hit.headers["Content-Type"], "image/svg+xml")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class TestRevalidation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory: str = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.client = RenderClient("http://local:3000")
+        time_patcher = mock.patch("mermaid.cache.time.time", return_value=1000.0)
+        self.time = time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+
+    @staticmethod
+    def response(status_code, body=b"", headers=None):
+        response = mock.Mock()
+        response.ok = status_code < 400
+        response.status_code = status_code
+        response.content = body
+        response.headers = headers or {}
+        return response
+
+    def render(self, cache, responses):
+        with mock.patch.object(
+            self.client.session, "get", side_effect=responses
+        ) as mock_get:
+            response = Mermaid(
+                "graph TD; A-->B;", client=self.client, cache=cache
+            ).img_response
+        return response, mock_get
+
+    def test_conditional_headers(self):
+        entry = CacheEntry(b"png", '"v1"', "Wed, 21 Oct 2026 07:28:00 GMT")
+
+        self.assertEqual(
+            entry.conditional_headers(),
+            {
+                "If-None-Match": '"v1"',
+                "If-Modified-Since": "Wed, 21 Oct 2026 07:28:00 GMT",
+            },
+        )
+        self.assertEqual(CacheEntry(b"png").conditional_headers(), {})
+
+    def test_fresh_entries_are_not_revalidated(self):
+        cache = MemoryCache(freshness=FreshnessPolicy(max_age=60))
+        first = self.response(200, b"png", {"ETag": '"v1"'})
+        self.render(cache, [first])
+
+        self.time.return_value = 1059.0
+        response, mock_get = self.render(cache, [])
+
+        self.assertEqual(response.content, b"png")
+        mock_get.assert_not_called()
+
+    def test_revalidations_are_not_counted_as_hits(self):
+        cache = MemoryCache(freshness=FreshnessPolicy(max_age=60))
+        self.render(cache, [self.response(200, b"png", {"ETag": '"v1"'})])
+        self.time.return_value = 1030.0
+        self.render(cache, [])
+        self.time.return_value = 1100.0
+        self.render(cache, [self.response(304)])
+
+        self.assertEqual((cache.hits, cache.misses, cache.revalidations), (1, 1, 1))
+        cache.get(next(iter(cache._entries)))
+        self.assertEqual(cache.hits, 2)
+
+    def test_not_modified_refreshes_entry(self):
+        cache = MemoryCache(freshness=FreshnessPolicy(max_age=60))
+        self.render(cache, [self.response(200, b"png", {"ETag": '"v1"'})])
+
+        self.time.return_value = 1060.0
+        response, mock_get = self.render(cache, [self.response(304)])
+
+        self.assertEqual(response.content, b"png")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            mock_get.call_args.kwargs["headers"], {"If-None-Match": '"v1"'}
+        )
+        entry = cache.lookup(next(iter(cache._entries)))
+        self.assertEqual(
+            (entry.body, entry.etag, entry.stored_at), (b"png", '"v1"', 1060.0)
+        )
+
+        self.time.return_value = 1100.0
+        _, mock_get = self.render(cache, [])
+        mock_get.assert_not_called()
+
+    def test_modified_render_replaces_entry(self):
+        cache = MemoryCache(freshness=FreshnessPolicy(max_age=60))
+        self.render(cache, [self.response(200, b"old", {"ETag": '"v1"'})])
+
+        self.time.return_value = 2000.0
+        new = self.response(200, b"new", {"ETag": '"v2"'})
+        response, _ = self.render(cache, [new])
+
+        self.assertEqual(response.content, b"new")
+        entry = cache.lookup(next(iter(cache._entries)))
+        self.assertEqual((entry.body, entry.etag), (b"new", '"v2"'))
+
+    def test_disk_cache_keeps_validators_beside_body(self):
+        cache = DiskCache(self.directory, freshness=FreshnessPolicy(max_age=60))
+        self.render(
+            cache,
+            [self.response(200, b"png", {"Last-Modified": "Tue, 20 Oct 2026"})],
+        )
+        [key] = [path.name for _, path, _ in cache._entries()]
+        inode = os.stat(cache._path(key)).st_ino
+
+        self.time.return_value = 1060.0
+        response, mock_get = self.render(
+            DiskCache(self.directory, freshness=FreshnessPolicy(max_age=60)),
+            [self.response(304)],
+        )
+
+        self.assertEqual(response.content, b"png")
+        self.assertEqual(
+            mock_get.call_args.kwargs["headers"],
+            {"If-Modified-Since": "Tue, 20 Oct 2026"},
+        )
+        self.assertEqual(os.stat(cache._path(key)).st_ino, inode)
+        self.assertEqual(cache.lookup(key).stored_at, 1060.0)
+        self.assertEqual(len(cache), 1)
+
+        cache.clear()
+        self.assertEqual(os.listdir(os.path.join(self.directory, key[:2])), [])
+
+    def test_entries_without_validators_are_stale(self):
+        cache = DiskCache(self.directory, freshness=FreshnessPolicy(max_age=60))
+        cache.set("ab" * 32, b"body")
+
+        entry = cache.lookup("ab" * 32)
+
+        self.assertEqual(entry.body, b"body")
+        self.assertFalse(cache.freshness.is_fresh(entry))
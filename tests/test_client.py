@@ -0,0 +1,765 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+from mermaid import Mermaid, MermaidError
+from mermaid.client import (
+    DEFAULT_SERVER,
+    DEFAULT_TIMEOUT,
+    BreakerState,
+    CircuitBreaker,
+    HedgePolicy,
+    RenderClient,
+    RetryPolicy,
+    ServerPool,
+    get_default_client,
+    set_default_client,
+)
+from mermaid.exceptions import CircuitOpenError
+from mermaid.testing import FakeMermaidServer
+
+
+class TestRenderClient(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ok_response = mock.Mock()
+        self.ok_response.ok = True
+        self.ok_response.status_code = 200
+        self.ok_response.text = "<svg></svg>"
+
+    def test_session_is_mounted_with_sized_pool(self):
+        client = RenderClient(pool_connections=2, pool_maxsize=32, pool_block=True)
+        adapter = client.session.get_adapter("https://mermaid.ink")
+
+        self.assertEqual(adapter._pool_connections, 2)
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(client.session.headers["Connection"], "keep-alive")
+
+    def test_injected_session_is_used(self):
+        session = requests.Session()
+        client = RenderClient(session=session)
+
+        self.assertIs(client.session, session)
+
+    def test_server_defaults_to_environment(self):
+        with mock.patch.dict(os.environ, {"MERMAID_INK_SERVER": "http://local:3000"}):
+            self.assertEqual(RenderClient().server, "http://local:3000")
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(RenderClient().server, DEFAULT_SERVER)
+        self.assertEqual(RenderClient("http://other").server, "http://other")
+
+    def test_get_prefixes_server(self):
+        client = RenderClient("http://local:3000")
+        with mock.patch.object(
+            client.session, "get", return_value=self.ok_response
+        ) as mock_get:
+            response = client.get("/svg/abc?")
+
+        self.assertIs(response, self.ok_response)
+        mock_get.assert_called_once_with(
+            "http://local:3000/svg/abc?",
+            timeout=DEFAULT_TIMEOUT,
+            stream=False,
+            headers=None,
+        )
+
+    def test_get_raises_mermaid_error_with_url(self):
+        client = RenderClient("http://local:3000")
+        error_response = mock.Mock()
+        error_response.ok = False
+        error_response.status_code = 400
+        error_response.text = "bad diagram"
+        with mock.patch.object(client.session, "get", return_value=error_response):
+            with self.assertRaises(MermaidError) as context:
+                client.get("/svg/abc?")
+
+        self.assertEqual(context.exception.url, "http://local:3000/svg/abc?")
+
+    def test_mermaid_uses_injected_client(self):
+        client = RenderClient("http://local:3000")
+        with mock.patch.object(
+            client.session, "get", return_value=self.ok_response
+        ) as mock_get:
+            Mermaid("graph TD; A-->B;", client=client).svg_response
+
+        self.assertTrue(mock_get.call_args[0][0].startswith("http://local:3000/svg/"))
+
+    def test_default_client_is_shared(self):
+        self.assertIs(get_default_client(), get_default_client())
+        self.assertIs(Mermaid("graph TD; A-->B;").client, get_default_client())
+
+    def test_set_default_client(self):
+        previous = get_default_client()
+        client = RenderClient()
+        try:
+            set_default_client(client)
+            self.assertIs(get_default_client(), client)
+        finally:
+            set_default_client(previous)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = RenderClient(
+            "http://local:3000", timeout=(1, 2), retry=RetryPolicy(retries=2)
+        )
+        sleep_patcher = mock.patch("mermaid.client.time.sleep")
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    @staticmethod
+    def response(status_code, headers=None):
+        response = mock.Mock()
+        response.ok = status_code < 400
+        response.status_code = status_code
+        response.text = "body"
+        response.headers = headers or {}
+        return response
+
+    def test_timeout_is_passed_to_session(self):
+        with mock.patch.object(
+            self.client.session, "get", return_value=self.response(200)
+        ) as mock_get:
+            self.client.get("/svg/abc?")
+
+        mock_get.assert_called_once_with(
+            "http://local:3000/svg/abc?", timeout=(1, 2), stream=False, headers=None
+        )
+
+    def test_transient_statuses_are_retried(self):
+        responses = [self.response(503), self.response(502), self.response(200)]
+        with mock.patch.object(self.client.session, "get", side_effect=responses):
+            response = self.client.get("/svg/abc?")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_attempts_are_reported_on_error(self):
+        responses = [self.response(504)] * 3
+        with mock.patch.object(self.client.session, "get", side_effect=responses):
+            with self.assertRaises(MermaidError) as context:
+                self.client.get("/svg/abc?")
+
+        self.assertEqual(context.exception.attempts, 3)
+        self.assertEqual(context.exception.status_code, 504)
+
+    def test_client_errors_are_not_retried(self):
+        with mock.patch.object(
+            self.client.session, "get", return_value=self.response(400)
+        ) as mock_get:
+            with self.assertRaises(MermaidError) as context:
+                self.client.get("/svg/abc?")
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(context.exception.attempts, 1)
+        self.sleep.assert_not_called()
+
+    def test_connection_errors_are_retried_then_raised(self):
+        errors = [
+            requests.ConnectionError("refused"),
+            requests.ConnectionError("refused"),
+            requests.ReadTimeout("slow"),
+        ]
+        with mock.patch.object(
+            self.client.session, "get", side_effect=errors
+        ) as mock_get:
+            with self.assertRaises(requests.ReadTimeout):
+                self.client.get("/svg/abc?")
+
+        self.assertEqual(mock_get.call_count, 3)
+
+    def test_retry_after_is_honored(self):
+        responses = [self.response(429, {"Retry-After": "7"}), self.response(200)]
+        with mock.patch.object(self.client.session, "get", side_effect=responses):
+            self.client.get("/svg/abc?")
+
+        self.sleep.assert_called_once_with(7.0)
+
+    def test_retry_after_is_capped(self):
+        policy = RetryPolicy(backoff_max=5)
+        response = self.response(503, {"Retry-After": "Wed, 21 Oct 2099 07:28:00 GMT"})
+
+        self.assertEqual(policy.delay(1, response), 5)
+
+    def test_backoff_is_jittered_and_exponential(self):
+        policy = RetryPolicy(backoff_factor=1, backoff_max=10)
+        for attempt, ceiling in [(1, 1), (2, 2), (3, 4), (4, 8), (6, 10)]:
+            delays = [policy.backoff(attempt) for _ in range(50)]
+            self.assertTrue(all(0 <= delay <= ceiling for delay in delays))
+            self.assertGreater(len(set(delays)), 1)
+
+    def test_no_retry_by_default(self):
+        client = RenderClient("http://local:3000")
+        with mock.patch.object(
+            client.session, "get", return_value=self.response(503)
+        ) as mock_get:
+            with self.assertRaises(MermaidError):
+                client.get("/svg/abc?")
+
+        self.assertEqual(mock_get.call_count, 1)
+
+
+class TestRequestCoalescing(unittest.TestCase):
+    def setUp(self) -> None:
+        self.release = threading.Event()
+
+    def render_concurrently(self, client, paths):
+        results: list = [None] * len(paths)
+
+        def work(index):
+            try:
+                results[index] = client.get(paths[index])
+            except Exception as error:
+                results[index] = error
+
+        threads = [
+            threading.Thread(target=work, args=(index,)) for index in range(len(paths))
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def get(self, url, **kwargs):
+        self.release.wait(5)
+        response = mock.Mock()
+        response.ok = "/bad/" not in url
+        response.status_code = 200 if response.ok else 400
+        response.text = "bad"
+        return response
+
+    def test_identical_concurrent_requests_share_one_call(self):
+        client = RenderClient("http://local:3000")
+        with mock.patch.object(client.session, "get", side_effect=self.get) as get:
+            results = self.render_concurrently(client, ["/svg/abc?"] * 8)
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(client.coalesced, 7)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_different_urls_are_not_coalesced(self):
+        client = RenderClient("http://local:3000")
+        with mock.patch.object(client.session, "get", side_effect=self.get) as get:
+            self.render_concurrently(client, ["/svg/abc?", "/img/abc?format=png"])
+
+        self.assertEqual(get.call_count, 2)
+
+    def test_errors_are_shared(self):
+        client = RenderClient("http://local:3000")
+        with mock.patch.object(client.session, "get", side_effect=self.get) as get:
+            results = self.render_concurrently(client, ["/bad/abc?"] * 4)
+
+        self.assertEqual(get.call_count, 1)
+        self.assertTrue(all(isinstance(result, MermaidError) for result in results))
+
+    def test_coalescing_can_be_disabled(self):
+        client = RenderClient("http://local:3000", coalesce=False)
+        with mock.patch.object(client.session, "get", side_effect=self.get) as get:
+            self.render_concurrently(client, ["/svg/abc?"] * 4)
+
+        self.assertEqual(get.call_count, 4)
+
+    def test_sequential_requests_are_sent_again(self):
+        client = RenderClient("http://local:3000")
+        self.release.set()
+        with mock.patch.object(client.session, "get", side_effect=self.get) as get:
+            client.get("/svg/abc?")
+            client.get("/svg/abc?")
+
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(client._in_flight, {})
+
+
+class TestLoadBalancing(unittest.TestCase):
+    @staticmethod
+    def response(status_code):
+        response = mock.Mock()
+        response.ok = status_code < 400
+        response.status_code = status_code
+        response.text = "body"
+        response.headers = {}
+        return response
+
+    def test_servers_are_read_from_environment_list(self):
+        servers = "http://a:3000, http://b:3000/ ,"
+        with mock.patch.dict(os.environ, {"MERMAID_INK_SERVER": servers}):
+            client = RenderClient()
+            self.assertEqual(client.servers, ("http://a:3000", "http://b:3000"))
+            self.assertEqual(client.server, "http://a:3000")
+            self.assertEqual(client.pool.urls, client.servers)
+
+    def test_pool_is_rebuilt_when_servers_change(self):
+        client = RenderClient()
+        with mock.patch.dict(os.environ, {"MERMAID_INK_SERVER": "http://a"}):
+            pool = client.pool
+            self.assertIs(client.pool, pool)
+        with mock.patch.dict(os.environ, {"MERMAID_INK_SERVER": "http://a,http://b"}):
+            self.assertEqual(client.pool.urls, ("http://a", "http://b"))
+
+    def test_empty_pool_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ServerPool(" , ")
+
+    def test_least_outstanding_server_is_chosen(self):
+        pool = ServerPool(["http://a", "http://b", "http://c"])
+        first = pool.acquire()
+        second = pool.acquire()
+        pool.release(first, ok=True)
+        third = pool.acquire()
+        fourth = pool.acquire()
+
+        self.assertEqual(len({first.url, second.url, third.url}), 3)
+        self.assertIs(fourth, first)
+        self.assertEqual([server.outstanding for server in pool.servers], [1, 1, 1])
+
+    def test_idle_servers_are_used_round_robin(self):
+        pool = ServerPool(["http://a", "http://b"])
+        urls = []
+        for _ in range(4):
+            server = pool.acquire()
+            urls.append(server.url)
+            pool.release(server, ok=True)
+
+        self.assertEqual(urls, ["http://a", "http://b", "http://a", "http://b"])
+
+    @mock.patch("mermaid.client.time.monotonic", return_value=100.0)
+    def test_server_with_open_breaker_is_skipped(self, _):
+        pool = ServerPool(["http://a", "http://b"], failure_threshold=2)
+        bad = pool.servers[0]
+        for _ in range(2):
+            pool.acquire(exclude=[pool.servers[1]])
+            pool.release(bad, ok=False)
+
+        self.assertIs(bad.state, BreakerState.OPEN)
+        for _ in range(4):
+            server = pool.acquire()
+            pool.release(server, ok=True)
+            self.assertEqual(server.url, "http://b")
+
+    @mock.patch("mermaid.client.time.monotonic", return_value=100.0)
+    def test_server_due_for_probe_is_preferred(self, monotonic):
+        pool = ServerPool(["http://a", "http://b"], failure_threshold=1, cooldown=10)
+        bad = pool.servers[0]
+        pool.acquire(exclude=[pool.servers[1]])
+        pool.release(bad, ok=False)
+
+        monotonic.return_value = 111.0
+        self.assertIs(pool.acquire(), bad)
+        self.assertEqual(pool.acquire().url, "http://b")
+
+    def test_all_open_breakers_fail_fast(self):
+        pool = ServerPool(["http://a", "http://b"], failure_threshold=1)
+        for server in list(pool.servers):
+            pool.acquire(
+                exclude=[other for other in pool.servers if other is not server]
+            )
+            pool.release(server, ok=False)
+
+        with self.assertRaises(CircuitOpenError):
+            pool.acquire()
+        self.assertEqual(
+            pool.states(),
+            {"http://a": BreakerState.OPEN, "http://b": BreakerState.OPEN},
+        )
+
+    def test_connection_errors_fail_over_to_another_server(self):
+        client = RenderClient(["http://a", "http://b"], failure_threshold=1)
+
+        def get(url, **kwargs):
+            if url.startswith("http://a"):
+                raise requests.ConnectionError("refused")
+            return self.response(200)
+
+        with mock.patch.object(client.session, "get", side_effect=get) as mock_get:
+            for _ in range(2):
+                self.assertEqual(client.get("/svg/abc?").status_code, 200)
+
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertIs(client.pool.servers[0].state, BreakerState.OPEN)
+        self.assertIs(client.pool.servers[1].state, BreakerState.CLOSED)
+
+    def test_each_server_is_tried_once_before_raising(self):
+        client = RenderClient(["http://a", "http://b"])
+        with mock.patch.object(
+            client.session, "get", side_effect=requests.ConnectionError("refused")
+        ) as mock_get:
+            with self.assertRaises(requests.ConnectionError):
+                client.get("/svg/abc?")
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_gateway_errors_count_as_failures(self):
+        client = RenderClient("http://a")
+        with mock.patch.object(
+            client.session,
+            "get",
+            side_effect=[self.response(503), self.response(400)],
+        ):
+            with self.assertRaises(MermaidError) as context:
+                client.get("/svg/abc?")
+            self.assertEqual(client.pool.servers[0].breaker.failures, 1)
+            with self.assertRaises(MermaidError):
+                client.get("/svg/abc?")
+
+        self.assertEqual(context.exception.url, "http://a/svg/abc?")
+        self.assertEqual(client.pool.servers[0].breaker.failures, 0)
+
+
+@mock.patch("mermaid.client.time.monotonic", return_value=100.0)
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.breaker = CircuitBreaker(failure_threshold=3, cooldown=10)
+
+    def open(self):
+        for _ in range(3):
+            self.breaker.on_request()
+            self.breaker.on_failure()
+
+    def test_opens_after_consecutive_failures(self, _):
+        for _ in range(2):
+            self.breaker.on_failure()
+        self.breaker.on_success()
+        for _ in range(2):
+            self.breaker.on_failure()
+        self.assertIs(self.breaker.state, BreakerState.CLOSED)
+
+        self.breaker.on_failure()
+        self.assertIs(self.breaker.state, BreakerState.OPEN)
+        self.assertFalse(self.breaker.available)
+
+    def test_single_probe_after_cooldown(self, monotonic):
+        self.open()
+        monotonic.return_value = 110.0
+
+        self.assertIs(self.breaker.state, BreakerState.HALF_OPEN)
+        self.assertTrue(self.breaker.available)
+        self.breaker.on_request()
+        self.assertFalse(self.breaker.available)
+
+    def test_successful_probe_closes(self, monotonic):
+        self.open()
+        monotonic.return_value = 110.0
+        self.breaker.on_request()
+        self.breaker.on_success()
+
+        self.assertIs(self.breaker.state, BreakerState.CLOSED)
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_failed_probe_reopens_for_another_cooldown(self, monotonic):
+        self.open()
+        monotonic.return_value = 110.0
+        self.breaker.on_request()
+        self.breaker.on_failure()
+
+        self.assertIs(self.breaker.state, BreakerState.OPEN)
+        monotonic.return_value = 119.0
+        self.assertFalse(self.breaker.available)
+        monotonic.return_value = 120.0
+        self.assertTrue(self.breaker.available)
+
+    def test_client_fails_fast_while_open(self, _):
+        client = RenderClient(["http://a", "http://b"], failure_threshold=2, timeout=1)
+        with mock.patch.object(
+            client.session, "get", side_effect=requests.ReadTimeout("slow")
+        ) as mock_get:
+            for _ in range(4):
+                with self.assertRaises(requests.ReadTimeout):
+                    client.get("/svg/abc?")
+            with self.assertRaises(CircuitOpenError):
+                client.get("/svg/abc?")
+
+        self.assertEqual(mock_get.call_count, 4)
+        self.assertEqual(
+            client.pool.states(),
+            {"http://a": BreakerState.OPEN, "http://b": BreakerState.OPEN},
+        )
+
+    def test_single_server_is_never_blocked(self, _):
+        client = RenderClient("http://a", failure_threshold=2, timeout=1)
+        with mock.patch.object(
+            client.session, "get", side_effect=requests.ReadTimeout("slow")
+        ) as mock_get:
+            for _ in range(3):
+                with self.assertRaises(requests.ReadTimeout):
+                    client.get("/svg/abc?")
+
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(client.pool.states(), {"http://a": BreakerState.OPEN})
+
+
+class TestRetryWithCircuitBreaker(unittest.TestCase):
+    def setUp(self) -> None:
+        sleep_patcher = mock.patch("mermaid.client.time.sleep")
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    @staticmethod
+    def response(status_code):
+        response = mock.Mock()
+        response.ok = status_code < 400
+        response.status_code = status_code
+        response.text = "body"
+        response.headers = {}
+        return response
+
+    def test_single_server_uses_every_retry(self):
+        client = RenderClient(
+            "http://a", failure_threshold=3, retry=RetryPolicy(retries=5)
+        )
+        with mock.patch.object(
+            client.session, "get", return_value=self.response(503)
+        ) as mock_get:
+            with self.assertRaises(MermaidError) as context:
+                client.get("/svg/abc?")
+
+        self.assertEqual(mock_get.call_count, 6)
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(context.exception.attempts, 6)
+        self.assertIs(client.pool.servers[0].state, BreakerState.OPEN)
+
+    def test_recovered_single_server_is_used_at_once(self):
+        client = RenderClient("http://a", failure_threshold=1, cooldown=30)
+        with mock.patch.object(
+            client.session,
+            "get",
+            side_effect=[requests.ConnectionError("refused"), self.response(200)],
+        ):
+            with self.assertRaises(requests.ConnectionError) as context:
+                client.get("/svg/abc?")
+            self.assertNotIsInstance(context.exception, CircuitOpenError)
+            self.assertEqual(client.get("/svg/abc?").status_code, 200)
+
+        self.assertIs(client.pool.servers[0].state, BreakerState.CLOSED)
+
+    def test_last_response_is_raised_when_breakers_open(self):
+        client = RenderClient(
+            ["http://a", "http://b"], failure_threshold=1, retry=RetryPolicy(retries=5)
+        )
+        with mock.patch.object(
+            client.session, "get", return_value=self.response(503)
+        ) as mock_get:
+            with self.assertRaises(MermaidError) as context:
+                client.get("/svg/abc?")
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(context.exception.attempts, 2)
+        self.assertEqual(context.exception.url, "http://b/svg/abc?")
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_last_connection_error_is_raised_when_breakers_open(self):
+        client = RenderClient(
+            ["http://a", "http://b"], failure_threshold=1, retry=RetryPolicy(retries=5)
+        )
+        refused = requests.ConnectionError("refused")
+        with mock.patch.object(client.session, "get", side_effect=refused) as mock_get:
+            with self.assertRaises(requests.ConnectionError) as context:
+                client.get("/svg/abc?")
+
+        self.assertIs(context.exception, refused)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(self.sleep.call_count, 1)
+
+    def test_open_circuit_is_not_retried(self):
+        client = RenderClient(
+            ["http://a", "http://b"], failure_threshold=1, retry=RetryPolicy(retries=5)
+        )
+        for server in client.pool.servers:
+            server.breaker.on_failure()
+
+        with mock.patch.object(client.session, "get") as mock_get:
+            with self.assertRaises(CircuitOpenError):
+                client.get("/svg/abc?")
+
+        mock_get.assert_not_called()
+        self.sleep.assert_not_called()
+
+
+class _Body(io.RawIOBase):
+    """A response body of `size` bytes produced on demand."""
+
+    def __init__(self, size, fail_after=None):
+        self.remaining = size
+        self.fail_after = fail_after
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.fail_after is not None and self.remaining <= self.fail_after:
+            raise requests.ConnectionError("connection reset")
+        count = min(len(buffer), self.remaining)
+        buffer[:count] = b"\x00" * count
+        self.remaining -= count
+        return count
+
+
+class TestDownload(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.client = RenderClient("http://local:3000")
+
+    @staticmethod
+    def response(body, status_code=200):
+        response = requests.Response()
+        response.status_code = status_code
+        response.raw = body
+        return response
+
+    def test_body_is_streamed_to_file(self):
+        destination = self.directory / "diagram.png"
+        with mock.patch.object(
+            self.client.session, "get", return_value=self.response(_Body(300_000))
+        ) as mock_get:
+            size = self.client.download("/img/abc?type=png", destination)
+
+        self.assertEqual(size, 300_000)
+        self.assertEqual(destination.stat().st_size, 300_000)
+        self.assertEqual(os.listdir(self.directory), ["diagram.png"])
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+
+    def test_memory_does_not_grow_with_body_size(self):
+        body = _Body(32 * 1024 * 1024)
+        with mock.patch.object(
+            self.client.session, "get", return_value=self.response(body)
+        ):
+            tracemalloc.start()
+            try:
+                self.client.download("/img/abc?type=png", self.directory / "big.png")
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertLess(peak, 1024 * 1024)
+
+    def test_interrupted_download_keeps_previous_file(self):
+        destination = self.directory / "diagram.png"
+        destination.write_bytes(b"previous")
+        body = _Body(300_000, fail_after=100_000)
+        with mock.patch.object(
+            self.client.session, "get", return_value=self.response(body)
+        ):
+            with self.assertRaises(requests.ConnectionError):
+                self.client.download("/img/abc?type=png", destination)
+
+        self.assertEqual(destination.read_bytes(), b"previous")
+        self.assertEqual(os.listdir(self.directory), ["diagram.png"])
+
+    def test_error_status_writes_nothing(self):
+        response = self.response(io.BytesIO(b"bad diagram"), status_code=400)
+        with mock.patch.object(self.client.session, "get", return_value=response):
+            with self.assertRaises(MermaidError) as context:
+                self.client.download("/img/abc?type=png", self.directory / "x.png")
+
+        self.assertEqual(context.exception.response_text, "bad diagram")
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_mermaid_streams_unfetched_formats(self):
+        mermaid = Mermaid("graph TD; A-->B;", client=self.client)
+        with mock.patch.object(self.client, "download") as download:
+            mermaid.to_png(self.directory / "diagram.png")
+            mermaid.to_svg(self.directory / "diagram.svg")
+
+        self.assertEqual(
+            [call.args[0] for call in download.call_args_list],
+            [mermaid._build_path("img"), mermaid._build_path("svg")],
+        )
+        self.assertEqual(mermaid._responses, {})
+
+    def test_mermaid_reuses_fetched_format(self):
+        mermaid = Mermaid("graph TD; A-->B;", client=self.client)
+        response = mock.Mock(ok=True, status_code=200, content=b"png")
+        with mock.patch.object(self.client.session, "get", return_value=response):
+            mermaid.img_response
+        with mock.patch.object(self.client, "download") as download:
+            mermaid.to_png(self.directory / "diagram.png")
+
+        download.assert_not_called()
+        self.assertEqual((self.directory / "diagram.png").read_bytes(), b"png")
+
+
+class TestHedging(unittest.TestCase):
+    def setUp(self) -> None:
+        self.slow = FakeMermaidServer(latency=0.5).start()
+        self.addCleanup(self.slow.stop)
+        self.fast = FakeMermaidServer().start()
+        self.addCleanup(self.fast.stop)
+
+    def client(self, servers, initial_delay=0.05):
+        client = RenderClient(
+            servers, hedge=HedgePolicy(initial_delay=initial_delay, min_samples=1000)
+        )
+        self.addCleanup(client.close)
+        return client
+
+    def test_slow_request_is_hedged(self):
+        client = self.client([self.slow.url, self.fast.url])
+
+        start = time.perf_counter()
+        response = client.get("/svg/abc")
+
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertTrue(response.url.startswith(self.fast.url))
+        self.assertEqual((client.hedged, client.hedge_wins), (1, 1))
+        self.assertEqual(self.slow.request_count, 1)
+
+    def test_fast_request_is_not_hedged(self):
+        self.slow.latency = 0
+        client = self.client([self.slow.url, self.fast.url], initial_delay=1.0)
+
+        for _ in range(4):
+            client.get("/svg/abc")
+
+        self.assertEqual((client.hedged, client.hedge_wins), (0, 0))
+        self.assertEqual((self.slow.request_count, self.fast.request_count), (2, 2))
+
+    def test_single_server_is_not_hedged(self):
+        client = self.client(self.slow.url)
+
+        client.get("/svg/abc")
+
+        self.assertEqual(client.hedged, 0)
+
+    def test_failed_first_response_waits_for_the_other(self):
+        failing = FakeMermaidServer(latency=0.1, status=500).start()
+        self.addCleanup(failing.stop)
+        self.fast.latency = 0.2
+        client = self.client([failing.url, self.fast.url])
+
+        response = client.get("/svg/abc")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((client.hedged, client.hedge_wins), (1, 1))
+
+    def test_original_error_is_raised_when_both_fail(self):
+        self.slow.status = self.fast.status = 500
+        self.fast.latency = 0.2
+        client = self.client([self.slow.url, self.fast.url])
+
+        with self.assertRaises(MermaidError) as context:
+            client.get("/svg/abc")
+
+        self.assertTrue(context.exception.url.startswith(self.slow.url))
+        self.assertEqual((client.hedged, client.hedge_wins), (1, 0))
+
+    def test_delay_follows_the_latency_percentile(self):
+        policy = HedgePolicy(percentile=90, min_samples=10, initial_delay=2.0)
+        latencies = [index / 100 for index in range(1, 101)]
+
+        self.assertEqual(policy.delay(latencies[:5]), 2.0)
+        self.assertEqual(policy.delay(latencies), 0.9)
+        self.assertEqual(HedgePolicy(percentile=100).delay(latencies), 1.0)
+        self.assertEqual(HedgePolicy(percentile=0).delay(latencies), 0.01)
+        self.assertEqual(HedgePolicy(min_delay=0.5).delay(latencies), 0.95)
@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 
 from mermaid import Direction
 from mermaid.configuration import Config
@@ -298,3 +299,45 @@ flowchart TB
 \t{links[1]}
 """
         self.assertEqual(expect_script, flowchart.script)
+
+
+class TestFlowChartIncremental(unittest.TestCase):
+    def setUp(self) -> None:
+        self.style = Style("important", color="red")
+        self.first = Node("First")
+        self.second = Node("Second", styles=[self.style])
+
+    def test_appends_match_a_full_build(self):
+        flowchart = FlowChart("stream", [self.first])
+        flowchart.script
+        flowchart.add_link(Link(self.first, self.first))
+        flowchart.add_node(self.second)
+        flowchart.add_link(Link(self.first, self.second))
+
+        rebuilt = FlowChart("stream", flowchart.nodes, flowchart.links)
+        self.assertEqual(flowchart.script, rebuilt.script)
+        self.assertEqual(flowchart.script.count("classDef important"), 1)
+
+    def test_appends_do_not_rebuild(self):
+        flowchart = FlowChart("stream", [self.first])
+        flowchart.script
+        flowchart.add_link(Link(self.first, self.first))
+        with mock.patch.object(FlowChart, "_write_diagram") as write:
+            flowchart.add_node(self.second)
+            flowchart.add_link(Link(self.first, self.second))
+            flowchart.script
+        write.assert_not_called()
+
+    def test_only_appended_diagrams_keep_their_fragments(self):
+        flowchart = FlowChart("stream", [self.first])
+        flowchart.script
+        self.assertIsNone(flowchart._writer)
+        flowchart.add_node(self.second)
+        flowchart.script
+        self.assertIsNotNone(flowchart._writer)
+
+    def test_add_before_build(self):
+        flowchart = FlowChart("stream")
+        flowchart.add_node(self.first)
+        flowchart.add_link(Link(self.first, self.first))
+        self.assertIn("\tfirst --> first\n", flowchart.script)
@@ -1,8 +1,21 @@
+import io
 import os
+import pickle
+import tempfile
+import tracemalloc
 import unittest
 from pathlib import Path
+from unittest import mock
 
-from mermaid.graph import Graph
+from mermaid.erdiagram import Entity
+from mermaid.flowchart import FlowChart, Link, Node
+from mermaid.graph import Graph, ScriptElement, ScriptWriter
+from mermaid.mindmap import Level, Mindmap
+from mermaid.piechart import PieChart
+from mermaid.sequence import Loop, Participant
+from mermaid.statediagram import Composite, Start, State, StateDiagram, Transition
+from mermaid.style import Style
+from mermaid.userjourney import Section, Task
 
 
 class TestGraph(unittest.TestCase):
@@ -37,6 +50,19 @@ class TestGraph(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.graph_test.save(Path("./file-name.txt"))
 
+    def test_graphs_compare_by_value(self) -> None:
+        self.assertEqual(Graph("a", "b"), Graph("a", "b"))
+        self.assertNotEqual(Graph("a", "b"), Graph("a", "c"))
+        self.assertNotEqual(Graph("a", "b"), Graph("c", "b"))
+        self.assertEqual(FlowChart("a", [Node("A")]), FlowChart("a", [Node("A")]))
+        self.assertNotEqual(FlowChart("a", [Node("A")]), FlowChart("a", [Node("B")]))
+        self.assertNotEqual(Graph("a", "b"), "b")
+
+    def test_repr_shows_fields(self) -> None:
+        self.assertEqual(
+            repr(Graph("a", "b")), "Graph(title='a', script='b', config=None)"
+        )
+
     def tearDown(self) -> None:
         if os.path.exists("./test-graph.mmd"):
             os.remove("./test-graph.mmd")
@@ -47,3 +73,251 @@ class TestGraph(unittest.TestCase):
         if os.path.exists("./test-graph-str-path.mmd"):
             os.remove("./test-graph-str-path.mmd")
         return super().tearDown()
+
+
+class Block(ScriptElement):
+    def __init__(self, name: str, children: list) -> None:
+        self.name = name
+        self.children = children
+        self.writes = 0
+
+    def write_script(self, writer: ScriptWriter) -> None:
+        self.writes += 1
+        writer.write(f"begin {self.name}\n")
+        for child in self.children:
+            writer.write_element(child)
+        writer.write("end\n")
+
+
+class Shouting(Block):
+    def __str__(self) -> str:
+        return super().__str__().upper()
+
+
+class TestScriptWriter(unittest.TestCase):
+    def test_write_joins_fragments_in_order(self) -> None:
+        writer = ScriptWriter()
+        writer.write("a", "b")
+        writer.write()
+        writer.write("c")
+        self.assertEqual(writer.getvalue(), "abc")
+
+    def test_write_element_uses_str_of_plain_objects(self) -> None:
+        writer = ScriptWriter()
+        writer.write_element(42)
+        self.assertEqual(writer.getvalue(), "42")
+
+    def test_nested_elements_are_written_once(self) -> None:
+        inner = Block("inner", ["x\n"])
+        outer = Block("outer", [inner, "y\n"])
+        writer = ScriptWriter()
+        writer.write_element(outer)
+        self.assertEqual(
+            writer.getvalue(), "begin outer\nbegin inner\nx\nend\ny\nend\n"
+        )
+        self.assertEqual(inner.writes, 1)
+        self.assertEqual(str(outer), writer.getvalue())
+
+    def test_sections_can_be_appended_later(self) -> None:
+        writer = ScriptWriter()
+        writer.write("a")
+        section = writer.section("middle")
+        writer.write("c")
+        section.write("b")
+        self.assertEqual(writer.getvalue(), "abc")
+        writer.get_section("middle").write("b")  # type: ignore[union-attr]
+        self.assertEqual(writer.getvalue(), "abbc")
+        self.assertIsNone(writer.get_section("missing"))
+
+    def test_overridden_str_is_respected(self) -> None:
+        writer = ScriptWriter()
+        writer.write_element(Block("outer", [Shouting("inner", [])]))
+        self.assertEqual(writer.getvalue(), "begin outer\nBEGIN INNER\nEND\nend\n")
+
+    def test_deeply_nested_subgraphs(self) -> None:
+        node = Node("leaf")
+        for depth in range(50):
+            node = Node(f"group{depth}", sub_nodes=[node])
+        script = FlowChart("nested", [node]).script
+        self.assertEqual(script.count("subgraph "), 50)
+        self.assertEqual(script.count("\nend"), 50)
+        self.assertIn(str(node), script)
+
+
+class TestLazyScript(unittest.TestCase):
+    def setUp(self) -> None:
+        self.first = Node("First")
+        self.second = Node("Second")
+        self.chart = FlowChart("lazy", [self.first], [])
+
+    def test_script_is_not_built_until_read(self) -> None:
+        with mock.patch.object(FlowChart, "_write_diagram") as write:
+            chart = FlowChart("lazy", [Node("A")] * 1000)
+            write.assert_not_called()
+            chart.script
+            chart.script
+        write.assert_called_once()
+
+    def test_list_mutation_invalidates_script(self) -> None:
+        self.assertNotIn("second", self.chart.script)
+        self.chart.nodes.append(self.second)
+        self.chart.links += [Link(self.first, self.second)]
+        self.assertIn('\tsecond["Second"]', self.chart.script)
+        self.assertIn("\tfirst --> second", self.chart.script)
+
+    def test_rebuilds_once_after_many_edits(self) -> None:
+        self.chart.script
+        for index in range(10):
+            self.chart.nodes.append(Node(f"node{index}"))
+        with mock.patch.object(FlowChart, "_write_diagram", autospec=True) as write:
+            self.chart.script
+            self.chart.script
+        write.assert_called_once()
+
+    def test_attribute_assignment_invalidates_script(self) -> None:
+        self.chart.script
+        self.chart.orientation = "LR"
+        self.chart.nodes = [self.second]
+        self.assertIn("flowchart LR\n\tsecond", self.chart.script)
+        self.chart.nodes.append(self.first)
+        self.assertIn("\tfirst", self.chart.script)
+
+    def test_dict_mutation_invalidates_script(self) -> None:
+        pie = PieChart("pie", {"a": 1})
+        pie.script
+        pie.data["b"] = 2
+        self.assertIn('"b" : 2', pie.script)
+
+    def test_invalidate_after_in_place_edit(self) -> None:
+        self.chart.script
+        self.first.content = "Renamed"
+        self.assertNotIn("Renamed", self.chart.script)
+        self.chart.invalidate()
+        self.assertIn("Renamed", self.chart.script)
+
+    def test_styles_follow_the_current_elements(self) -> None:
+        red, blue = Style("red", fill="red"), Style("blue", color="blue")
+        kept, dropped = Node("Kept", styles=[red]), Node("Dropped", styles=[blue])
+        chart = FlowChart("styled", [kept, dropped])
+        self.assertEqual(chart.styles, {red, blue})
+        chart.script
+        chart.nodes.remove(dropped)
+        self.assertNotIn("classDef blue", chart.script)
+        self.assertEqual(chart.styles, {red})
+
+        state = State("A", styles=[blue])
+        diagram = StateDiagram("styled", [state])
+        self.assertEqual(diagram.styles, {blue})
+        diagram.states = []
+        self.assertNotIn("classDef blue", diagram.script)
+        self.assertEqual(diagram.styles, set())
+
+    def test_given_script_is_kept(self) -> None:
+        graph = Graph("given", "graph TD;")
+        graph.title = "renamed"
+        graph.invalidate()
+        self.assertEqual(graph.script, "graph TD;")
+
+    def test_pickle_keeps_observing(self) -> None:
+        chart = pickle.loads(pickle.dumps(self.chart))
+        self.assertEqual(chart.script, self.chart.script)
+        chart.nodes.append(self.second)
+        self.assertIn("second", chart.script)
+
+
+class Exploding(Node):
+    def write_script(self, writer: ScriptWriter) -> None:
+        raise AssertionError("written too early")
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self) -> None:
+        nodes = [Node(f"node {index}", "é") for index in range(3)]
+        self.chart = FlowChart("stream", nodes, [Link(nodes[0], nodes[1])])
+
+    def test_iter_lines_joins_to_the_script(self) -> None:
+        lines = list(self.chart.iter_lines())
+        self.assertEqual(lines[:3], ["---\n", "title: stream\n", "---\n"])
+        self.assertTrue(all(line.endswith("\n") for line in lines))
+        self.assertEqual("".join(lines), self.chart.script)
+
+    def test_iter_lines_does_not_build_the_script(self) -> None:
+        with mock.patch.object(FlowChart, "_build_script") as build:
+            list(self.chart.iter_lines())
+        build.assert_not_called()
+
+    def test_iter_lines_is_lazy(self) -> None:
+        nodes = [Node(f"node{index}") for index in range(5000)]
+        lines = FlowChart("big", [*nodes, Exploding("last")]).iter_lines()
+        self.assertEqual(next(lines), "---\n")
+        with self.assertRaises(AssertionError):
+            list(lines)
+
+    def test_iter_lines_of_a_given_script(self) -> None:
+        graph = Graph("given", "graph TD;\n    A-->B;")
+        self.assertEqual(list(graph.iter_lines()), ["graph TD;\n", "    A-->B;"])
+
+    def test_write_streams_to_a_file_object(self) -> None:
+        buffer = io.StringIO()
+        self.chart.write(buffer)
+        self.assertEqual(buffer.getvalue(), self.chart.script)
+
+    def test_write_flushes_inside_nested_elements(self) -> None:
+        root = Level("root", [Level(f"level {index}") for index in range(5000)])
+        buffer = io.StringIO()
+        with mock.patch.object(buffer, "write", wraps=buffer.write) as write:
+            Mindmap("tree", [root]).write(buffer)
+        self.assertGreater(write.call_count, 2)
+        self.assertEqual(buffer.getvalue(), Mindmap("tree", [root]).script)
+
+    def test_write_of_a_nested_diagram_holds_one_chunk(self) -> None:
+        root = Level("root", [Level(f"level {index}") for index in range(100000)])
+        mindmap = Mindmap("tree", [root])
+        with open(os.devnull, "w", encoding="utf-8") as null:
+            tracemalloc.start()
+            try:
+                mindmap.write(null)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertGreater(len(mindmap.script), 1024 * 1024)
+        self.assertLess(peak, 1024 * 1024)
+
+    def test_save_encodes_as_utf8(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "stream.mmd"
+            with mock.patch("builtins.open", wraps=open) as open_:
+                self.chart.save(path)
+            open_.assert_called_once_with(path, "w", encoding="utf-8")
+            self.assertEqual(path.read_text(encoding="utf-8"), self.chart.script)
+
+
+class TestCompactElements(unittest.TestCase):
+    def test_elements_have_no_instance_dict(self) -> None:
+        state = State("A")
+        elements = [
+            Node("A"),
+            Link(Node("A"), Node("B")),
+            state,
+            Start(),
+            Composite("C", sub_states=[state]),
+            Transition(state, state),
+            Entity("E"),
+            Participant("P"),
+            Loop("forever", []),
+            Level("L"),
+            Section("S", [Task("T", 5, [])]),
+        ]
+        for element in elements:
+            with self.subTest(type(element).__name__):
+                self.assertFalse(hasattr(element, "__dict__"))
+                with self.assertRaises(AttributeError):
+                    element.misspelled = True  # type: ignore[attr-defined]
+
+    def test_attributes_stay_writable(self) -> None:
+        node = Node("A")
+        node.content = "Renamed"
+        self.assertEqual(str(node), 'a["Renamed"]')
+        restored = pickle.loads(pickle.dumps(Node("G", sub_nodes=[node])))
+        self.assertEqual(restored.sub_nodes[0].content, "Renamed")
@@ -1,9 +1,12 @@
 import unittest
 
+import pytest
+
 from mermaid import Mermaid
 from mermaid.graph import Graph
 
 
+@pytest.mark.usefixtures("mermaid_ink")
 class TestMermaidWithMalayalam(unittest.TestCase):
     def setUp(self) -> None:
         self.script: str = """
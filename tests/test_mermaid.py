@@ -1,14 +1,34 @@
+import base64
+import gc
+import json
 import os
+import threading
+import tracemalloc
 import unittest
+import zlib
 from pathlib import Path
 from unittest import mock
 
-from mermaid import Mermaid, MermaidError, Position
+import pytest
+
+from mermaid import (
+    Encoding,
+    MemoryCache,
+    Mermaid,
+    MermaidError,
+    Position,
+    RenderClient,
+    set_default_client,
+)
 from mermaid.graph import Graph
+from mermaid.testing import PNG_BODY, SVG_BODY, FakeMermaidServer
 
 
+@pytest.mark.usefixtures("mermaid_ink")
 class TestMermaid(unittest.TestCase):
     def setUp(self) -> None:
+        set_default_client(None)
+        self.addCleanup(set_default_client, None)
         self.script: str = """graph TD;
     A-->B;
     A-->C;
@@ -114,6 +134,8 @@ class TestMermaidError(unittest.TestCase):
     """Test cases for MermaidError exception."""
 
     def setUp(self) -> None:
+        set_default_client(None)
+        self.addCleanup(set_default_client, None)
         self.script: str = """graph TD;
     A-->B;
     A-->C;
@@ -124,7 +146,7 @@ class TestMermaidError(unittest.TestCase):
 
     def test_mermaid_error_on_400_bad_request(self):
         """Test that MermaidError is raised when API returns 400."""
-        with mock.patch("requests.get") as mock_get:
+        with mock.patch("requests.Session.get") as mock_get:
             mock_response = mock.Mock()
             mock_response.ok = False
             mock_response.status_code = 400
@@ -132,7 +154,7 @@ class TestMermaidError(unittest.TestCase):
             mock_get.return_value = mock_response
 
             with self.assertRaises(MermaidError) as context:
-                Mermaid(self.graph)
+                Mermaid(self.graph).svg_response
 
             error = context.exception
             self.assertEqual(error.status_code, 400)
@@ -141,7 +163,7 @@ class TestMermaidError(unittest.TestCase):
 
     def test_mermaid_error_on_500_internal_server_error(self):
         """Test that MermaidError is raised when API returns 500."""
-        with mock.patch("requests.get") as mock_get:
+        with mock.patch("requests.Session.get") as mock_get:
             mock_response = mock.Mock()
             mock_response.ok = False
             mock_response.status_code = 500
@@ -149,7 +171,7 @@ class TestMermaidError(unittest.TestCase):
             mock_get.return_value = mock_response
 
             with self.assertRaises(MermaidError) as context:
-                Mermaid(self.graph)
+                Mermaid(self.graph).svg_response
 
             error = context.exception
             self.assertEqual(error.status_code, 500)
@@ -158,7 +180,7 @@ class TestMermaidError(unittest.TestCase):
 
     def test_mermaid_error_on_503_service_unavailable(self):
         """Test that MermaidError is raised when API returns 503."""
-        with mock.patch("requests.get") as mock_get:
+        with mock.patch("requests.Session.get") as mock_get:
             mock_response = mock.Mock()
             mock_response.ok = False
             mock_response.status_code = 503
@@ -166,7 +188,7 @@ class TestMermaidError(unittest.TestCase):
             mock_get.return_value = mock_response
 
             with self.assertRaises(MermaidError) as context:
-                Mermaid(self.graph)
+                Mermaid(self.graph).svg_response
 
             error = context.exception
             self.assertEqual(error.status_code, 503)
@@ -174,7 +196,7 @@ class TestMermaidError(unittest.TestCase):
 
     def test_mermaid_error_on_404_not_found(self):
         """Test that MermaidError is raised when API returns 404."""
-        with mock.patch("requests.get") as mock_get:
+        with mock.patch("requests.Session.get") as mock_get:
             mock_response = mock.Mock()
             mock_response.ok = False
             mock_response.status_code = 404
@@ -182,7 +204,7 @@ class TestMermaidError(unittest.TestCase):
             mock_get.return_value = mock_response
 
             with self.assertRaises(MermaidError) as context:
-                Mermaid(self.graph)
+                Mermaid(self.graph).svg_response
 
             error = context.exception
             self.assertEqual(error.status_code, 404)
@@ -190,7 +212,7 @@ class TestMermaidError(unittest.TestCase):
 
     def test_mermaid_error_contains_metadata(self):
         """Test that MermaidError stores error metadata."""
-        with mock.patch("requests.get") as mock_get:
+        with mock.patch("requests.Session.get") as mock_get:
             mock_response = mock.Mock()
             mock_response.ok = False
             mock_response.status_code = 400
@@ -198,7 +220,7 @@ class TestMermaidError(unittest.TestCase):
             mock_get.return_value = mock_response
 
             with self.assertRaises(MermaidError) as context:
-                Mermaid(self.graph)
+                Mermaid(self.graph).svg_response
 
             error = context.exception
             self.assertEqual(error.status_code, 400)
@@ -209,7 +231,7 @@ class TestMermaidError(unittest.TestCase):
         """Test that MermaidError truncates long response messages."""
         long_error_text = "x" * 600  # Longer than 500 chars
 
-        with mock.patch("requests.get") as mock_get:
+        with mock.patch("requests.Session.get") as mock_get:
             mock_response = mock.Mock()
             mock_response.ok = False
             mock_response.status_code = 400
@@ -217,8 +239,201 @@ class TestMermaidError(unittest.TestCase):
             mock_get.return_value = mock_response
 
             with self.assertRaises(MermaidError) as context:
-                Mermaid(self.graph)
+                Mermaid(self.graph).svg_response
 
             error_message = str(context.exception)
             # Should contain truncation indicator
             self.assertIn("...", error_message)
+
+    def test_mermaid_does_not_request_on_construction(self):
+        """Test that creating a Mermaid object makes no request."""
+        with mock.patch("requests.Session.get") as mock_get:
+            Mermaid(self.graph)
+
+            mock_get.assert_not_called()
+
+    def test_mermaid_fetches_each_format_once(self):
+        """Test that each format is requested independently and memoized."""
+        with mock.patch("requests.Session.get") as mock_get:
+            mock_response = mock.Mock()
+            mock_response.ok = True
+            mock_response.status_code = 200
+            mock_response.text = "<svg></svg>"
+            mock_get.return_value = mock_response
+
+            mermaid = Mermaid(self.graph)
+            mermaid.svg_response
+            mermaid._repr_html_()
+            self.assertEqual(mock_get.call_count, 1)
+            self.assertIn("/svg/", mock_get.call_args[0][0])
+
+            mermaid.img_response
+            mermaid.img_response
+            self.assertEqual(mock_get.call_count, 2)
+            self.assertIn("/img/", mock_get.call_args[0][0])
+
+    def test_prefetch_fetches_formats_concurrently(self):
+        """Test that prefetch sends the SVG and IMG requests at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+        mock_response = mock.Mock()
+        mock_response.ok = True
+        mock_response.status_code = 200
+
+        def get(url, **kwargs):
+            barrier.wait()
+            return mock_response
+
+        with mock.patch("requests.Session.get", side_effect=get) as mock_get:
+            mermaid = Mermaid(self.graph)
+            mermaid.prefetch()
+            mermaid.svg_response
+            mermaid.img_response
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_prefetch_reports_failing_url(self):
+        """Test that a concurrent failure still reports the failing URL."""
+
+        def get(url, **kwargs):
+            response = mock.Mock()
+            response.ok = "/img/" not in url
+            response.status_code = 200 if response.ok else 503
+            response.text = "unavailable"
+            return response
+
+        with mock.patch("requests.Session.get", side_effect=get):
+            mermaid = Mermaid(self.graph)
+            with self.assertRaises(MermaidError) as context:
+                mermaid.prefetch()
+
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertIn("/img/", context.exception.url)
+        self.assertTrue(mermaid.svg_response.ok)
+
+
+class TestMermaidEncoding(unittest.TestCase):
+    """Test cases for the encoding of the script in the request URL."""
+
+    def setUp(self) -> None:
+        set_default_client(None)
+        self.addCleanup(set_default_client, None)
+        self.small_script: str = "graph TD;\n    A-->B;"
+        self.large_script: str = "graph TD;\n" + "\n".join(
+            f"    A{index}-->B{index};" for index in range(200)
+        )
+
+    @staticmethod
+    def decode_pako(diagram: str) -> dict:
+        compressed = base64.urlsafe_b64decode(diagram[len("pako:") :])
+        return json.loads(zlib.decompress(compressed).decode("utf-8"))
+
+    def test_small_scripts_default_to_base64(self):
+        mermaid = Mermaid(self.small_script)
+
+        self.assertEqual(
+            base64.urlsafe_b64decode(mermaid._diagram).decode("utf-8"),
+            self.small_script,
+        )
+
+    def test_large_scripts_default_to_pako(self):
+        mermaid = Mermaid(self.large_script)
+
+        self.assertTrue(mermaid._diagram.startswith("pako:"))
+        self.assertEqual(self.decode_pako(mermaid._diagram)["code"], self.large_script)
+        self.assertTrue(mermaid._build_path("svg").startswith("/svg/pako:"))
+        self.assertLess(
+            len(mermaid._diagram),
+            len(Mermaid(self.large_script, encoding="base64")._diagram) / 2,
+        )
+
+    def test_encoding_can_be_forced(self):
+        pako = Mermaid(self.small_script, encoding=Encoding.PAKO)
+        plain = Mermaid(self.large_script, encoding=Encoding.BASE64)
+
+        self.assertEqual(self.decode_pako(pako._diagram)["code"], self.small_script)
+        self.assertFalse(plain._diagram.startswith("pako:"))
+
+    def test_pako_keeps_non_ascii_text(self):
+        script = "graph TD;\n    A[മലയാളം]-->B[日本語];"
+        mermaid = Mermaid(script, encoding="pako")
+
+        self.assertEqual(self.decode_pako(mermaid._diagram)["code"], script)
+
+    def test_unknown_encoding_raises(self):
+        with self.assertRaises(ValueError):
+            Mermaid(self.small_script, encoding="gzip")
+
+
+class TestLeanMermaid(unittest.TestCase):
+    """Test cases for Mermaid objects that keep only the rendered bodies."""
+
+    def setUp(self) -> None:
+        self.server = FakeMermaidServer().__enter__()
+        self.addCleanup(self.server.__exit__)
+        self.client = RenderClient(self.server.url)
+        self.addCleanup(self.client.close)
+
+    def render(self, count, lean):
+        mermaids = [
+            Mermaid(
+                f"graph TD;\n    A{index}-->B{index};", client=self.client, lean=lean
+            )
+            for index in range(count)
+        ]
+        for mermaid in mermaids:
+            mermaid.prefetch(concurrent=False)
+        return mermaids
+
+    def footprint(self, count, lean):
+        """Return the memory held per rendered instance, in bytes."""
+        self.render(1, lean)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            mermaids = self.render(count, lean)
+            gc.collect()
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(mermaids), count)
+        return (after - before) / count
+
+    def test_lean_mode_keeps_only_bodies(self):
+        mermaid = Mermaid("graph TD;\n    A-->B;", client=self.client, lean=True)
+
+        self.assertEqual(mermaid.svg_response.text, SVG_BODY.decode())
+        self.assertEqual(mermaid.img_response.content, PNG_BODY)
+        self.assertEqual(mermaid._responses, {})
+        self.assertEqual(mermaid._bodies, {"svg": SVG_BODY, "img": PNG_BODY})
+        self.assertEqual(mermaid.svg_response.headers["Content-Type"], "image/svg+xml")
+
+    def test_lean_mode_fetches_each_format_once(self):
+        mermaid = Mermaid("graph TD;\n    A-->B;", client=self.client, lean=True)
+        with mock.patch.object(self.client, "get", wraps=self.client.get) as mock_get:
+            mermaid.prefetch()
+            mermaid.svg_response
+            mermaid._repr_html_()
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_lean_mode_with_cache_keeps_nothing(self):
+        cache = MemoryCache()
+        mermaid = Mermaid(
+            "graph TD;\n    A-->B;", client=self.client, cache=cache, lean=True
+        )
+        with mock.patch.object(self.client, "get", wraps=self.client.get) as mock_get:
+            mermaid.img_response
+            png = mermaid.img_response.content
+
+        self.assertEqual(png, PNG_BODY)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(mermaid._bodies, {})
+
+    def test_lean_instances_are_smaller(self):
+        regular = self.footprint(20, lean=False)
+        lean = self.footprint(20, lean=True)
+
+        self.assertLess(lean, regular / 4)
+        self.assertLess(lean, 4096)
@@ -0,0 +1,199 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+from mermaid import (
+    FreshnessPolicy,
+    MemoryCache,
+    Mermaid,
+    MermaidError,
+    RenderClient,
+    observe,
+)
+from mermaid.client import RetryPolicy
+from mermaid.observe import EventType, OpenTelemetryObserver, RenderEvent
+from mermaid.testing import SVG_BODY, FakeMermaidServer
+
+SCRIPT = "graph TD;\n    A-->B;"
+
+
+class TestRenderEvents(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeMermaidServer().start()
+        self.addCleanup(self.server.stop)
+        self.events: list[RenderEvent] = []
+        self.client = RenderClient(
+            self.server.url,
+            retry=RetryPolicy(retries=1, backoff_factor=0),
+            observers=[self.events.append],
+        )
+        self.addCleanup(self.client.close)
+
+    def types(self) -> list[EventType]:
+        return [event.type for event in self.events]
+
+    def test_render_events(self):
+        Mermaid(SCRIPT, client=self.client).svg_response
+
+        self.assertEqual(
+            self.types(),
+            [
+                EventType.ENCODE_START,
+                EventType.ENCODE_END,
+                EventType.REQUEST_SENT,
+                EventType.FIRST_BYTE,
+                EventType.BYTES_RECEIVED,
+            ],
+        )
+        encode_start, encode_end, sent, first_byte, received = self.events
+        self.assertEqual(encode_start.size, len(SCRIPT))
+        self.assertGreater(encode_end.size, 0)
+        self.assertTrue(sent.url.startswith(self.server.url + "/svg/"))
+        self.assertEqual((sent.attempt, first_byte.status), (1, 200))
+        self.assertEqual(received.size, len(SVG_BODY))
+        self.assertGreaterEqual(received.duration, first_byte.duration)
+        self.assertLessEqual(sent.timestamp, first_byte.timestamp)
+
+    def test_retry_and_error_events(self):
+        self.server.status = 503
+
+        with self.assertRaises(MermaidError):
+            Mermaid(SCRIPT, client=self.client).svg_response
+
+        self.assertEqual(
+            self.types()[2:],
+            [
+                EventType.REQUEST_SENT,
+                EventType.FIRST_BYTE,
+                EventType.ERROR,
+                EventType.RETRY,
+                EventType.REQUEST_SENT,
+                EventType.FIRST_BYTE,
+                EventType.ERROR,
+            ],
+        )
+        retry = self.events[5]
+        self.assertEqual((retry.attempt, retry.status), (1, 503))
+        self.assertEqual(self.events[-1].attempt, 2)
+
+    def test_connection_error_event(self):
+        self.server.stop()
+        self.client.retry = None
+
+        with self.assertRaises(requests.ConnectionError):
+            self.client.get("/svg/abc")
+
+        self.assertEqual(self.types(), [EventType.REQUEST_SENT, EventType.ERROR])
+        self.assertIsNotNone(self.events[-1].error)
+
+    def test_cache_events(self):
+        cache = MemoryCache()
+
+        Mermaid(SCRIPT, client=self.client, cache=cache).svg_response
+        Mermaid(SCRIPT, client=self.client, cache=cache).svg_response
+
+        cache_events = [
+            event
+            for event in self.events
+            if event.type in (EventType.CACHE_HIT, EventType.CACHE_MISS)
+        ]
+        self.assertEqual(
+            [event.type for event in cache_events],
+            [EventType.CACHE_MISS, EventType.CACHE_HIT],
+        )
+        self.assertEqual(cache_events[0].key, cache_events[1].key)
+        self.assertEqual(self.server.request_count, 1)
+
+    def test_revalidated_cache_hit(self):
+        cache = MemoryCache(freshness=FreshnessPolicy(max_age=0))
+
+        Mermaid(SCRIPT, client=self.client, cache=cache).svg_response
+        Mermaid(SCRIPT, client=self.client, cache=cache).svg_response
+
+        hits = [event for event in self.events if event.type is EventType.CACHE_HIT]
+        self.assertEqual([event.status for event in hits], [304])
+
+    def test_download_events(self):
+        with tempfile.TemporaryDirectory() as directory:
+            Mermaid(SCRIPT, client=self.client).to_svg(Path(directory) / "out.svg")
+
+        self.assertEqual(self.types()[-1], EventType.BYTES_RECEIVED)
+        self.assertEqual(self.events[-1].size, len(SVG_BODY))
+        self.assertEqual(self.types().count(EventType.BYTES_RECEIVED), 1)
+
+    def test_add_and_remove_observer(self):
+        other: list[RenderEvent] = []
+        self.client.add_observer(other.append)
+        self.client.get("/svg/abc")
+        self.client.remove_observer(other.append)
+        self.client.get("/svg/abc")
+
+        self.assertEqual(len(other), 3)
+        self.assertEqual(len(self.events), 6)
+
+    def test_no_event_without_observers(self):
+        self.client.observers = []
+
+        with mock.patch.object(RenderEvent, "__init__") as init:
+            Mermaid(SCRIPT, client=self.client).svg_response
+
+        init.assert_not_called()
+
+
+class TestOpenTelemetryObserver(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeMermaidServer().start()
+        self.addCleanup(self.server.stop)
+        self.tracer = mock.Mock()
+        self.spans: list[mock.Mock] = []
+        self.tracer.start_span.side_effect = self.start_span
+        self.client = RenderClient(
+            self.server.url, observers=[OpenTelemetryObserver(self.tracer)]
+        )
+        self.addCleanup(self.client.close)
+
+    def start_span(self, name, **kwargs):
+        span = mock.Mock(name=name)
+        span.span_name = name
+        self.spans.append(span)
+        return span
+
+    def test_encode_and_request_spans(self):
+        Mermaid(SCRIPT, client=self.client).svg_response
+
+        self.assertEqual(
+            [span.span_name for span in self.spans],
+            ["mermaid.encode", "mermaid.request"],
+        )
+        for span in self.spans:
+            span.end.assert_called_once()
+        self.spans[1].add_event.assert_called_once_with(
+            "first_byte", timestamp=mock.ANY
+        )
+
+    def test_error_ends_request_span(self):
+        self.server.status = 500
+
+        with self.assertRaises(MermaidError):
+            self.client.get("/svg/abc")
+
+        (span,) = self.spans
+        span.add_event.assert_called_with(
+            "error", attributes=mock.ANY, timestamp=mock.ANY
+        )
+        self.assertEqual(
+            span.add_event.call_args.kwargs["attributes"]["http.status_code"], 500
+        )
+        span.end.assert_called_once()
+
+    def test_requires_opentelemetry_without_tracer(self):
+        with mock.patch.object(observe, "trace", None):
+            with self.assertRaises(ImportError):
+                OpenTelemetryObserver()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from mermaid import RateLimiter, RateLimitExceeded, RenderClient
+from mermaid.client import RetryPolicy
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 1000.0
+        for name in ("monotonic", "time"):
+            patcher = mock.patch(
+                f"mermaid.ratelimit.time.{name}", side_effect=lambda: self.now
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        sleep_patcher = mock.patch("mermaid.ratelimit.time.sleep")
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def test_burst_then_rate(self):
+        limiter = RateLimiter(rate=10, burst=2)
+        waits = [limiter.acquire() for _ in range(5)]
+
+        for wait, expected in zip(waits, [0, 0, 0.1, 0.2, 0.3]):
+            self.assertAlmostEqual(wait, expected)
+        self.assertEqual(self.sleep.call_count, 3)
+        self.assertEqual((limiter.acquired, limiter.delayed), (5, 3))
+        self.assertAlmostEqual(limiter.total_wait, 0.6)
+        self.assertAlmostEqual(limiter.max_wait, 0.3)
+        self.assertAlmostEqual(limiter.mean_wait, 0.12)
+
+    def test_bucket_refills_up_to_burst(self):
+        limiter = RateLimiter(rate=10, burst=3)
+        for _ in range(3):
+            limiter.acquire()
+
+        self.now += 60
+        waits = [limiter.acquire() for _ in range(4)]
+
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertAlmostEqual(waits[3], 0.1)
+
+    def test_non_blocking_limiter_raises(self):
+        limiter = RateLimiter(rate=4, burst=1, block=False)
+        limiter.acquire()
+
+        with self.assertRaises(RateLimitExceeded) as context:
+            limiter.acquire()
+
+        self.assertAlmostEqual(context.exception.retry_after, 0.25)
+        self.assertEqual((limiter.acquired, limiter.rejected), (1, 1))
+        self.now += 0.25
+        self.assertEqual(limiter.acquire(), 0)
+
+    def test_timeout_bounds_the_wait(self):
+        limiter = RateLimiter(rate=10, burst=1, timeout=0.15)
+        waits = [limiter.acquire() for _ in range(2)]
+
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire()
+        self.assertAlmostEqual(waits[1], 0.1)
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(rate=0)
+        with self.assertRaises(ValueError):
+            RateLimiter(rate=1, burst=0)
+
+    def test_lock_file_shares_the_bucket(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        lock_file = os.path.join(directory, "mermaid.ink.bucket")
+        first = RateLimiter(rate=10, burst=2, lock_file=lock_file)
+        second = RateLimiter(rate=10, burst=2, lock_file=lock_file)
+
+        waits = [first.acquire(), first.acquire(), second.acquire()]
+
+        self.assertEqual(waits[:2], [0, 0])
+        self.assertAlmostEqual(waits[2], 0.1)
+        self.assertEqual(second.delayed, 1)
+
+    def test_client_acquires_a_token_per_request(self):
+        limiter = RateLimiter(rate=10, burst=5)
+        client = RenderClient(
+            "http://local:3000", rate_limiter=limiter, retry=RetryPolicy(retries=1)
+        )
+        responses = [
+            mock.Mock(ok=False, status_code=503, text="busy", headers={}),
+            mock.Mock(ok=True, status_code=200),
+        ]
+        with mock.patch("mermaid.client.time.sleep"):
+            with mock.patch.object(client.session, "get", side_effect=responses):
+                client.get("/svg/abc?")
+
+        self.assertEqual(limiter.acquired, 2)
+
+    def test_client_surfaces_rejection_without_request(self):
+        limiter = RateLimiter(rate=1, block=False)
+        client = RenderClient("http://local:3000", rate_limiter=limiter)
+        response = mock.Mock(ok=True, status_code=200)
+        with mock.patch.object(client.session, "get", return_value=response) as get:
+            client.get("/svg/a?")
+            with self.assertRaises(RateLimitExceeded):
+                client.get("/svg/b?")
+
+        self.assertEqual(get.call_count, 1)
+
+
+class TestRateLimiterThreads(unittest.TestCase):
+    def test_threads_share_the_bucket(self):
+        limiter = RateLimiter(rate=50, burst=1)
+        threads = [threading.Thread(target=limiter.acquire) for _ in range(10)]
+
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 9 / 50 - 0.01)
+        self.assertEqual((limiter.acquired, limiter.delayed), (10, 9))
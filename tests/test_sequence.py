@@ -313,3 +313,19 @@ sequenceDiagram
 \tA-->B: message
 """
         self.assertEqual(diagram.script, expected_str)
+
+
+class TestSequenceDiagramIncremental(unittest.TestCase):
+    def test_appends_match_a_full_build(self):
+        alice, bob = Participant("Alice"), Participant("Bob")
+        diagram = SequenceDiagram("stream", [alice, bob], auto_number=True)
+        diagram.script
+        link = Link(alice, bob, ArrowTypes.SOLID_ARROW, "hello")
+        diagram.add_element(link)
+        diagram.add_element(Loop("every minute", [link]))
+
+        with mock.patch.object(SequenceDiagram, "_write_diagram") as write:
+            script = diagram.script
+        write.assert_not_called()
+        rebuilt = SequenceDiagram("stream", diagram.elements, auto_number=True)
+        self.assertEqual(script, rebuilt.script)
@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 
 from mermaid import Config, Direction
 from mermaid.statediagram import (
@@ -532,3 +533,20 @@ stateDiagram-v2
 \t{self.state_2}
 """
         self.assertEqual(except_str, state_diagram.script)
+
+
+class TestStateDiagramIncremental(unittest.TestCase):
+    def test_appends_match_a_full_build(self):
+        first, second = State("First"), State("Second", styles=[Style("s", fill="red")])
+        diagram = StateDiagram("stream", [first])
+        diagram.script
+        diagram.add_transition(Transition(None, first))
+        diagram.add_state(second)
+        diagram.add_state(Composite("Group", sub_states=[State("Inner")]))
+        diagram.add_transition(Transition(first, second))
+
+        with mock.patch.object(StateDiagram, "_write_diagram") as write:
+            script = diagram.script
+        write.assert_not_called()
+        rebuilt = StateDiagram("stream", diagram.states, diagram.transitions)
+        self.assertEqual(script, rebuilt.script)
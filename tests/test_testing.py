@@ -0,0 +1,93 @@
+import os
+import unittest
+
+import pytest
+import requests
+
+from mermaid import Mermaid, MermaidError, RenderClient
+from mermaid.testing import PNG_BODY, SVG_BODY, FakeMermaidServer
+
+
+class TestFakeMermaidServer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeMermaidServer().start()
+        self.addCleanup(self.server.stop)
+        self.client = RenderClient(self.server.url)
+        self.addCleanup(self.client.close)
+        self.mermaid = Mermaid("graph TD;\n    A-->B;", client=self.client)
+
+    def test_renders_deterministic_bodies(self):
+        self.assertEqual(self.mermaid.svg_response.content, SVG_BODY)
+        self.assertEqual(self.mermaid.img_response.content, PNG_BODY)
+        self.assertEqual(self.mermaid.img_response.headers["Content-Type"], "image/png")
+        self.assertEqual(self.server.request_count, 2)
+
+    def test_unknown_paths_are_not_found(self):
+        response = requests.get(self.server.url + "/pdf/abc")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_body_size_injection(self):
+        self.server.body_size = 100_000
+
+        svg = self.mermaid.svg_response.content
+        png = self.mermaid.img_response.content
+
+        self.assertEqual((len(svg), len(png)), (100_000, 100_000))
+        self.assertTrue(svg.startswith(b"<svg") and svg.endswith(b"</svg>"))
+        self.assertTrue(png.startswith(PNG_BODY))
+
+    def test_status_injection(self):
+        self.server.status = 400
+
+        with self.assertRaises(MermaidError) as context:
+            self.mermaid.svg_response
+
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertEqual(context.exception.response_text, "Bad Request")
+
+    def test_error_rate_injection_is_seeded(self):
+        def failures(seed):
+            with FakeMermaidServer(error_rate=0.3, seed=seed) as server:
+                with requests.Session() as session:
+                    return [
+                        session.get(server.url + "/svg/abc").status_code
+                        for _ in range(50)
+                    ]
+
+        statuses = failures(seed=1)
+
+        self.assertEqual(statuses, failures(seed=1))
+        self.assertEqual(set(statuses), {200, 503})
+        self.assertTrue(5 <= statuses.count(503) <= 25)
+
+    def test_latency_injection(self):
+        self.server.latency = 0.1
+
+        elapsed = self.mermaid.svg_response.elapsed.total_seconds()
+
+        self.assertGreaterEqual(elapsed, 0.1)
+
+    def test_etag_is_honored(self):
+        response = requests.get(self.server.url + "/svg/abc")
+        revalidated = requests.get(
+            self.server.url + "/svg/abc",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b"")
+
+
+class TestMermaidServerFixture(unittest.TestCase):
+    @pytest.fixture(autouse=True)
+    def use_fake_server(self, mermaid_server):
+        self.server = mermaid_server
+
+    def test_environment_points_at_fake_server(self):
+        self.assertEqual(os.environ["MERMAID_INK_SERVER"], self.server.url)
+
+        response = Mermaid("graph TD;\n    A-->B;").svg_response
+
+        self.assertTrue(response.url.startswith(self.server.url))
+        self.assertEqual(self.server.request_count, 1)